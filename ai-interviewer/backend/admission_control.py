@@ -0,0 +1,122 @@
+"""
+Admission control and load shedding for observation workloads.
+New sessions are admitted at full frame rate only while the measured
+per-frame analysis cost says the vision workers can absorb them; past that
+they are degraded (lower fps, then audio-only) or refused, so sessions that
+are already running keep their latency.
+"""
+import threading
+from typing import Dict, NamedTuple, Optional
+
+MODE_FULL = "full"
+MODE_REDUCED = "reduced_fps"
+MODE_AUDIO_ONLY = "audio_only"
+
+
+class SessionRejected(Exception):
+    """Raised when the node cannot take another interview."""
+
+
+class AdmissionDecision(NamedTuple):
+    """How a session is allowed to run."""
+
+    mode: str
+    max_fps: float  # 0 when video analysis is disabled
+
+
+class AdmissionController:
+    """Tracks per-frame analysis cost and committed load to decide how to admit sessions."""
+
+    def __init__(self, capacity_cores: float, full_fps: float = 6.0, reduced_fps: float = 2.0,
+                 max_sessions: Optional[int] = None, target_utilization: float = 0.8,
+                 initial_frame_cost: float = 0.08, cost_smoothing: float = 0.1):
+        """
+        Args:
+            capacity_cores: CPU cores available for vision analysis
+            full_fps: Frame rate analyzed for sessions admitted in full mode
+            reduced_fps: Frame rate for degraded sessions
+            max_sessions: Hard cap on concurrent sessions (None = no cap)
+            target_utilization: Fraction of capacity that may be committed
+            initial_frame_cost: Seconds of CPU per frame assumed until measured
+            cost_smoothing: EWMA weight of each new cost sample
+        """
+        self.capacity_cores = max(capacity_cores, 0.1)
+        self.full_fps = full_fps
+        self.reduced_fps = reduced_fps
+        self.max_sessions = max_sessions
+        self.target_utilization = target_utilization
+        self.cost_smoothing = cost_smoothing
+
+        self.frame_cost = initial_frame_cost
+        self.cost_samples = 0
+        self._sessions: Dict[str, AdmissionDecision] = {}
+        self._lock = threading.Lock()
+        self.rejected_count = 0
+
+    def record_frame_cost(self, seconds: float):
+        """Fold one measured per-frame analysis cost into the running estimate."""
+        if seconds <= 0:
+            return
+        with self._lock:
+            if self.cost_samples == 0:
+                self.frame_cost = seconds
+            else:
+                self.frame_cost += self.cost_smoothing * (seconds - self.frame_cost)
+            self.cost_samples += 1
+
+    def _committed_fps(self) -> float:
+        return sum(decision.max_fps for decision in self._sessions.values())
+
+    def _budget_fps(self) -> float:
+        """Total frames/s the workers can analyze within the utilization target."""
+        return self.capacity_cores * self.target_utilization / self.frame_cost
+
+    def admit(self, session_id: str) -> AdmissionDecision:
+        """
+        Decide how a new session runs.
+
+        Raises:
+            SessionRejected: If the hard session cap is reached.
+        """
+        with self._lock:
+            if self.max_sessions is not None and len(self._sessions) >= self.max_sessions:
+                self.rejected_count += 1
+                raise SessionRejected("Server is at interview capacity, please try again shortly")
+
+            headroom = self._budget_fps() - self._committed_fps()
+            if headroom >= self.full_fps:
+                decision = AdmissionDecision(MODE_FULL, self.full_fps)
+            elif headroom >= self.reduced_fps:
+                decision = AdmissionDecision(MODE_REDUCED, self.reduced_fps)
+            else:
+                decision = AdmissionDecision(MODE_AUDIO_ONLY, 0.0)
+
+            self._sessions[session_id] = decision
+            return decision
+
+    def release(self, session_id: str):
+        """Return a session's share of capacity."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def snapshot(self) -> Dict:
+        """Capacity report for /health."""
+        with self._lock:
+            budget = self._budget_fps()
+            committed = self._committed_fps()
+            modes = {MODE_FULL: 0, MODE_REDUCED: 0, MODE_AUDIO_ONLY: 0}
+            for decision in self._sessions.values():
+                modes[decision.mode] += 1
+            remaining_sessions = None
+            if self.max_sessions is not None:
+                remaining_sessions = max(0, self.max_sessions - len(self._sessions))
+            return {
+                "sessions": len(self._sessions),
+                "sessions_by_mode": modes,
+                "frame_cost_ms": round(self.frame_cost * 1000.0, 2),
+                "budget_fps": round(budget, 2),
+                "committed_fps": round(committed, 2),
+                "remaining_full_sessions": max(0, int((budget - committed) // self.full_fps)),
+                "remaining_sessions": remaining_sessions,
+                "rejected_sessions": self.rejected_count,
+            }
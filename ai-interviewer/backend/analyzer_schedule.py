@@ -0,0 +1,244 @@
+"""
+Per-session analyzer cadence.
+Signals change at different speeds: who is in the frame changes rarely,
+gaze and blinks change from frame to frame, and the emotion heuristic is
+smoothed over seconds downstream anyway. Each analyzer declares a target
+rate and the analyzers it depends on. AnalyzerSchedule runs an analyzer
+only when it is due and its dependencies produced a usable result, and
+otherwise carries its last result forward together with that result's age.
+"""
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .frame_context import FrameContext
+    from .metrics import stage
+    from .observation_records import EmotionResult, FaceResult
+except ImportError:
+    from frame_context import FrameContext
+    from metrics import stage
+    from observation_records import EmotionResult, FaceResult
+
+# Target runs per second for each analyzer; 0 runs on every frame
+ANALYZER_RATES = {
+    "person": 1.0,   # full-frame multi-person check (YOLO, or multi-face Haar)
+    "face": 0.0,     # landmarks, gaze, blink and head pose
+    "emotion": 2.0,  # emotion model (or heuristic) on the face crop
+}
+
+# Analyzers that only run when all the listed analyzers' latest results are usable
+ANALYZER_REQUIREMENTS = {
+    "emotion": ("face",),
+}
+
+# An analyzer is due once this fraction of its period has passed, so frame
+# timing jitter does not push a 2 Hz analyzer fed at 6 fps to every 4th frame
+DUE_FRACTION = 0.9
+
+
+class AnalyzerSchedule:
+    """Decides which analyzers run on a frame and keeps their last results."""
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None,
+                 requirements: Optional[Dict[str, Tuple[str, ...]]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rates = dict(ANALYZER_RATES)
+        self.rates.update(rates or {})
+        self.requirements = dict(ANALYZER_REQUIREMENTS)
+        self.requirements.update(requirements or {})
+        self.clock = clock
+        self._ran_at: Dict[str, float] = {}
+        self._results: Dict[str, Any] = {}
+        self._usable: Dict[str, bool] = {}
+        self.runs: Dict[str, int] = {}
+        self.carried: Dict[str, int] = {}
+        self.skipped: Dict[str, int] = {}
+
+    def due(self, name: str, now: Optional[float] = None) -> bool:
+        """Whether `name` should run now (never-run analyzers are always due)."""
+        rate = self.rates.get(name, 0.0)
+        last = self._ran_at.get(name)
+        if not rate or last is None:
+            return True
+        now = self.clock() if now is None else now
+        return now - last >= DUE_FRACTION / rate
+
+    def age(self, name: str, now: Optional[float] = None) -> Optional[float]:
+        """Seconds since `name` last ran, or None if it has not run."""
+        last = self._ran_at.get(name)
+        if last is None:
+            return None
+        now = self.clock() if now is None else now
+        return max(0.0, now - last)
+
+    def mark(self, name: str, result: Any = None, usable: bool = True, now: Optional[float] = None):
+        """Record that `name` ran (outside `run`, e.g. as part of another analyzer)."""
+        self._ran_at[name] = self.clock() if now is None else now
+        self._results[name] = result
+        self._usable[name] = usable
+        self.runs[name] = self.runs.get(name, 0) + 1
+
+    def ready(self, name: str) -> bool:
+        """Whether every analyzer `name` depends on has a usable latest result."""
+        return all(self._usable.get(dependency, False) for dependency in self.requirements.get(name, ()))
+
+    def run(self, name: str, compute: Callable[[], Any], usable: Callable[[Any], bool] = lambda result: True,
+            now: Optional[float] = None) -> Tuple[Any, Optional[float]]:
+        """
+        Run an analyzer if it is due, or reuse its last result.
+
+        Args:
+            name: Analyzer name (key of the rate and requirement tables)
+            compute: Runs the analyzer and returns its result
+            usable: Whether a result satisfies analyzers that depend on this one
+            now: Current clock time (defaults to the schedule's clock)
+
+        Returns:
+            (result, age_seconds). Age is 0.0 for a fresh result. When a
+            dependency is not usable the analyzer is skipped, its carried
+            result dropped, and (None, None) returned.
+        """
+        now = self.clock() if now is None else now
+        if not self.ready(name):
+            self.forget(name)
+            self.skipped[name] = self.skipped.get(name, 0) + 1
+            return None, None
+        if self.due(name, now):
+            result = compute()
+            self.mark(name, result, usable=bool(usable(result)), now=now)
+            return result, 0.0
+        self.carried[name] = self.carried.get(name, 0) + 1
+        return self._results[name], self.age(name, now)
+
+    def forget(self, name: str):
+        """Drop a carried result so the analyzer runs on its next chance."""
+        self._ran_at.pop(name, None)
+        self._results.pop(name, None)
+        self._usable[name] = False
+
+    def reset(self):
+        self._ran_at.clear()
+        self._results.clear()
+        self._usable.clear()
+        self.runs.clear()
+        self.carried.clear()
+        self.skipped.clear()
+
+
+class PendingAnalysis:
+    """A frame between `start_analysis` and `finish_analysis`."""
+
+    __slots__ = ("frame", "context", "now", "face_data", "results", "emotion_crop")
+
+    def __init__(self, frame: np.ndarray, now: float):
+        self.frame = frame
+        self.context: Optional[FrameContext] = None
+        self.now = now
+        self.face_data: Optional[FaceResult] = None
+        # Final (face, emotion) results when the motion gate reused earlier ones
+        self.results: Optional[Tuple[FaceResult, EmotionResult]] = None
+        # Emotion model input, set when emotion is due and can be batched
+        self.emotion_crop: Optional[np.ndarray] = None
+
+
+def start_analysis(face_analyzer, emotion_analyzer, schedule: AnalyzerSchedule, frame: np.ndarray,
+                   person_count: Optional[int] = None, gate=None) -> PendingAnalysis:
+    """
+    First half of `run_analyzers`: the motion gate and the face stage.
+    When the emotion model will run on this frame, its face crop is left in
+    `emotion_crop` so crops from several sessions can share a forward pass.
+    """
+    now = schedule.clock()
+    pending = PendingAnalysis(frame, now)
+    # While a possible second person awaits confirmation, every frame gets the
+    # person check: neither its 1 Hz cadence nor the motion gate may space out
+    # the detector's 3-of-5 window
+    confirming = face_analyzer.person_check_pending
+    if gate is not None and not confirming:
+        with stage("motion_gate"):
+            reuse = gate.check(frame, now=now)
+        if reuse:
+            (face_data, emotion_data), age = gate.reused_results(now)
+            pending.results = (
+                face_data.replace(age_seconds=face_data.get("age_seconds", 0.0) + age,
+                                  person_check_age=schedule.age("person", now) or 0.0),
+                emotion_data.replace(age_seconds=emotion_data.get("age_seconds", 0.0) + age),
+            )
+            return pending
+
+    context = pending.context = FrameContext(frame)
+
+    def analyze_face():
+        with stage("face_analysis"):
+            return face_analyzer.analyze(frame, person_count=person_count, context=context,
+                                         full_frame=confirming or schedule.due("person", now))
+
+    face_data, face_age = schedule.run("face", analyze_face, usable=lambda face: face.get("face_detected"), now=now)
+    if face_age == 0.0 and face_analyzer.last_full_frame:
+        schedule.mark("person", now=now)
+    pending.face_data = face_data.replace(age_seconds=face_age, person_check_age=schedule.age("person", now) or 0.0)
+
+    if emotion_analyzer.model_loaded and schedule.ready("emotion") and schedule.due("emotion", now):
+        with stage("emotion"):
+            pending.emotion_crop = emotion_analyzer.face_crop(frame, context=context, face=pending.face_data)
+    return pending
+
+
+def finish_analysis(emotion_analyzer, schedule: AnalyzerSchedule, pending: PendingAnalysis,
+                    emotion_probabilities: Optional[np.ndarray] = None,
+                    gate=None) -> Tuple[FaceResult, EmotionResult]:
+    """
+    Second half of `run_analyzers`: the emotion stage.
+
+    Args:
+        emotion_probabilities: Model output for `pending.emotion_crop`, when
+                               it was classified in a batch; otherwise the
+                               crop is classified on its own
+    """
+    if pending.results is not None:
+        return pending.results
+    frame, face_data, now = pending.frame, pending.face_data, pending.now
+
+    def analyze_emotion():
+        with stage("emotion"):
+            probabilities = emotion_probabilities
+            if probabilities is None and pending.emotion_crop is not None:
+                probabilities = emotion_analyzer.classify_crops([pending.emotion_crop])[0]
+            return emotion_analyzer.analyze(frame, context=pending.context, face=face_data,
+                                            probabilities=probabilities)
+
+    emotion_data, age = schedule.run("emotion", analyze_emotion, now=now)
+    if emotion_data is None:
+        # No face: nothing to read an emotion from
+        emotion_data = emotion_analyzer.analyze(frame, face=face_data)
+    else:
+        emotion_data = emotion_data.replace(age_seconds=age)
+    if gate is not None:
+        gate.analyzed(frame, (face_data, emotion_data), face_box=face_data.get("face_box"), now=now)
+    return face_data, emotion_data
+
+
+def run_analyzers(face_analyzer, emotion_analyzer, schedule: AnalyzerSchedule, frame: np.ndarray,
+                  person_count: Optional[int] = None, gate=None) -> Tuple[FaceResult, EmotionResult]:
+    """
+    Face and emotion analysis of one frame, following the session's schedule.
+
+    The face stage runs on every frame and forces a full-frame pass (the
+    multi-person check) when "person" is due, or on every frame while a
+    second person awaits confirmation. Emotion runs at its own rate
+    on frames with a face; in between, the last emotion is returned with
+    its `age_seconds`.
+
+    Args:
+        face_analyzer: The session's FaceAnalyzer
+        emotion_analyzer: The session's EmotionAnalyzer
+        schedule: The session's AnalyzerSchedule
+        frame: BGR frame
+        person_count: YOLO person count if already computed in a batch
+        gate: The session's MotionGate; when it finds the frame unchanged,
+              the last results are returned with refreshed ages instead
+    """
+    pending = start_analysis(face_analyzer, emotion_analyzer, schedule, frame, person_count=person_count, gate=gate)
+    return finish_analysis(emotion_analyzer, schedule, pending, gate=gate)
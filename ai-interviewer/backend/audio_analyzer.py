@@ -8,6 +8,11 @@ import threading
 from collections import deque
 import time
 
+try:
+    from .observation_records import AudioResult
+except ImportError:
+    from observation_records import AudioResult
+
 
 class AudioAnalyzer:
     """Analyzes audio for pitch, energy, stress, and speaking patterns."""
@@ -38,7 +43,7 @@ class AudioAnalyzer:
             for sample in audio_chunk:
                 self.audio_buffer.append(sample)
 
-    def analyze(self) -> Dict:
+    def analyze(self) -> AudioResult:
         """Analyze current audio buffer for stress indicators."""
         with self.lock:
             if len(self.audio_buffer) < self.chunk_size:
@@ -75,20 +80,20 @@ class AudioAnalyzer:
         # Calculate stress indicators
         stress_indicators = self._calculate_stress(pitch, energy)
         
-        return {
-            "pitch": float(pitch),
-            "energy": float(energy),
-            "speaking_rate": float(speaking_rate),
-            "silence_duration": float(self.current_silence_duration),
-            "max_silence": float(self.max_silence_duration),
-            "silence_detected": bool(silence_detected),
-            "pitch_spike": stress_indicators["pitch_spike"],
-            "energy_spike": stress_indicators["energy_spike"],
-            "stress_level": stress_indicators["stress_level"],
-            "voice_confidence": stress_indicators["confidence"],
-            "baseline_pitch": float(self.baseline_pitch) if self.baseline_pitch else 0.0,
-            "baseline_energy": float(self.baseline_energy) if self.baseline_energy else 0.0,
-        }
+        return AudioResult(
+            pitch=float(pitch),
+            energy=float(energy),
+            speaking_rate=float(speaking_rate),
+            silence_duration=float(self.current_silence_duration),
+            max_silence=float(self.max_silence_duration),
+            silence_detected=bool(silence_detected),
+            pitch_spike=stress_indicators["pitch_spike"],
+            energy_spike=stress_indicators["energy_spike"],
+            stress_level=stress_indicators["stress_level"],
+            voice_confidence=stress_indicators["confidence"],
+            baseline_pitch=float(self.baseline_pitch) if self.baseline_pitch else 0.0,
+            baseline_energy=float(self.baseline_energy) if self.baseline_energy else 0.0,
+        )
 
     def _estimate_pitch(self, audio: np.ndarray) -> float:
         """Estimate fundamental frequency (pitch) using autocorrelation."""
@@ -202,22 +207,42 @@ class AudioAnalyzer:
             "confidence": float(np.clip(confidence, 1.0, 10.0)),
         }
 
-    def _empty_result(self) -> Dict:
+    def _empty_result(self) -> AudioResult:
+        return AudioResult(
+            pitch=0.0,
+            energy=0.0,
+            speaking_rate=0.0,
+            silence_duration=0.0,
+            max_silence=float(self.max_silence_duration),
+            silence_detected=False,
+            pitch_spike=False,
+            energy_spike=False,
+            stress_level="unknown",
+            voice_confidence=0.0,
+            baseline_pitch=float(self.baseline_pitch) if self.baseline_pitch else 0.0,
+            baseline_energy=float(self.baseline_energy) if self.baseline_energy else 0.0,
+        )
+
+    def export_state(self) -> Dict:
+        """Calibration and stress history, for resuming the session in another process."""
         return {
-            "pitch": 0.0,
-            "energy": 0.0,
-            "speaking_rate": 0.0,
-            "silence_duration": 0.0,
-            "max_silence": float(self.max_silence_duration),
-            "silence_detected": False,
-            "pitch_spike": False,
-            "energy_spike": False,
-            "stress_level": "unknown",
-            "voice_confidence": 0.0,
-            "baseline_pitch": float(self.baseline_pitch) if self.baseline_pitch else 0.0,
-            "baseline_energy": float(self.baseline_energy) if self.baseline_energy else 0.0,
+            "baseline_pitch": float(self.baseline_pitch) if self.baseline_pitch is not None else None,
+            "baseline_energy": float(self.baseline_energy) if self.baseline_energy is not None else None,
+            "calibrated": self.calibrated,
+            "pitch_history": [float(v) for v in self.pitch_history],
+            "energy_history": [float(v) for v in self.energy_history],
+            "max_silence_duration": float(self.max_silence_duration),
         }
 
+    def restore_state(self, state: Dict):
+        """Load state produced by export_state."""
+        self.baseline_pitch = state.get("baseline_pitch")
+        self.baseline_energy = state.get("baseline_energy")
+        self.calibrated = state.get("calibrated", False)
+        self.pitch_history.extend(state.get("pitch_history", []))
+        self.energy_history.extend(state.get("energy_history", []))
+        self.max_silence_duration = state.get("max_silence_duration", 0)
+
     def reset(self):
         """Reset analyzer state."""
         self.audio_buffer.clear()
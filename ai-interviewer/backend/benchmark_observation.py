@@ -0,0 +1,300 @@
+"""
+Replay benchmark for the observation pipeline.
+
+Feeds a recorded (directory of JPEG files plus optional raw PCM16 audio) or
+synthetic frame/audio sequence through full HumanObservationEngine sessions
+on a shared VisionWorkerPool at a fixed rate, and reports throughput,
+analysis latency percentiles, drop rate and CPU per session as JSON.
+
+Usage:
+    python -m backend.benchmark_observation --sessions 4 --fps 6 --duration 20
+    python -m backend.benchmark_observation --frames-dir recording/ --output run.json
+    python -m backend.benchmark_observation --baseline baseline.json
+"""
+import argparse
+import glob
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from .analyzer_warmup import synthetic_frame
+    from .capture_control import CaptureRateController
+    from .frame_ingest import decode_jpeg, decode_pcm16
+    from .human_observation_engine import HumanObservationEngine
+    from .lazy_imports import lazy_import
+    from .vision_pool import VisionWorkerPool
+except ImportError:
+    sys.path.append(str(pathlib.Path(__file__).resolve().parent))
+    from analyzer_warmup import synthetic_frame
+    from capture_control import CaptureRateController
+    from frame_ingest import decode_jpeg, decode_pcm16
+    from human_observation_engine import HumanObservationEngine
+    from lazy_imports import lazy_import
+    from vision_pool import VisionWorkerPool
+
+cv2 = lazy_import("cv2")
+
+SAMPLE_RATE = 16000
+
+# Metrics compared against --baseline (higher_is_better)
+BASELINE_METRICS = {
+    "analyzed_fps_per_session": True,
+    "latency_ms.p50": False,
+    "latency_ms.p95": False,
+    "latency_ms.p99": False,
+    "drop_rate": False,
+    "cpu_cores_per_session": False,
+}
+
+
+class _RecordingCaptureController(CaptureRateController):
+    """Capture controller that also keeps every per-frame analysis latency."""
+
+    def __init__(self):
+        super().__init__()
+        self.latencies: List[float] = []
+
+    def record_latency(self, seconds: float):
+        self.latencies.append(seconds)
+        super().record_latency(seconds)
+
+
+def load_frames(frames_dir: Optional[str], count: int, width: int, height: int) -> List[bytes]:
+    """JPEG payloads to replay: files from `frames_dir`, or synthetic moving frames."""
+    if frames_dir:
+        paths = sorted(glob.glob(os.path.join(frames_dir, "*.jpg")) + glob.glob(os.path.join(frames_dir, "*.jpeg")))
+        if not paths:
+            raise ValueError(f"No JPEG frames found in {frames_dir}")
+        frames = []
+        for path in paths:
+            with open(path, "rb") as f:
+                frames.append(f.read())
+        return frames
+
+    base = synthetic_frame(width, height)
+    frames = []
+    for i in range(count):
+        # Shift the pattern so consecutive frames differ like a live feed
+        frame = np.roll(base, shift=i * 7, axis=1)
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        if not ok:
+            raise RuntimeError("JPEG encoding of synthetic frame failed")
+        frames.append(encoded.tobytes())
+    return frames
+
+
+def load_audio(audio_file: Optional[str], seconds: float) -> np.ndarray:
+    """Float32 samples to replay: raw little-endian PCM16 mono at 16 kHz, or synthetic speech-like noise."""
+    if audio_file:
+        with open(audio_file, "rb") as f:
+            return decode_pcm16(f.read())
+
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 0.5 * t)  # syllable-like loudness changes
+    voice = np.sin(2 * np.pi * 140 * t) + 0.3 * np.sin(2 * np.pi * 280 * t)
+    return (0.2 * envelope * voice + 0.01 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def _feed_session(engine: HumanObservationEngine, frames: List[bytes], audio: np.ndarray,
+                  fps: float, duration: float, submitted: Dict[str, int]):
+    """Replay frames and matching audio into one engine at `fps` for `duration` seconds."""
+    interval = 1.0 / fps
+    chunk = int(SAMPLE_RATE * interval)
+    deadline = time.perf_counter() + duration
+    next_tick = time.perf_counter()
+    i = 0
+    while time.perf_counter() < deadline:
+        frame = decode_jpeg(frames[i % len(frames)])
+        if frame is not None:
+            engine.add_video_frame(frame)
+            submitted["frames"] += 1
+        start = (i * chunk) % max(len(audio) - chunk, 1)
+        engine.add_audio_frame(audio[start:start + chunk])
+        i += 1
+
+        next_tick += interval
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _percentiles_ms(latencies: List[float]) -> Dict[str, Optional[float]]:
+    if not latencies:
+        return {"p50": None, "p95": None, "p99": None, "mean": None}
+    values = np.array(latencies) * 1000.0
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50": round(float(p50), 2),
+        "p95": round(float(p95), 2),
+        "p99": round(float(p99), 2),
+        "mean": round(float(values.mean()), 2),
+    }
+
+
+def run_benchmark(sessions: int = 1, fps: float = 6.0, duration: float = 10.0, workers: int = 0,
+                  width: int = 640, height: int = 480, frames_dir: Optional[str] = None,
+                  audio_file: Optional[str] = None, warmup_frames: int = 2) -> Dict:
+    """
+    Run the replay and return the report.
+
+    Args:
+        sessions: Concurrent interview sessions
+        fps: Frames per second sent to each session
+        duration: Seconds of replay per session (warm-up excluded)
+        workers: Vision worker processes (0 = analyze in this process)
+        width: Width of synthetic frames
+        height: Height of synthetic frames
+        frames_dir: Directory of recorded JPEG frames (synthetic if None)
+        audio_file: Raw PCM16 mono 16 kHz recording (synthetic if None)
+        warmup_frames: Synthetic warm-up frames per worker and session
+    """
+    frames = load_frames(frames_dir, count=max(1, int(fps * 4)), width=width, height=height)
+    audio = load_audio(audio_file, seconds=max(duration, 1.0))
+
+    pool = VisionWorkerPool(num_workers=workers, warmup_frames=warmup_frames, warmup_size=(width, height))
+    pool.warm_up().join()
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        engines = []
+        for i in range(sessions):
+            engine = HumanObservationEngine(
+                session_id=f"bench-{i}",
+                log_file=os.path.join(log_dir, f"bench_{i}.txt"),
+                vision_pool=pool,
+                capture_controller=_RecordingCaptureController(),
+                warmup_frames=warmup_frames,
+            )
+            engine.start()
+            engines.append(engine)
+
+        # Measure steady state only: wait for every session's warm-up
+        while any(e.warmup_frames > 0 and e.warmup_seconds is None for e in engines):
+            time.sleep(0.05)
+
+        submitted = [{"frames": 0} for _ in engines]
+        observations_before = [e.observation_count for e in engines]
+        cpu_before = time.process_time() + pool.worker_cpu_seconds()
+        wall_start = time.perf_counter()
+
+        feeders = [
+            threading.Thread(target=_feed_session, args=(engine, frames, audio, fps, duration, counts), daemon=True)
+            for engine, counts in zip(engines, submitted)
+        ]
+        for feeder in feeders:
+            feeder.start()
+        for feeder in feeders:
+            feeder.join()
+        # Let frames already queued drain
+        time.sleep(0.5)
+
+        wall = time.perf_counter() - wall_start
+        cpu_seconds = time.process_time() + pool.worker_cpu_seconds() - cpu_before
+        observations = sum(e.observation_count - before for e, before in zip(engines, observations_before))
+
+        for engine in engines:
+            engine.stop()
+    pool.shutdown()
+
+    latencies = [latency for e in engines for latency in e.capture_controller.latencies]
+    frames_submitted = sum(counts["frames"] for counts in submitted)
+    frames_dropped = sum(e.dropped_frames for e in engines)
+
+    return {
+        "config": {
+            "sessions": sessions,
+            "fps": fps,
+            "duration": duration,
+            "workers": pool.num_workers,
+            "width": width,
+            "height": height,
+            "source": frames_dir or "synthetic",
+            "warmup_frames": warmup_frames,
+        },
+        "wall_seconds": round(wall, 3),
+        "frames_submitted": frames_submitted,
+        "frames_analyzed": len(latencies),
+        "frames_dropped": frames_dropped,
+        "analyzed_fps": round(len(latencies) / wall, 2),
+        "analyzed_fps_per_session": round(len(latencies) / wall / sessions, 2),
+        "observations_per_second_per_session": round(observations / wall / sessions, 2),
+        "latency_ms": _percentiles_ms(latencies),
+        "drop_rate": round(frames_dropped / frames_submitted, 4) if frames_submitted else 0.0,
+        "cpu_seconds_per_session": round(cpu_seconds / sessions, 3),
+        "cpu_cores_per_session": round(cpu_seconds / wall / sessions, 3),
+    }
+
+
+def _lookup(report: Dict, dotted: str) -> Optional[float]:
+    value = report
+    for key in dotted.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def compare_to_baseline(report: Dict, baseline: Dict) -> Dict[str, Dict]:
+    """Relative change of each key metric versus a baseline report (positive = better)."""
+    comparison = {}
+    for metric, higher_is_better in BASELINE_METRICS.items():
+        current, previous = _lookup(report, metric), _lookup(baseline, metric)
+        if current is None or previous is None:
+            continue
+        change = (current - previous) / previous if previous else 0.0
+        comparison[metric] = {
+            "baseline": previous,
+            "current": current,
+            "improvement": round(change if higher_is_better else -change, 4),
+        }
+    return comparison
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Replay benchmark for the observation pipeline")
+    parser.add_argument("--sessions", type=int, default=1, help="concurrent sessions")
+    parser.add_argument("--fps", type=float, default=6.0, help="frames per second per session")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of replay")
+    parser.add_argument("--workers", type=int, default=0, help="vision worker processes (0 = in-process)")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--frames-dir", help="directory of recorded JPEG frames")
+    parser.add_argument("--audio-file", help="raw PCM16 mono 16 kHz recording")
+    parser.add_argument("--warmup-frames", type=int, default=2)
+    parser.add_argument("--baseline", help="previous report to compare against")
+    parser.add_argument("--output", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        sessions=args.sessions,
+        fps=args.fps,
+        duration=args.duration,
+        workers=args.workers,
+        width=args.width,
+        height=args.height,
+        frames_dir=args.frames_dir,
+        audio_file=args.audio_file,
+        warmup_frames=args.warmup_frames,
+    )
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["baseline_comparison"] = compare_to_baseline(report, json.load(f))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
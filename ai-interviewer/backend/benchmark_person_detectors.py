@@ -0,0 +1,202 @@
+"""
+Person detector tier benchmark.
+
+Runs person detector tiers (see person_detectors.DETECTOR_TIERS) over a
+recorded set of frames and reports, per tier, the per-frame latency and how
+well its person counts agree with a reference tier (by default the current
+ultralytics YOLOv8s detector). The recommendation is the fastest tier that
+still catches second persons reliably. Counts go through RobustFaceDetector's
+own filtering, so they are what the multi-person check would see.
+
+Usage:
+    python -m backend.benchmark_person_detectors --frames-dir recording/
+    python -m backend.benchmark_person_detectors --recording session.airec --tiers yolov8n-onnx-320
+    python -m backend.benchmark_person_detectors --export yolov8n-onnx-320-int8 --frames-dir calibration/
+"""
+import argparse
+import glob
+import json
+import os
+import pathlib
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .benchmark_observation import _percentiles_ms
+    from .frame_ingest import decode_jpeg
+    from .person_detectors import DETECTOR_TIERS, export_tier, tier_available
+    from .robust_face_detector import RobustFaceDetector
+    from .session_recording import KIND_VIDEO, SessionRecording
+except ImportError:
+    sys.path.append(str(pathlib.Path(__file__).resolve().parent))
+    from benchmark_observation import _percentiles_ms
+    from frame_ingest import decode_jpeg
+    from person_detectors import DETECTOR_TIERS, export_tier, tier_available
+    from robust_face_detector import RobustFaceDetector
+    from session_recording import KIND_VIDEO, SessionRecording
+
+REFERENCE_TIER = "yolov8s-torch-640"
+
+# A tier is recommended if it finds this share of the reference's multi-person
+# frames and agrees on the person count this often overall
+MIN_MULTI_PERSON_RECALL = 0.95
+MIN_COUNT_AGREEMENT = 0.9
+
+# Frames run through each tier before timing starts
+WARMUP_FRAMES = 2
+
+
+def load_recorded_frames(frames_dir: Optional[str] = None, recording: Optional[str] = None,
+                         max_frames: Optional[int] = None) -> List[np.ndarray]:
+    """Decoded frames from a directory of JPEGs or the video of a session recording."""
+    frames: List[np.ndarray] = []
+    if frames_dir:
+        paths = sorted(glob.glob(os.path.join(frames_dir, "*.jpg")) + glob.glob(os.path.join(frames_dir, "*.jpeg")))
+        for path in paths[:max_frames]:
+            with open(path, "rb") as f:
+                frame = decode_jpeg(f.read())
+            if frame is not None:
+                frames.append(frame)
+    if recording:
+        with SessionRecording(recording) as rec:
+            for event in rec.events([KIND_VIDEO]):
+                if max_frames is not None and len(frames) >= max_frames:
+                    break
+                frame = decode_jpeg(event.payload)
+                if frame is not None:
+                    frames.append(frame)
+    if not frames:
+        raise ValueError("No frames to benchmark (give --frames-dir or --recording)")
+    return frames
+
+
+def _run_detector(detector: RobustFaceDetector, frames: Sequence[np.ndarray]) -> Dict:
+    for frame in frames[:WARMUP_FRAMES]:
+        detector.detect_persons(frame)
+    counts, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        count, _ = detector.detect_persons(frame)
+        latencies.append(time.perf_counter() - start)
+        counts.append(count)
+    return {"counts": counts, "latencies": latencies}
+
+
+def _agreement(counts: List[int], reference: List[int]) -> Dict:
+    pairs = list(zip(counts, reference))
+    multi = [count > 1 for count, ref in pairs if ref > 1]
+    single = [count > 1 for count, ref in pairs if ref <= 1]
+    return {
+        "count_agreement": round(sum(count == ref for count, ref in pairs) / len(pairs), 4),
+        "multi_person_frames": len(multi),
+        "multi_person_recall": round(sum(multi) / len(multi), 4) if multi else None,
+        "false_multi_person_rate": round(sum(single) / len(single), 4) if single else None,
+    }
+
+
+def compare_detectors(frames: Sequence[np.ndarray], detectors: Dict[str, RobustFaceDetector],
+                      reference: str) -> Dict[str, Dict]:
+    """
+    Latency and agreement with `reference` for each detector.
+
+    Args:
+        frames: Decoded BGR frames
+        detectors: Detector per tier name; must include `reference`
+        reference: Tier whose counts are treated as ground truth
+    """
+    runs = {name: _run_detector(detector, frames) for name, detector in detectors.items()}
+    reference_counts = runs[reference]["counts"]
+    results = {}
+    for name, run in runs.items():
+        results[name] = {
+            "latency_ms": _percentiles_ms(run["latencies"]),
+            **_agreement(run["counts"], reference_counts),
+        }
+    return results
+
+
+def recommend(results: Dict[str, Dict], min_recall: float = MIN_MULTI_PERSON_RECALL,
+              min_agreement: float = MIN_COUNT_AGREEMENT) -> Optional[str]:
+    """Fastest (p50) tier meeting the recall and agreement bars, or None."""
+    eligible = [
+        (stats["latency_ms"]["p50"], name) for name, stats in results.items()
+        if stats.get("latency_ms", {}).get("p50") is not None
+        and stats["count_agreement"] >= min_agreement
+        and (stats["multi_person_recall"] is None or stats["multi_person_recall"] >= min_recall)
+    ]
+    return min(eligible)[1] if eligible else None
+
+
+def run_benchmark(frames: Sequence[np.ndarray], tiers: Optional[Sequence[str]] = None,
+                  reference: str = REFERENCE_TIER, min_recall: float = MIN_MULTI_PERSON_RECALL,
+                  min_agreement: float = MIN_COUNT_AGREEMENT) -> Dict:
+    """Benchmark the available tiers (all known tiers by default) against `reference`."""
+    tiers = list(tiers or DETECTOR_TIERS)
+    if reference not in tiers:
+        tiers.insert(0, reference)
+
+    detectors: Dict[str, RobustFaceDetector] = {}
+    unavailable: Dict[str, str] = {}
+    for tier in tiers:
+        if not tier_available(tier):
+            unavailable[tier] = "runtime or model file missing"
+            continue
+        try:
+            detectors[tier] = RobustFaceDetector(tier=tier)
+        except Exception as e:
+            unavailable[tier] = repr(e)
+    if reference not in detectors:
+        raise RuntimeError(f"Reference tier {reference} unavailable: {unavailable.get(reference)}")
+
+    results = compare_detectors(frames, detectors, reference)
+    frame_heights = sorted({frame.shape[0] for frame in frames})
+    return {
+        "config": {
+            "frames": len(frames),
+            "frame_heights": frame_heights,
+            "reference": reference,
+            "min_multi_person_recall": min_recall,
+            "min_count_agreement": min_agreement,
+        },
+        "tiers": results,
+        "unavailable": unavailable,
+        "recommended": recommend(results, min_recall, min_agreement),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Benchmark person detector tiers on recorded frames")
+    parser.add_argument("--frames-dir", help="directory of recorded JPEG frames")
+    parser.add_argument("--recording", help="session recording whose video frames to use")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--tiers", nargs="+", choices=sorted(DETECTOR_TIERS), help="tiers to compare (default: all)")
+    parser.add_argument("--reference", default=REFERENCE_TIER, choices=sorted(DETECTOR_TIERS))
+    parser.add_argument("--min-recall", type=float, default=MIN_MULTI_PERSON_RECALL)
+    parser.add_argument("--min-agreement", type=float, default=MIN_COUNT_AGREEMENT)
+    parser.add_argument("--export", nargs="+", choices=sorted(DETECTOR_TIERS),
+                        help="export these ONNX tiers' models (int8 tiers calibrate on the given frames)")
+    parser.add_argument("--output", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    if args.export:
+        calibration = None
+        if args.frames_dir or args.recording:
+            calibration = load_recorded_frames(args.frames_dir, args.recording, args.max_frames)
+        report = {"exported": {tier: export_tier(tier, calibration_frames=calibration) for tier in args.export}}
+    else:
+        frames = load_recorded_frames(args.frames_dir, args.recording, args.max_frames)
+        report = run_benchmark(frames, args.tiers, args.reference, args.min_recall, args.min_agreement)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Per-session capture rate negotiation.
+The browser used to capture at a fixed 6 fps / 640x480 no matter how fast the
+backend consumed frames, so most frames were decoded only to be dropped. The
+controller measures how quickly a session's frames are actually analyzed and
+how full its queue is, and derives the fps and resolution the client should
+capture at.
+"""
+import threading
+import time
+from typing import NamedTuple, Optional, Tuple
+
+# Capture resolutions, best first; the controller steps down under load
+RESOLUTION_LADDER: Tuple[Tuple[int, int], ...] = ((640, 480), (480, 360), (320, 240))
+
+
+class CaptureConfig(NamedTuple):
+    """What the client should capture."""
+
+    fps: float  # 0 when video analysis is disabled for the session
+    width: int
+    height: int
+
+    def to_message(self) -> dict:
+        return {"type": "capture_config", "fps": self.fps, "width": self.width, "height": self.height}
+
+
+class CaptureRateController:
+    """Derives a session's target capture fps/resolution from measured processing latency."""
+
+    def __init__(self, max_fps: float = 6.0, min_fps: float = 1.0, loop_interval: float = 0.1,
+                 update_interval: float = 1.0, latency_smoothing: float = 0.2):
+        """
+        Args:
+            max_fps: Upper bound on capture fps (the client's default rate)
+            min_fps: Lowest fps requested while video is enabled
+            loop_interval: Idle time the observation loop sleeps between frames
+            update_interval: Minimum seconds between two config updates
+            latency_smoothing: EWMA weight of each new latency sample
+        """
+        self.max_fps = max_fps
+        self.min_fps = min_fps
+        self.loop_interval = loop_interval
+        self.update_interval = update_interval
+        self.latency_smoothing = latency_smoothing
+
+        self.ceiling_fps: Optional[float] = None  # admission control cap
+        self.latency: Optional[float] = None
+        self.queue_occupancy = 0.0
+        self._sent: Optional[CaptureConfig] = None
+        self._last_sent_at = 0.0
+        self._lock = threading.Lock()
+
+    def set_ceiling(self, max_fps: Optional[float]):
+        """Cap the target fps (0 disables video capture, None removes the cap)."""
+        with self._lock:
+            self.ceiling_fps = max_fps
+
+    def record_latency(self, seconds: float):
+        """Fold one frame's end-to-end analysis latency into the estimate."""
+        with self._lock:
+            if self.latency is None:
+                self.latency = seconds
+            else:
+                self.latency += self.latency_smoothing * (seconds - self.latency)
+
+    def record_queue(self, depth: int, capacity: int):
+        """Record how full the session's video queue was when a frame arrived."""
+        if capacity > 0:
+            self.queue_occupancy = depth / capacity
+
+    def current(self) -> CaptureConfig:
+        """Target config from the latest measurements."""
+        with self._lock:
+            ceiling = self.max_fps if self.ceiling_fps is None else min(self.max_fps, self.ceiling_fps)
+            if ceiling <= 0:
+                width, height = RESOLUTION_LADDER[-1]
+                return CaptureConfig(0.0, width, height)
+
+            if self.latency is None:
+                width, height = RESOLUTION_LADDER[0]
+                return CaptureConfig(float(ceiling), width, height)
+
+            # The loop analyzes one (the newest) frame per iteration; anything sent faster is dropped
+            sustainable = 1.0 / (self.latency + self.loop_interval)
+            if self.queue_occupancy > 0.5:
+                # Frames are piling up: the loop is stalled, back off hard
+                sustainable *= 1.0 - self.queue_occupancy
+            fps = max(self.min_fps, min(ceiling, sustainable))
+
+            # Smaller frames cut decode and detector cost once fps alone is not enough
+            shortfall = sustainable / ceiling
+            if shortfall >= 0.75:
+                rung = 0
+            elif shortfall >= 0.4:
+                rung = 1
+            else:
+                rung = 2
+            width, height = RESOLUTION_LADDER[min(rung, len(RESOLUTION_LADDER) - 1)]
+            return CaptureConfig(round(fps, 1), width, height)
+
+    def poll(self) -> Optional[CaptureConfig]:
+        """
+        Return a config to send to the client, or None if nothing changed
+        meaningfully since the last one (or it was sent too recently).
+        """
+        config = self.current()
+        now = time.monotonic()
+        sent = self._sent
+        if sent is not None:
+            if now - self._last_sent_at < self.update_interval:
+                return None
+            unchanged = (
+                (config.width, config.height) == (sent.width, sent.height)
+                and (config.fps == 0) == (sent.fps == 0)
+                and abs(config.fps - sent.fps) < 0.5
+            )
+            if unchanged:
+                return None
+        self._sent = config
+        self._last_sent_at = now
+        return config
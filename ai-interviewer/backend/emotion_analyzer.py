@@ -2,17 +2,129 @@
 Emotion detection using a lightweight local model.
 Uses a pretrained emotion classification model (no cloud calls).
 """
-import cv2
 import numpy as np
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence
 import os
+import threading
+
+try:
+    from .frame_context import FrameContext
+    from .lazy_imports import lazy_import
+except ImportError:
+    from frame_context import FrameContext
+    from lazy_imports import lazy_import
+
+cv2 = lazy_import("cv2")
+
+try:
+    from .observation_records import EmotionResult, FaceResult
+    from . import observation_config
+except ImportError:
+    from observation_records import EmotionResult, FaceResult
+    import observation_config
+
+# ONNX emotion classifier. The expected model is FER+ (ONNX model zoo
+# emotion-ferplus): a 64x64 gray face, raw 0-255 pixels in, one logit per label out.
+EMOTION_MODEL_PATH = observation_config.EMOTION_MODEL_PATH or os.path.join(os.path.dirname(__file__), "emotion_model.onnx")
+EMOTION_MODEL_INPUT_SIZE = 64
+EMOTION_MODEL_LABELS = ("Neutral", "Happy", "Surprised", "Sad", "Angry", "Disgusted", "Fearful", "Contempt")
+# Combined probability of these emotions that makes stress "medium" / "high"
+NEGATIVE_EMOTIONS = ("Sad", "Angry", "Disgusted", "Fearful", "Contempt")
+MODEL_STRESS_MEDIUM = 0.25
+MODEL_STRESS_HIGH = 0.5
+
+
+class EmotionModel:
+    """
+    cv2.dnn emotion classifier, loaded once per process and shared by every
+    EmotionAnalyzer in it. Several face crops (e.g. one per session in a
+    batch) are classified in one forward pass.
+    """
+
+    def __init__(self, net, labels: Sequence[str] = EMOTION_MODEL_LABELS,
+                 input_size: int = EMOTION_MODEL_INPUT_SIZE):
+        self.net = net
+        self.labels = tuple(labels)
+        self.input_size = input_size
+        # cv2.dnn.Net is not thread-safe
+        self.lock = threading.Lock()
+        # Cleared if the model turns out to have a fixed batch of one
+        self.batched = True
+
+    def preprocess(self, face_region: np.ndarray) -> np.ndarray:
+        """Gray face crop resized to the network input."""
+        size = (self.input_size, self.input_size)
+        if face_region.shape[:2] == size[::-1]:
+            return face_region
+        return cv2.resize(face_region, size, interpolation=cv2.INTER_AREA)
+
+    def classify(self, crops: Sequence[np.ndarray]) -> np.ndarray:
+        """
+        Label probabilities for preprocessed crops.
+
+        Returns:
+            (len(crops), len(labels)) array
+        """
+        if not crops:
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+        blob = cv2.dnn.blobFromImages(list(crops), 1.0, (self.input_size, self.input_size))
+        logits = None
+        with self.lock:
+            if self.batched and len(crops) > 1:
+                try:
+                    self.net.setInput(blob)
+                    output = self.net.forward()
+                    # A fixed-batch model may run on the first crop only
+                    # instead of failing; its output must not be reshaped
+                    if output.shape[0] == len(crops) and output.size == len(crops) * len(self.labels):
+                        logits = output.reshape(len(crops), -1)
+                    else:
+                        self.batched = False
+                except Exception:
+                    self.batched = False
+            if logits is None:
+                outputs = []
+                for i in range(len(crops)):
+                    self.net.setInput(blob[i:i + 1])
+                    outputs.append(self.net.forward().reshape(-1))
+                logits = np.stack(outputs)
+        logits = logits.astype(np.float32)
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+_MODELS: Dict[str, Optional[EmotionModel]] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def load_emotion_model(path: Optional[str] = None) -> Optional[EmotionModel]:
+    """The process-wide model for `path`, or None if it is missing or unreadable."""
+    path = path or EMOTION_MODEL_PATH
+    with _MODELS_LOCK:
+        if path not in _MODELS:
+            model = None
+            try:
+                if os.path.exists(path):
+                    net = cv2.dnn.readNetFromONNX(path)
+                    net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+                    net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+                    model = EmotionModel(net)
+            except Exception as e:
+                print(f"[INFO] Emotion model not available, using heuristic analysis: {e}")
+            _MODELS[path] = model
+        return _MODELS[path]
 
 
 class EmotionAnalyzer:
     """Detects emotion from facial expressions using local model."""
 
-    def __init__(self):
-        """Initialize with a pretrained emotion model."""
+    def __init__(self, model: Optional[EmotionModel] = None):
+        """
+        Initialize with a pretrained emotion model.
+
+        Args:
+            model: Use this model instead of the process-wide one from EMOTION_MODEL_PATH
+        """
         # Use OpenCV's DNN module with a local pretrained model
         # We'll use a simple face detector + emotion classifier
         self.face_cascade = cv2.CascadeClassifier(
@@ -20,61 +132,108 @@ class EmotionAnalyzer:
         )
         
         # Emotion labels
-        self.emotions = ["Angry", "Disgusted", "Fearful", "Happy", "Neutral", "Sad", "Surprised"]
+        self.emotions = list(EMOTION_MODEL_LABELS)
         
         # Try to load pretrained model (if available)
-        self.model_loaded = False
-        self._load_model()
+        self.model = model
+        self.model_loaded = model is not None
+        if model is None:
+            self._load_model()
         
         # Fallback: simple heuristic emotion detection
         self.use_heuristic = not self.model_loaded
 
     def _load_model(self):
         """Load pretrained emotion model if available."""
-        try:
-            # Try loading a pretrained model (e.g., from OpenCV or local file)
-            model_path = os.path.join(os.path.dirname(__file__), "emotion_model.onnx")
-            if os.path.exists(model_path):
-                self.net = cv2.dnn.readNetFromONNX(model_path)
-                self.model_loaded = True
-        except Exception as e:
-            print(f"[INFO] Emotion model not available, using heuristic analysis: {e}")
-            self.model_loaded = False
+        # Loaded once per process and shared with other analyzers
+        self.model = load_emotion_model()
+        self.model_loaded = self.model is not None
 
-    def analyze(self, frame: np.ndarray) -> Dict:
-        """Analyze frame for emotion."""
+    def analyze(self, frame: np.ndarray, context: Optional[FrameContext] = None,
+                face: Optional[FaceResult] = None, probabilities: Optional[np.ndarray] = None) -> EmotionResult:
+        """
+        Analyze frame for emotion.
+
+        Args:
+            frame: Input image (BGR format)
+            context: Preprocessing cache for this frame shared with other analyzers
+            face: FaceAnalyzer result for the same frame. When given, its face
+                  box is used instead of running a detection, and no face
+                  means no emotion analysis.
+            probabilities: Model output for this frame's face crop (see
+                           `face_crop`), already computed in a batch
+        """
+        if probabilities is not None:
+            return self._model_result(probabilities)
         if frame is None or frame.size == 0:
             return self._empty_result()
+        face_box = None
+        if face is not None:
+            if not face.get("face_detected"):
+                return self._empty_result()
+            face_box = face.get("face_box")
+        if context is None:
+            context = FrameContext(frame)
 
         if self.use_heuristic:
-            return self._heuristic_emotion(frame)
+            return self._heuristic_emotion(context, face_box)
         else:
-            return self._model_emotion(frame)
+            return self._model_emotion(context, face_box)
 
-    def _heuristic_emotion(self, frame: np.ndarray) -> Dict:
-        """Enhanced heuristic-based emotion detection with better preprocessing."""
-        try:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Apply histogram equalization for better feature extraction
-            gray = cv2.equalizeHist(gray)
-            
-            # Detect faces with optimized parameters
-            faces = self.face_cascade.detectMultiScale(
-                gray, 
-                scaleFactor=1.1, 
-                minNeighbors=5,
-                minSize=(50, 50)
+    def face_crop(self, frame: np.ndarray, context: Optional[FrameContext] = None,
+                  face: Optional[FaceResult] = None) -> Optional[np.ndarray]:
+        """
+        Model input for the frame's face, so crops from several frames can be
+        classified together with `classify_crops`. None without a model or face.
+        """
+        if self.model is None or frame is None or frame.size == 0:
+            return None
+        face_box = None
+        if face is not None:
+            if not face.get("face_detected"):
+                return None
+            face_box = face.get("face_box")
+        region = self._face_region(context if context is not None else FrameContext(frame), face_box, variant="gray")
+        return None if region is None else self.model.preprocess(region)
+
+    def classify_crops(self, crops: Sequence[np.ndarray]) -> List[np.ndarray]:
+        """Label probabilities for `face_crop` outputs, in one forward pass."""
+        return list(self.model.classify(crops))
+
+    def _face_region(self, context: FrameContext, face_box=None, variant: str = "equalized") -> Optional[np.ndarray]:
+        """
+        Gray crop of the face, from `face_box` or the analyzer's own detection.
+
+        Args:
+            variant: "equalized" for the heuristic; "gray" (raw pixels, as
+                     the model was trained on) for the emotion model
+        """
+        gray = context.gray if variant == "gray" else context.equalized
+        if face_box is None:
+            faces = context.detect(
+                "frontalface_default",
+                self.face_cascade,
+                variant="equalized",
+                scale_factor=1.1,
+                min_neighbors=5,
+                min_size=(50, 50),
             )
-            
             if len(faces) == 0:
-                return self._empty_result()
-            
-            # Analyze facial features in the detected face
-            x, y, w, h = faces[0]
-            face_region = gray[y:y+h, x:x+w]
-            
-            if face_region.size == 0:
+                return None
+            face_box = faces[0]
+
+        x, y, w, h = (int(v) for v in face_box)
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(context.width, x + w), min(context.height, y + h)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return gray[y0:y1, x0:x1]
+
+    def _heuristic_emotion(self, context: FrameContext, face_box=None) -> EmotionResult:
+        """Enhanced heuristic-based emotion detection with better preprocessing."""
+        try:
+            face_region = self._face_region(context, face_box)
+            if face_region is None:
                 return self._empty_result()
             
             # Resize for consistent analysis
@@ -172,28 +331,52 @@ class EmotionAnalyzer:
                 edge_density
             )
             
-            return {
-                "emotion": dominant_emotion,
-                "confidence": float(confidence_scores.get(dominant_emotion, 5.0)),
-                "emotion_scores": {k: float(v) for k, v in confidence_scores.items()},
-                "stress_level": stress_level,
-                "brightness_variance": float(brightness_var),
-                "eye_brightness": float(eye_brightness),
-                "mouth_brightness": float(mouth_brightness),
-                "edge_density": float(edge_density),
-                "cheek_symmetry": float(cheek_symmetry),
-            }
+            return EmotionResult(
+                emotion=dominant_emotion,
+                confidence=float(confidence_scores.get(dominant_emotion, 5.0)),
+                emotion_scores={k: float(v) for k, v in confidence_scores.items()},
+                stress_level=stress_level,
+                brightness_variance=float(brightness_var),
+                eye_brightness=float(eye_brightness),
+                mouth_brightness=float(mouth_brightness),
+                edge_density=float(edge_density),
+                cheek_symmetry=float(cheek_symmetry),
+            )
         except Exception as e:
             print(f"[ERROR] Emotion analysis failed: {e}")
             import traceback
             traceback.print_exc()
             return self._empty_result()
 
-    def _model_emotion(self, frame: np.ndarray) -> Dict:
+    def _model_emotion(self, context: FrameContext, face_box=None) -> EmotionResult:
         """Emotion detection using pretrained model."""
-        # Placeholder for model-based detection
-        # If model is available, this would run the inference
-        return self._heuristic_emotion(frame)
+        try:
+            face_region = self._face_region(context, face_box, variant="gray")
+            if face_region is None:
+                return self._empty_result()
+            return self._model_result(self.model.classify([self.model.preprocess(face_region)])[0])
+        except Exception as e:
+            print(f"[ERROR] Emotion model inference failed, using heuristic analysis: {e}")
+            return self._heuristic_emotion(context, face_box)
+
+    def _model_result(self, probabilities: np.ndarray) -> EmotionResult:
+        """Result from the model's label probabilities (scores on the heuristic's 0-10 scale)."""
+        scores = {label: float(p) * 10.0 for label, p in zip(self.model.labels, probabilities)}
+        dominant_emotion = max(scores, key=scores.get)
+        negative = sum(scores.get(label, 0.0) for label in NEGATIVE_EMOTIONS) / 10.0
+        if negative >= MODEL_STRESS_HIGH:
+            stress_level = "high"
+        elif negative >= MODEL_STRESS_MEDIUM:
+            stress_level = "medium"
+        else:
+            stress_level = "low"
+        return EmotionResult(
+            emotion=dominant_emotion,
+            confidence=scores[dominant_emotion],
+            emotion_scores=scores,
+            stress_level=stress_level,
+            brightness_variance=0.0,
+        )
 
     @staticmethod
     def _estimate_stress_level_enhanced(brightness_var: float, eye_var: float, 
@@ -245,14 +428,14 @@ class EmotionAnalyzer:
         else:
             return "low"
 
-    def _empty_result(self) -> Dict:
-        return {
-            "emotion": "unknown",
-            "confidence": 0.0,
-            "emotion_scores": {},
-            "stress_level": "unknown",
-            "brightness_variance": 0.0,
-        }
+    def _empty_result(self) -> EmotionResult:
+        return EmotionResult(
+            emotion="unknown",
+            confidence=0.0,
+            emotion_scores={},
+            stress_level="unknown",
+            brightness_variance=0.0,
+        )
 
     def reset(self):
         """Reset any state."""
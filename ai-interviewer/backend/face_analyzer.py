@@ -2,31 +2,77 @@
 Face and gaze detection using MediaPipe with YOLOv8 for robust multi-person detection.
 LOCAL ONLY - No cloud dependencies.
 """
-import cv2
 import numpy as np
-from typing import Dict, Optional, Tuple
+from typing import Optional, Tuple
+import os
 import time
 
 try:
-    import mediapipe as mp
-    from mediapipe.tasks import python
-    from mediapipe.tasks.python import vision
-    MEDIAPIPE_AVAILABLE = True
+    from .observation_records import FaceResult
 except ImportError:
-    MEDIAPIPE_AVAILABLE = False
+    from observation_records import FaceResult
+
+try:
+    from .frame_context import FrameContext
+    from .landmark_geometry import (
+        LEFT_EYE, LEFT_IRIS, RIGHT_EYE, RIGHT_IRIS, eye_aspect_ratios, face_box as landmark_face_box,
+        iris_gaze_offset, landmarks_to_array, pose_image_points,
+    )
+    from .lazy_imports import lazy_import, module_available
+    from .metrics import stage
+    from .roi_tracker import ROITracker
+except ImportError:
+    from frame_context import FrameContext
+    from landmark_geometry import (
+        LEFT_EYE, LEFT_IRIS, RIGHT_EYE, RIGHT_IRIS, eye_aspect_ratios, face_box as landmark_face_box,
+        iris_gaze_offset, landmarks_to_array, pose_image_points,
+    )
+    from lazy_imports import lazy_import, module_available
+    from metrics import stage
+    from roi_tracker import ROITracker
+
+# cv2 and MediaPipe are imported on first use so importing the app stays fast
+cv2 = lazy_import("cv2")
+MEDIAPIPE_AVAILABLE = module_available("mediapipe")
+
+# Haar face checks run on a gray copy at most this wide. The smallest face
+# they accept is 80 px at full size, still well above the 24 px cascade window.
+CASCADE_DETECTION_WIDTH = 320
+
+# solvePnP method for head pose, by name. "iterative" (Levenberg-Marquardt,
+# the original solver) starts from the previous frame's pose; "sqpnp" is a
+# non-iterative global solver, about 3x cheaper and within ~1 degree of it.
+# (EPnP is as cheap but too inaccurate with only six points.)
+HEAD_POSE_SOLVERS = {
+    "iterative": "SOLVEPNP_ITERATIVE",
+    "sqpnp": "SOLVEPNP_SQPNP",
+}
+HEAD_POSE_SOLVER = os.environ.get("HEAD_POSE_SOLVER") or "iterative"
 
 # Import YOLOv8 for robust person detection
 try:
-    from robust_face_detector import RobustFaceDetector
-    YOLO_AVAILABLE = True
+    try:
+        from .robust_face_detector import RobustFaceDetector, person_detection_available
+    except ImportError:
+        from robust_face_detector import RobustFaceDetector, person_detection_available
 except ImportError:
-    YOLO_AVAILABLE = False
+    def person_detection_available() -> bool:
+        return False
 
 
 class FaceAnalyzer:
     """Detects face presence, head direction, eye gaze, and blink rate."""
 
-    def __init__(self):
+    def __init__(self, pose_solver: Optional[str] = None):
+        """
+        Initialize MediaPipe Face Mesh with iris tracking and YOLOv8 for multi-person detection.
+
+        Args:
+            pose_solver: Head pose solver (see HEAD_POSE_SOLVERS); defaults to HEAD_POSE_SOLVER
+        """
+        pose_solver = pose_solver or HEAD_POSE_SOLVER
+        if pose_solver not in HEAD_POSE_SOLVERS:
+            raise ValueError(f"Unknown head pose solver {pose_solver!r}; choose from {', '.join(HEAD_POSE_SOLVERS)}")
         if not MEDIAPIPE_AVAILABLE:
             raise RuntimeError("MediaPipe not available. Install with: pip install mediapipe")
         
@@ -47,9 +93,9 @@ class FaceAnalyzer:
         
         # Initialize YOLOv8 for robust multi-person detection
         self.yolo_detector = None
-        if YOLO_AVAILABLE:
+        if person_detection_available():
             try:
-                self.yolo_detector = RobustFaceDetector(model_size="s")
+                self.yolo_detector = RobustFaceDetector()
             except Exception as e:
                 print(f"Warning: Could not initialize YOLOv8 detector: {e}")
                 self.yolo_detector = None
@@ -59,13 +105,11 @@ class FaceAnalyzer:
             cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
         )
         
-        # Iris landmark indices (MediaPipe Face Mesh with iris)
-        self.LEFT_IRIS = [474, 475, 476, 477]
-        self.RIGHT_IRIS = [469, 470, 471, 472]
-        
-        # Eye landmark indices for aspect ratio
-        self.LEFT_EYE = [362, 385, 387, 263, 373, 380]
-        self.RIGHT_EYE = [33, 160, 158, 133, 153, 144]
+        # Iris and eye landmark indices (MediaPipe Face Mesh with iris)
+        self.LEFT_IRIS = list(LEFT_IRIS)
+        self.RIGHT_IRIS = list(RIGHT_IRIS)
+        self.LEFT_EYE = list(LEFT_EYE)
+        self.RIGHT_EYE = list(RIGHT_EYE)
         
         # Face model points for 3D head pose
         self.model_points = np.array([
@@ -76,41 +120,107 @@ class FaceAnalyzer:
             (-150.0, -150.0, -125.0),    # Left mouth corner
             (150.0, -150.0, -125.0)      # Right mouth corner
         ], dtype=np.float64)
+        self.pose_solver = pose_solver
+        # Camera intrinsics for the session's resolution: ((w, h), camera_matrix, dist_coeffs)
+        self._intrinsics = None
+        # Last head pose (rotation, translation) for warm-starting the iterative solver
+        self._pose_guess: Optional[Tuple[np.ndarray, np.ndarray]] = None
         
         self.last_blink_time = time.time()
         self.blink_count = 0
         self.looking_away_start = None
         self.eye_aspect_ratio_threshold = 0.21
+        
+        # Analyze a crop around the last face instead of the whole frame
+        self.roi_tracker = ROITracker()
+        # Whether the last analyze() ran the full-frame (multi-person) checks
+        self.last_full_frame = False
+
+    @property
+    def person_check_pending(self) -> bool:
+        """True while a possible second person awaits confirmation; every frame is then analyzed in full."""
+        return self.yolo_detector is not None and self.yolo_detector.positive_pending
 
-    def analyze(self, frame: np.ndarray) -> Dict:
-        """Analyze frame for face, gaze, blink, and head direction."""
+    def analyze(self, frame: np.ndarray, person_count: Optional[int] = None,
+                context: Optional[FrameContext] = None, full_frame: bool = False) -> FaceResult:
+        """
+        Analyze frame for face, gaze, blink, and head direction.
+        
+        Args:
+            frame: Input image (BGR format)
+            person_count: YOLO person count for this frame if it was already
+                          computed in a batch; otherwise the detector runs here
+            context: Preprocessing cache for this frame shared with other analyzers
+            full_frame: Run the full-frame checks even if a face is being tracked
+                        (always done while `person_check_pending`)
+        """
+        self.last_full_frame = False
         if frame is None or frame.size == 0:
             return self._empty_result()
 
         h, w, _ = frame.shape
-        
+        if context is None:
+            context = FrameContext(frame)
+
+        roi = None if full_frame or self.person_check_pending else self.roi_tracker.next_roi()
+        if roi is not None:
+            result = self._analyze_roi(frame, h, w, context, roi)
+            if result is not None:
+                self.roi_tracker.update(result.get("face_box"), (w, h), full_frame=False)
+                return result
+            # Face lost inside the crop: fall through to a full-frame pass
+
+        self.last_full_frame = True
+        result = self._analyze_full_frame(frame, h, w, context, person_count)
+        if not result.get("face_detected") or result.get("multiple_faces"):
+            # The next face may be someone else; do not start its pose from this one
+            self._pose_guess = None
+        tracked_box = None if result.get("multiple_faces") else result.get("face_box")
+        self.roi_tracker.update(tracked_box, (w, h), full_frame=True)
+        return result
+
+    def _analyze_roi(self, frame: np.ndarray, h: int, w: int, context: FrameContext,
+                     roi: Tuple[int, int, int, int]) -> Optional[FaceResult]:
+        """Single-face analysis around the tracked face; None if exactly one face was not found there."""
+        if self.face_mesh is not None:
+            # FaceMesh in tracking mode already restricts landmark inference to
+            # the previous face region; handing it crops would reset that state
+            with stage("face_mesh"):
+                results = self.face_mesh.process(context.rgb)
+            if not results.multi_face_landmarks or len(results.multi_face_landmarks) != 1:
+                return None
+            return self._analyze_with_mesh(frame, h, w, results)
+
+        faces = self._detect_faces(context.crop(roi), frame_width=w)
+        if len(faces) != 1:
+            return None
+        return self._analyze_with_cascade(frame, h, w, faces + np.array([roi[0], roi[1], 0, 0], dtype=np.int32))
+
+    def _analyze_full_frame(self, frame: np.ndarray, h: int, w: int, context: FrameContext,
+                            person_count: Optional[int]) -> FaceResult:
+        """Multi-person check and single-face analysis on the whole frame."""
         # ROBUST MULTI-PERSON DETECTION: Use YOLOv8 first
         if self.yolo_detector is not None:
             try:
                 # Check for multiple persons using YOLOv8 (more reliable)
-                is_multiple = self.yolo_detector.is_multiple_persons(frame)
+                is_multiple = self.yolo_detector.is_multiple_persons(frame, person_count=person_count)
                 
                 if is_multiple:
-                    return {
-                        "face_detected": True,
-                        "multiple_faces": True,
-                        "face_count": 2,  # At least 2 detected
-                        "violation": "MULTIPLE_PERSONS_DETECTED",
-                        "head_yaw": 0.0,
-                        "head_pitch": 0.0,
-                        "gaze_direction": "violation",
-                        "blink_detected": False,
-                        "blink_count": self.blink_count,
-                        "eye_aspect_ratio": 0.0,
-                        "looking_away": True,
-                        "looking_at_camera": False,
-                        "eye_contact_confidence": 0.0
-                    }
+                    return FaceResult(
+                        face_detected=True,
+                        multiple_faces=True,
+                        face_count=2,  # At least 2 detected
+                        violation="MULTIPLE_PERSONS_DETECTED",
+                        head_yaw=0.0,
+                        head_pitch=0.0,
+                        gaze_direction="violation",
+                        blink_detected=False,
+                        blink_count=self.blink_count,
+                        eye_aspect_ratio=0.0,
+                        looking_away=True,
+                        looking_at_camera=False,
+                        eye_contact_confidence=0.0
+                    )
             except Exception as e:
                 print(f"YOLOv8 detection warning: {e}")
                 # Fall back to Haar Cascade if YOLOv8 fails
@@ -118,71 +228,68 @@ class FaceAnalyzer:
         
         # Fallback: Check for multiple faces using Haar Cascade (only if YOLOv8 unavailable)
         if self.yolo_detector is None:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(
-                gray, 
-                scaleFactor=1.3,  # Increased to reduce false positives
-                minNeighbors=6,   # Increased to reduce false positives
-                minSize=(80, 80)  # Larger minimum face size
-            )
+            faces = self._detect_faces(context)
             
             if len(faces) > 1:
-                return {
-                    "face_detected": True,
-                    "multiple_faces": True,
-                    "face_count": len(faces),
-                    "violation": "MULTIPLE_PERSONS_DETECTED",
-                    "head_yaw": 0.0,
-                    "head_pitch": 0.0,
-                    "gaze_direction": "violation",
-                    "blink_detected": False,
-                    "blink_count": self.blink_count,
-                    "eye_aspect_ratio": 0.0,
-                    "looking_away": True,
-                    "looking_at_camera": False,
-                    "eye_contact_confidence": 0.0
-                }
+                return FaceResult(
+                    face_detected=True,
+                    multiple_faces=True,
+                    face_count=len(faces),
+                    violation="MULTIPLE_PERSONS_DETECTED",
+                    head_yaw=0.0,
+                    head_pitch=0.0,
+                    gaze_direction="violation",
+                    blink_detected=False,
+                    blink_count=self.blink_count,
+                    eye_aspect_ratio=0.0,
+                    looking_away=True,
+                    looking_at_camera=False,
+                    eye_contact_confidence=0.0
+                )
         
         # Use MediaPipe for detailed single-person analysis
         if self.face_mesh is not None:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.face_mesh.process(rgb_frame)
+            with stage("face_mesh"):
+                results = self.face_mesh.process(context.rgb)
             
             if results.multi_face_landmarks and len(results.multi_face_landmarks) == 1:
                 return self._analyze_with_mesh(frame, h, w, results)
         
         # Fallback: Use Haar Cascade for single face analysis if MediaPipe unavailable
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(
-            gray, 
-            scaleFactor=1.3, 
-            minNeighbors=6,
-            minSize=(80, 80)
-        )
+        # (same detection as the multi-face check, so it is reused when that ran)
+        faces = self._detect_faces(context)
         
         if len(faces) == 1:
-            return self._analyze_with_cascade(frame, h, w)
+            return self._analyze_with_cascade(frame, h, w, faces)
         else:
             return self._empty_result()
+
+    def _detect_faces(self, context: FrameContext, frame_width: Optional[int] = None) -> np.ndarray:
+        """
+        Haar face boxes for the frame (or a crop of it), computed once per frame.
+        A crop of a `frame_width`-wide frame is detected at the frame's detection scale.
+        """
+        max_width = CASCADE_DETECTION_WIDTH
+        if frame_width and frame_width > CASCADE_DETECTION_WIDTH:
+            max_width = max(1, round(context.width * CASCADE_DETECTION_WIDTH / frame_width))
+        return context.detect(
+            "frontalface_default",
+            self.face_cascade,
+            scale_factor=1.3,   # Increased to reduce false positives
+            min_neighbors=6,    # Increased to reduce false positives
+            min_size=(80, 80),  # Larger minimum face size
+            max_width=max_width,
+        )
     
-    def _analyze_with_mesh(self, frame: np.ndarray, h: int, w: int, results) -> Dict:
+    def _analyze_with_mesh(self, frame: np.ndarray, h: int, w: int, results) -> FaceResult:
         """Analyze using MediaPipe Face Mesh with iris tracking."""
         if not results.multi_face_landmarks:
             return self._empty_result()
 
-        landmarks = results.multi_face_landmarks[0]
-        
-        # Extract eye landmarks
-        left_eye = [landmarks.landmark[i] for i in self.LEFT_EYE]
-        right_eye = [landmarks.landmark[i] for i in self.RIGHT_EYE]
-        
-        # Extract iris landmarks (center of each iris)
-        left_iris_center = self._get_iris_center(landmarks, self.LEFT_IRIS)
-        right_iris_center = self._get_iris_center(landmarks, self.RIGHT_IRIS)
+        points = landmarks_to_array(results.multi_face_landmarks[0])
         
         # Blink detection using eye aspect ratio
-        left_ear = self._eye_aspect_ratio(left_eye)
-        right_ear = self._eye_aspect_ratio(right_eye)
+        left_ear, right_ear = eye_aspect_ratios(points)
         ear = (left_ear + right_ear) / 2
         
         blink_detected = ear < self.eye_aspect_ratio_threshold
@@ -191,10 +298,11 @@ class FaceAnalyzer:
             self.last_blink_time = time.time()
         
         # Calculate 3D head pose using solvePnP
-        yaw, pitch = self._calculate_3d_head_pose(landmarks, h, w)
+        yaw, pitch = self._calculate_3d_head_pose(points, h, w)
         
         # Accurate gaze direction using iris position
-        gaze_dir, gaze_offset = self._calculate_iris_gaze(left_iris_center, right_iris_center, left_eye, right_eye)
+        gaze_offset = float(iris_gaze_offset(points))
+        gaze_dir = self._gaze_direction(gaze_offset)
         
         # Eye contact detection combining head pose and iris gaze
         # More accurate: head facing forward AND irises centered
@@ -211,36 +319,36 @@ class FaceAnalyzer:
         # Looking away detection (more strict)
         looking_away = abs(yaw) > 25 or abs(pitch) > 20 or abs(gaze_offset) > 0.25
         
-        return {
-            "face_detected": True,
-            "multiple_faces": False,
-            "face_count": 1,
-            "head_yaw": float(yaw),
-            "head_pitch": float(pitch),
-            "gaze_direction": gaze_dir,
-            "gaze_offset": float(gaze_offset),
-            "blink_detected": blink_detected,
-            "blink_count": self.blink_count,
-            "eye_aspect_ratio": float(ear),
-            "looking_away": looking_away,
-            "looking_at_camera": looking_at_camera,
-            "eye_contact_confidence": float(eye_contact_confidence),
-            "eye_aspect_ratio_left": float(left_ear),
-            "eye_aspect_ratio_right": float(right_ear),
-            "iris_confidence": float(iris_confidence),
-            "head_confidence": float(head_confidence),
-        }
-    
-    def _analyze_with_cascade(self, frame: np.ndarray, h: int, w: int) -> Dict:
-        """Analyze using Haar Cascade (fallback)."""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
-        
+        face_box = landmark_face_box(points, h, w)
+        
+        return FaceResult(
+            face_detected=True,
+            multiple_faces=False,
+            face_count=1,
+            head_yaw=float(yaw),
+            head_pitch=float(pitch),
+            gaze_direction=gaze_dir,
+            gaze_offset=float(gaze_offset),
+            blink_detected=bool(blink_detected),
+            blink_count=self.blink_count,
+            eye_aspect_ratio=float(ear),
+            looking_away=looking_away,
+            looking_at_camera=looking_at_camera,
+            eye_contact_confidence=float(eye_contact_confidence),
+            eye_aspect_ratio_left=float(left_ear),
+            eye_aspect_ratio_right=float(right_ear),
+            iris_confidence=float(iris_confidence),
+            head_confidence=float(head_confidence),
+            face_box=face_box,
+        )
+
+    def _analyze_with_cascade(self, frame: np.ndarray, h: int, w: int, faces: np.ndarray) -> FaceResult:
+        """Analyze using Haar Cascade (fallback) from the detected face boxes."""
         if len(faces) == 0:
             return self._empty_result()
         
         # Simple heuristic-based analysis
-        x, y, fw, fh = faces[0]
+        x, y, fw, fh = (int(v) for v in faces[0])
         face_center_x = x + fw / 2
         face_center_y = y + fh / 2
         
@@ -253,90 +361,74 @@ class FaceAnalyzer:
         looking_at_camera = abs(yaw) < 15 and abs(pitch) < 10
         eye_contact_confidence = max(0.0, 1.0 - (abs(yaw) / 30.0 + abs(pitch) / 25.0) / 2.0)
         
-        return {
-            "face_detected": True,
-            "multiple_faces": False,
-            "face_count": 1,
-            "head_yaw": float(yaw),
-            "head_pitch": float(pitch),
-            "gaze_direction": "center",
-            "blink_detected": False,
-            "blink_count": self.blink_count,
-            "eye_aspect_ratio": 0.3,
-            "looking_away": looking_away,
-            "looking_at_camera": looking_at_camera,
-            "eye_contact_confidence": float(eye_contact_confidence),
-            "eye_aspect_ratio_left": 0.3,
-            "eye_aspect_ratio_right": 0.3,
-        }
-
-    def _empty_result(self) -> Dict:
-        return {
-            "face_detected": False,
-            "head_yaw": 0.0,
-            "head_pitch": 0.0,
-            "gaze_direction": "unknown",
-            "blink_detected": False,
-            "blink_count": self.blink_count,
-            "eye_aspect_ratio": 0.0,
-            "looking_away": True,
-            "eye_aspect_ratio_left": 0.0,
-            "eye_aspect_ratio_right": 0.0,
-        }
+        return FaceResult(
+            face_detected=True,
+            multiple_faces=False,
+            face_count=1,
+            head_yaw=float(yaw),
+            head_pitch=float(pitch),
+            gaze_direction="center",
+            blink_detected=False,
+            blink_count=self.blink_count,
+            eye_aspect_ratio=0.3,
+            looking_away=looking_away,
+            looking_at_camera=looking_at_camera,
+            eye_contact_confidence=float(eye_contact_confidence),
+            eye_aspect_ratio_left=0.3,
+            eye_aspect_ratio_right=0.3,
+            face_box=(x, y, fw, fh),
+        )
 
-    @staticmethod
-    def _eye_aspect_ratio(eye_landmarks) -> float:
-        """Calculate eye aspect ratio from 6 landmarks."""
-        if len(eye_landmarks) < 6:
-            return 0.0
-        
-        p1, p2, p3, p4, p5, p6 = eye_landmarks
-        
-        dist_vertical_1 = np.sqrt((p2.x - p5.x) ** 2 + (p2.y - p5.y) ** 2)
-        dist_vertical_2 = np.sqrt((p3.x - p4.x) ** 2 + (p3.y - p4.y) ** 2)
-        dist_horizontal = np.sqrt((p1.x - p6.x) ** 2 + (p1.y - p6.y) ** 2)
-        
-        if dist_horizontal == 0:
-            return 0.0
-        
-        return (dist_vertical_1 + dist_vertical_2) / (2.0 * dist_horizontal)
+    def _empty_result(self) -> FaceResult:
+        return FaceResult(
+            face_detected=False,
+            head_yaw=0.0,
+            head_pitch=0.0,
+            gaze_direction="unknown",
+            blink_detected=False,
+            blink_count=self.blink_count,
+            eye_aspect_ratio=0.0,
+            looking_away=True,
+            eye_aspect_ratio_left=0.0,
+            eye_aspect_ratio_right=0.0,
+        )
 
-    def _calculate_3d_head_pose(self, landmarks, h: int, w: int) -> Tuple[float, float]:
-        """Calculate accurate 3D head pose using solvePnP."""
+    def _calculate_3d_head_pose(self, points: np.ndarray, h: int, w: int) -> Tuple[float, float]:
+        """Calculate accurate 3D head pose using solvePnP on the (N, 3) landmark array."""
         try:
-            # Extract 2D image points from landmarks
-            image_points = np.array([
-                (landmarks.landmark[1].x * w, landmarks.landmark[1].y * h),      # Nose tip
-                (landmarks.landmark[152].x * w, landmarks.landmark[152].y * h),   # Chin
-                (landmarks.landmark[263].x * w, landmarks.landmark[263].y * h),   # Left eye left corner
-                (landmarks.landmark[33].x * w, landmarks.landmark[33].y * h),     # Right eye right corner
-                (landmarks.landmark[287].x * w, landmarks.landmark[287].y * h),   # Left mouth corner
-                (landmarks.landmark[57].x * w, landmarks.landmark[57].y * h)      # Right mouth corner
-            ], dtype=np.float64)
+            # 2D image points matching self.model_points
+            image_points = pose_image_points(points, h, w)
             
-            # Camera internals (approximation)
-            focal_length = w
-            center = (w / 2, h / 2)
-            camera_matrix = np.array([
-                [focal_length, 0, center[0]],
-                [0, focal_length, center[1]],
-                [0, 0, 1]
-            ], dtype=np.float64)
+            camera_matrix, dist_coeffs = self._camera_intrinsics(h, w)
+            solver = getattr(cv2, HEAD_POSE_SOLVERS[self.pose_solver])
             
-            # Assume no lens distortion
-            dist_coeffs = np.zeros((4, 1))
+            # Solve PnP, starting from the last pose when the solver can use it
+            if self.pose_solver == "iterative" and self._pose_guess is not None:
+                rotation_guess, translation_guess = self._pose_guess
+                success, rotation_vector, translation_vector = cv2.solvePnP(
+                    self.model_points,
+                    image_points,
+                    camera_matrix,
+                    dist_coeffs,
+                    rotation_guess.copy(),
+                    translation_guess.copy(),
+                    useExtrinsicGuess=True,
+                    flags=solver
+                )
+            else:
+                success, rotation_vector, translation_vector = cv2.solvePnP(
+                    self.model_points,
+                    image_points,
+                    camera_matrix,
+                    dist_coeffs,
+                    flags=solver
+                )
             
-            # Solve PnP
-            success, rotation_vector, translation_vector = cv2.solvePnP(
-                self.model_points,
-                image_points,
-                camera_matrix,
-                dist_coeffs,
-                flags=cv2.SOLVEPNP_ITERATIVE
-            )
-            
-            if not success:
+            # A head behind the camera means the solve diverged; start over next time
+            if not success or translation_vector[2, 0] <= 0:
+                self._pose_guess = None
                 return 0.0, 0.0
+            self._pose_guess = (rotation_vector, translation_vector)
             
             # Convert rotation vector to Euler angles
             rotation_matrix, _ = cv2.Rodrigues(rotation_vector)
@@ -355,48 +447,29 @@ class FaceAnalyzer:
             
         except Exception as e:
             # Fallback to simple estimation
+            self._pose_guess = None
             return 0.0, 0.0
+
+    def _camera_intrinsics(self, h: int, w: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate camera matrix (focal length = width) and zero distortion, cached per resolution."""
+        if self._intrinsics is None or self._intrinsics[0] != (w, h):
+            camera_matrix = np.array([
+                [w, 0, w / 2],
+                [0, w, h / 2],
+                [0, 0, 1]
+            ], dtype=np.float64)
+            self._intrinsics = ((w, h), camera_matrix, np.zeros((4, 1)))
+            self._pose_guess = None
+        return self._intrinsics[1], self._intrinsics[2]
     
     @staticmethod
-    def _get_iris_center(landmarks, iris_indices) -> Tuple[float, float]:
-        """Calculate center of iris from landmarks."""
-        iris_x = sum(landmarks.landmark[i].x for i in iris_indices) / len(iris_indices)
-        iris_y = sum(landmarks.landmark[i].y for i in iris_indices) / len(iris_indices)
-        return iris_x, iris_y
-    
-    @staticmethod
-    def _calculate_iris_gaze(left_iris, right_iris, left_eye, right_eye) -> Tuple[str, float]:
-        """Calculate gaze direction from iris position relative to eye."""
-        # Calculate iris position relative to eye boundaries
-        # Left eye boundaries
-        left_eye_left = left_eye[0].x
-        left_eye_right = left_eye[3].x
-        left_eye_width = abs(left_eye_right - left_eye_left)
-        
-        # Right eye boundaries
-        right_eye_left = right_eye[0].x
-        right_eye_right = right_eye[3].x
-        right_eye_width = abs(right_eye_right - right_eye_left)
-        
-        if left_eye_width == 0 or right_eye_width == 0:
-            return "center", 0.0
-        
-        # Calculate iris offset from eye center (-1 to 1, 0 is center)
-        left_iris_offset = (left_iris[0] - (left_eye_left + left_eye_right) / 2) / (left_eye_width / 2)
-        right_iris_offset = (right_iris[0] - (right_eye_left + right_eye_right) / 2) / (right_eye_width / 2)
-        
-        # Average offset
-        avg_offset = (left_iris_offset + right_iris_offset) / 2
-        
-        # Determine gaze direction
-        if avg_offset < -0.2:
-            gaze_dir = "left"
-        elif avg_offset > 0.2:
-            gaze_dir = "right"
-        else:
-            gaze_dir = "center"
-        
-        return gaze_dir, float(avg_offset)
+    def _gaze_direction(gaze_offset: float) -> str:
+        """Gaze direction from the averaged iris offset."""
+        if gaze_offset < -0.2:
+            return "left"
+        elif gaze_offset > 0.2:
+            return "right"
+        return "center"
 
     @staticmethod
     def _estimate_gaze_direction(left_eye, right_eye) -> str:
@@ -429,3 +502,5 @@ class FaceAnalyzer:
         self.blink_count = 0
         self.looking_away_start = None
         self.last_blink_time = time.time()
+        self._pose_guess = None
+        self.roi_tracker.reset()
@@ -0,0 +1,127 @@
+"""
+Per-frame preprocessing shared by the analyzers.
+FaceAnalyzer and EmotionAnalyzer each used to convert the same frame to
+gray/RGB and run their own Haar detections. A FrameContext is built once per
+frame and computes every derived image (and detection result) on first use,
+so each pixel pass happens at most once per frame.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+try:
+    from .lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+cv2 = lazy_import("cv2")
+
+
+class FrameContext:
+    """Lazily computed, cached views of one BGR frame."""
+
+    __slots__ = ("bgr", "height", "width", "origin", "_gray", "_rgb", "_equalized", "_downscaled", "_detections")
+
+    def __init__(self, frame: np.ndarray):
+        self.bgr = frame
+        self.height, self.width = frame.shape[:2]
+        # Top-left corner in the original frame (non-zero for crops)
+        self.origin = (0, 0)
+        self._gray = None
+        self._rgb = None
+        self._equalized = None
+        self._downscaled: Dict[Tuple[str, int], Tuple[np.ndarray, float]] = {}
+        self._detections: Dict[tuple, np.ndarray] = {}
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """RGB copy for MediaPipe (treat as read-only)."""
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    @property
+    def equalized(self) -> np.ndarray:
+        """Histogram-equalized gray image."""
+        if self._equalized is None:
+            self._equalized = cv2.equalizeHist(self.gray)
+        return self._equalized
+
+    def crop(self, box: Tuple[int, int, int, int]) -> "FrameContext":
+        """
+        Context for a region of this frame (x, y, w, h). Its BGR image, and its
+        gray image if this frame's is already computed, are views, not copies.
+        """
+        x, y, w, h = box
+        sub = FrameContext(self.bgr[y:y + h, x:x + w])
+        sub.origin = (self.origin[0] + x, self.origin[1] + y)
+        if self._gray is not None:
+            sub._gray = self._gray[y:y + h, x:x + w]
+        return sub
+
+    def _variant(self, variant: str) -> np.ndarray:
+        if variant == "gray":
+            return self.gray
+        if variant == "equalized":
+            return self.equalized
+        raise ValueError(f"Unknown image variant {variant!r}")
+
+    def downscaled(self, variant: str, max_width: int) -> Tuple[np.ndarray, float]:
+        """
+        A gray variant shrunk to at most `max_width` pixels wide.
+
+        Returns:
+            (image, scale) where scale maps downscaled coordinates back to the frame.
+        """
+        key = (variant, max_width)
+        cached = self._downscaled.get(key)
+        if cached is None:
+            image = self._variant(variant)
+            if self.width <= max_width:
+                cached = (image, 1.0)
+            else:
+                scale = self.width / max_width
+                size = (max_width, max(1, int(round(self.height / scale))))
+                cached = (cv2.resize(image, size, interpolation=cv2.INTER_AREA), scale)
+            self._downscaled[key] = cached
+        return cached
+
+    def detect(self, name: str, cascade, variant: str = "gray", scale_factor: float = 1.1,
+               min_neighbors: int = 3, min_size: Tuple[int, int] = (0, 0), max_width: int = 0) -> np.ndarray:
+        """
+        Run (or reuse) a cascade detection on a gray variant of the frame.
+
+        Args:
+            name: Identifies the cascade model; equal names must mean the same model
+            cascade: cv2.CascadeClassifier to run on a cache miss
+            variant: "gray" or "equalized"
+            scale_factor, min_neighbors, min_size: detectMultiScale parameters,
+                in full-frame pixels
+            max_width: Detect on a copy downscaled to this width (0 = full size);
+                boxes are returned in full-frame coordinates
+
+        Returns:
+            (N, 4) int array of x, y, w, h boxes.
+        """
+        key = (name, variant, scale_factor, min_neighbors, tuple(min_size), max_width)
+        boxes = self._detections.get(key)
+        if boxes is None:
+            if max_width:
+                image, scale = self.downscaled(variant, max_width)
+            else:
+                image, scale = self._variant(variant), 1.0
+            scaled_min = (int(min_size[0] / scale), int(min_size[1] / scale))
+            found = cascade.detectMultiScale(
+                image, scaleFactor=scale_factor, minNeighbors=min_neighbors, minSize=scaled_min
+            )
+            boxes = np.asarray(found, dtype=np.int32).reshape(-1, 4)
+            if scale != 1.0:
+                boxes = np.round(boxes * scale).astype(np.int32)
+            self._detections[key] = boxes
+        return boxes
@@ -0,0 +1,141 @@
+"""
+Binary frame ingest for the observation WebSocket channel.
+Frames arrive as raw JPEG (or int16 PCM) bytes behind a small fixed header
+instead of base64 strings inside JSON bodies.
+"""
+import asyncio
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .lazy_imports import lazy_import
+    from .metrics import DROPPED_FRAMES, stage
+except ImportError:
+    from lazy_imports import lazy_import
+    from metrics import DROPPED_FRAMES, stage
+
+cv2 = lazy_import("cv2")
+
+# Wire format (network byte order):
+#   version     u8   - protocol version, currently 1
+#   kind        u8   - KIND_VIDEO (JPEG bytes) or KIND_AUDIO (int16 PCM)
+#   sequence    u32  - per-connection frame counter
+#   capture_ts  f64  - client capture time in milliseconds since epoch
+#   sid_length  u8   - length of the session id that follows
+#   session_id  sid_length bytes (ASCII)
+#   payload     remaining bytes
+PROTOCOL_VERSION = 1
+KIND_VIDEO = 1
+KIND_AUDIO = 2
+
+_HEADER = struct.Struct("!BBIdB")
+
+
+class FrameHeader(NamedTuple):
+    """Metadata sent ahead of every binary frame."""
+
+    version: int
+    kind: int
+    sequence: int
+    capture_ts: float
+    session_id: str
+
+
+def pack_frame(header: FrameHeader, payload: bytes) -> bytes:
+    """Build a binary message (used by tests and replay tools)."""
+    session_bytes = header.session_id.encode("ascii")
+    if len(session_bytes) > 255:
+        raise ValueError("Session id too long")
+    return (
+        _HEADER.pack(header.version, header.kind, header.sequence, header.capture_ts, len(session_bytes))
+        + session_bytes
+        + payload
+    )
+
+
+def parse_frame(message: bytes) -> Tuple[FrameHeader, memoryview]:
+    """
+    Split a binary message into its header and payload.
+
+    Raises:
+        ValueError: If the message is truncated, uses an unknown version/kind,
+                    or carries audio that is not whole int16 samples.
+    """
+    if len(message) < _HEADER.size:
+        raise ValueError("Frame too short")
+
+    version, kind, sequence, capture_ts, sid_length = _HEADER.unpack_from(message)
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported frame protocol version: {version}")
+    if kind not in (KIND_VIDEO, KIND_AUDIO):
+        raise ValueError(f"Unknown frame kind: {kind}")
+
+    payload_start = _HEADER.size + sid_length
+    if len(message) < payload_start:
+        raise ValueError("Frame header truncated")
+
+    if kind == KIND_AUDIO and (len(message) - payload_start) % 2:
+        raise ValueError("Audio payload is not a whole number of int16 samples")
+
+    view = memoryview(message)
+    session_id = bytes(view[_HEADER.size:payload_start]).decode("ascii", errors="replace")
+    return FrameHeader(version, kind, sequence, capture_ts, session_id), view[payload_start:]
+
+
+def decode_jpeg(payload) -> Optional[np.ndarray]:
+    """Decode JPEG bytes to a BGR frame (runs on the decode executor)."""
+    img_array = np.frombuffer(payload, dtype=np.uint8)
+    if img_array.size == 0:
+        return None
+    with stage("jpeg_decode"):
+        return cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+
+
+def decode_pcm16(payload) -> np.ndarray:
+    """Convert little-endian int16 PCM bytes to float32 samples in [-1, 1]."""
+    return np.frombuffer(payload, dtype="<i2").astype(np.float32) / 32768.0
+
+
+class FrameDecoder:
+    """
+    Decodes frames off the event loop on a small, bounded thread pool.
+    When too many decodes are in flight the newest frame is dropped rather than
+    queued, so a slow box sheds video load instead of stalling interview traffic.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="frame-decode")
+        self._pending = 0
+        self.decoded_count = 0
+        self.dropped_count = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def decode(self, payload) -> Optional[np.ndarray]:
+        """Decode a JPEG payload, or return None if it was dropped or invalid."""
+        # Only touched from the event loop thread, so no lock is needed.
+        if self._pending >= self.max_pending:
+            self.dropped_count += 1
+            DROPPED_FRAMES.inc(reason="decode_backlog")
+            return None
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            frame = await loop.run_in_executor(self._executor, decode_jpeg, payload)
+        finally:
+            self._pending -= 1
+
+        if frame is not None:
+            self.decoded_count += 1
+        return frame
+
+    def shutdown(self):
+        """Stop the decode pool."""
+        self._executor.shutdown(wait=False)
@@ -3,14 +3,15 @@ Human Observation & Behavior Analysis Engine.
 LOCAL ONLY - All processing is local, no cloud APIs.
 Runs in parallel with the interview without blocking it.
 """
-import cv2
 import numpy as np
 import threading
 import queue
 import time
+from concurrent.futures import CancelledError, TimeoutError as FutureTimeoutError
 import pathlib
 import sys
-from typing import Dict, Optional, Callable
+from collections import deque
+from typing import Dict, List, Optional, Callable
 import logging
 
 # Handle imports for both package and direct execution
@@ -19,12 +20,26 @@ try:
     from .emotion_analyzer import EmotionAnalyzer
     from .audio_analyzer import AudioAnalyzer
     from .observation_logger import ObservationLogger
+    from .observation_payload import build_observation_payload, encode_payload
+    from .capture_control import CaptureRateController
+    from .observation_records import EmotionResult, FaceResult
+    from .analyzer_warmup import warm_up_analyzers
+    from .analyzer_schedule import AnalyzerSchedule, run_analyzers
+    from .motion_gate import MotionGate
+    from .metrics import DROPPED_FRAMES, FRAME_GATE, OBSERVATIONS, STAGE_SECONDS, observe_timings, stage
 except ImportError:
     sys.path.append(str(pathlib.Path(__file__).resolve().parent))
     from face_analyzer import FaceAnalyzer
     from emotion_analyzer import EmotionAnalyzer
     from audio_analyzer import AudioAnalyzer
     from observation_logger import ObservationLogger
+    from observation_payload import build_observation_payload, encode_payload
+    from capture_control import CaptureRateController
+    from observation_records import EmotionResult, FaceResult
+    from analyzer_warmup import warm_up_analyzers
+    from analyzer_schedule import AnalyzerSchedule, run_analyzers
+    from motion_gate import MotionGate
+    from metrics import DROPPED_FRAMES, FRAME_GATE, OBSERVATIONS, STAGE_SECONDS, observe_timings, stage
 
 logger = logging.getLogger(__name__)
 
@@ -86,20 +101,81 @@ class HumanObservationEngine:
     Runs asynchronously in a separate thread.
     """
 
-    def __init__(self, on_observation: Optional[Callable] = None):
+    # Frames the max_fps limit lets through back to back after a pause
+    FRAME_BURST = 2.0
+
+    def __init__(self, on_observation: Optional[Callable] = None, session_id: Optional[str] = None,
+                 log_file: str = "facial_expressions.txt", vision_pool=None,
+                 vision_timeout: float = 2.0, on_frame_cost: Optional[Callable[[float], None]] = None,
+                 capture_controller: Optional[CaptureRateController] = None,
+                 warmup_frames: int = 2, warmup_timeout: float = 30.0,
+                 state_sink: Optional[Callable[[Dict], None]] = None, state_interval: float = 5.0,
+                 heartbeat_interval: float = 1.0, frame_max_age: float = 3.0):
         """
         Initialize observation engine.
         
         Args:
             on_observation: Callback function to receive observation updates
+            session_id: Interview session this engine belongs to (None for standalone use)
+            log_file: Path of the facial expression log for this engine
+            vision_pool: Shared VisionWorkerPool for face/emotion analysis.
+                         When None, analyzers run inside this engine's thread.
+            vision_timeout: Seconds to wait for a pooled analysis result
+            on_frame_cost: Receives the measured analysis cost (seconds) of each frame
+            capture_controller: Negotiates the client's capture fps/resolution
+            warmup_frames: Synthetic frames run through the analyzers when the
+                           engine starts, before real frames (0 disables)
+            warmup_timeout: Seconds to wait for a pooled warm-up
+            state_sink: Receives export_state() every `state_interval` seconds
+                        and on stop, so other workers can serve the session
+            state_interval: Seconds between state exports
+            heartbeat_interval: Seconds between observations published while
+                                no new frame or audio arrives
+            frame_max_age: Seconds the last analyzed frame's face/emotion
+                           results are reported for once frames stop arriving
         """
-        self.face_analyzer = FaceAnalyzer()
-        self.emotion_analyzer = EmotionAnalyzer()
+        self.session_id = session_id
+        self.vision_pool = vision_pool
+        self.vision_timeout = vision_timeout
+        if vision_pool is None:
+            self.face_analyzer = FaceAnalyzer()
+            self.emotion_analyzer = EmotionAnalyzer()
+            self.analyzer_schedule = AnalyzerSchedule()
+            self.motion_gate = MotionGate()
+        else:
+            # Analyzer state lives on the pool worker that owns this session
+            self.face_analyzer = None
+            self.emotion_analyzer = None
+            self.analyzer_schedule = None
+            self.motion_gate = None
         self.audio_analyzer = AudioAnalyzer()
-        self.logger = ObservationLogger()
+        self.logger = ObservationLogger(log_file=log_file)
         self.pace_controller = PaceController()
         
         self.on_observation = on_observation
+        self.on_frame_cost = on_frame_cost
+        
+        # Load shedding (set by admission control): video can be capped or disabled
+        self.video_enabled = True
+        self.max_fps: Optional[float] = None
+        # Token bucket for max_fps: jittered frames at the capped rate are not dropped
+        self._frame_tokens = self.FRAME_BURST
+        self._frame_tokens_at = 0.0
+        self.dropped_frames = 0
+        self.capture_controller = capture_controller or CaptureRateController()
+        self.warmup_frames = warmup_frames
+        self.warmup_timeout = warmup_timeout
+        self.warmup_seconds: Optional[float] = None
+        self.state_sink = state_sink
+        self.state_interval = state_interval
+        self._last_state_save = 0.0
+        self._saved_observation_count: Optional[int] = None
+        self.heartbeat_interval = heartbeat_interval
+        self.frame_max_age = frame_max_age
+        
+        # Push subscribers receive the encoded payload of every new observation
+        self._listeners: List[Callable[[str], None]] = []
+        self._listeners_lock = threading.Lock()
         
         # Threading
         self.running = False
@@ -110,7 +186,8 @@ class HumanObservationEngine:
         self.frame_queue = queue.Queue(maxsize=5)
         self.audio_queue = queue.Queue(maxsize=10)
         self.video_queue = queue.Queue(maxsize=10)  # Queue for video frames from frontend
-        self.observation_queue = queue.Queue()
+        # Feeds get_observation_stream(); the oldest observations are dropped when nobody reads it
+        self.observation_queue = queue.Queue(maxsize=100)
         
         # Video capture
         self.cap = None
@@ -118,7 +195,15 @@ class HumanObservationEngine:
         
         # State
         self.observation_count = 0
+        self._recent_observations = deque(maxlen=100)  # publish times, for observation_rate()
         self.last_observation = None
+        self.latest_payload = None
+        self.latest_payload_json = None
+        self._last_publish = 0.0
+        # Results of the last analyzed frame, reported until the next one arrives
+        self._face_data = FaceResult(face_detected=False)
+        self._emotion_data = EmotionResult(emotion="unknown")
+        self._last_frame_analyzed: Optional[float] = None
         
         logger.info("[HumanObservationEngine] Initialized")
 
@@ -165,6 +250,11 @@ class HumanObservationEngine:
             self.cap.release()
             self.camera_ready = False
         
+        if self.vision_pool is not None and self.session_id is not None:
+            self.vision_pool.release_session(self.session_id)
+        
+        self._save_state()
+        
         # Close the facial expression log file
         if hasattr(self.logger, 'close_log_file'):
             self.logger.close_log_file()
@@ -176,21 +266,112 @@ class HumanObservationEngine:
         if self.running and not self.audio_queue.full():
             self.audio_queue.put(audio_chunk)
     
+    def set_observation_mode(self, video_enabled: bool, max_fps: Optional[float] = None):
+        """Limit video analysis for this session (audio analysis is unaffected)."""
+        self.video_enabled = video_enabled
+        self.max_fps = max_fps if max_fps and max_fps > 0 else None
+        self.capture_controller.set_ceiling(self.max_fps if video_enabled else 0)
+        logger.info(f"[HumanObservationEngine] Video {'enabled' if video_enabled else 'disabled'}, max fps {self.max_fps}")
+    
     def add_video_frame(self, frame: np.ndarray):
         """Add video frame for analysis (called from frontend)."""
-        if self.running and not self.video_queue.full():
-            self.video_queue.put(frame)
+        if not self.running:
+            return
+        if not self.video_enabled:
+            DROPPED_FRAMES.inc(reason="video_disabled")
+            return
+        
+        if self.max_fps is not None:
+            now = time.monotonic()
+            self._frame_tokens = min(
+                self.FRAME_BURST, self._frame_tokens + (now - self._frame_tokens_at) * self.max_fps
+            )
+            self._frame_tokens_at = now
+            if self._frame_tokens < 1.0:
+                self.dropped_frames += 1
+                DROPPED_FRAMES.inc(reason="rate_limit")
+                return
+            self._frame_tokens -= 1.0
+        
+        self.capture_controller.record_queue(self.video_queue.qsize(), self.video_queue.maxsize)
+        if self.video_queue.full():
+            self.dropped_frames += 1
+            DROPPED_FRAMES.inc(reason="queue_full")
+            return
+        self.video_queue.put(frame)
+
+    def poll_capture_config(self) -> Optional[Dict]:
+        """Return a capture_config message for the client if the target changed, else None."""
+        config = self.capture_controller.poll()
+        return config.to_message() if config is not None else None
 
     def get_latest_observation(self) -> Optional[Dict]:
         """Get the latest observation (non-blocking)."""
-        try:
-            while True:
-                self.last_observation = self.observation_queue.get_nowait()
-        except queue.Empty:
-            pass
-        
         return self.last_observation
 
+    def get_latest_payload_json(self) -> Optional[str]:
+        """Get the precomputed JSON payload (observation + warnings) of the newest observation."""
+        return self.latest_payload_json
+
+    def add_listener(self, callback: Callable[[str], None]):
+        """Register a callback invoked (from the observation thread) with each new payload."""
+        with self._listeners_lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str], None]):
+        """Unregister a payload callback."""
+        with self._listeners_lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def observation_rate(self, window: float = 5.0) -> float:
+        """Observations per second produced over the last `window` seconds."""
+        cutoff = time.monotonic() - window
+        recent = [t for t in list(self._recent_observations) if t >= cutoff]
+        if len(recent) < 2:
+            return 0.0
+        return (len(recent) - 1) / max(recent[-1] - recent[0], 1e-6)
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Current depth of the engine's queues."""
+        return {
+            "video_queue": self.video_queue.qsize(),
+            "audio_queue": self.audio_queue.qsize(),
+            "observation_queue": self.observation_queue.qsize(),
+        }
+
+    def _publish(self, observation: Dict):
+        """Precompute the client payload once and push it to subscribers."""
+        self.observation_count += 1
+        self._last_publish = time.monotonic()
+        self._recent_observations.append(self._last_publish)
+        OBSERVATIONS.inc()
+        self.last_observation = observation
+        payload = build_observation_payload(observation, self.observation_count)
+        payload_json = encode_payload(payload)
+        self.latest_payload = payload
+        self.latest_payload_json = payload_json
+        
+        if self.on_observation is not None:
+            self.on_observation(observation)
+        
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(payload_json)
+            except Exception as e:
+                logger.error(f"[HumanObservationEngine] Listener failed: {e}")
+
+    def _enqueue_observation(self, observation: Dict):
+        """Queue an observation for stream readers, dropping the oldest one when full."""
+        if self.observation_queue.full():
+            try:
+                self.observation_queue.get_nowait()
+            except queue.Empty:
+                pass
+        self.observation_queue.put_nowait(observation)
+
     def get_observation_stream(self):
         """Generator that yields observations as they arrive."""
         while self.running:
@@ -200,45 +381,90 @@ class HumanObservationEngine:
             except queue.Empty:
                 continue
 
+    def _warm_up(self):
+        """Warm this session's analyzers at the negotiated resolution so the first real frame is fast."""
+        if self.warmup_frames <= 0 or not self.video_enabled:
+            return
+        config = self.capture_controller.current()
+        start = time.perf_counter()
+        try:
+            if self.vision_pool is None:
+                warm_up_analyzers(self.face_analyzer, self.emotion_analyzer,
+                                  config.width, config.height, self.warmup_frames)
+            else:
+                self.vision_pool.prepare_session(
+                    self.session_id or "", config.width, config.height, self.warmup_frames
+                ).result(timeout=self.warmup_timeout)
+        except Exception as e:
+            logger.warning(f"[HumanObservationEngine] Warm-up failed: {e!r}")
+        self.warmup_seconds = time.perf_counter() - start
+        STAGE_SECONDS.observe(self.warmup_seconds, stage="session_warmup")
+        logger.info(f"[HumanObservationEngine] Warm-up took {self.warmup_seconds:.2f}s")
+
     def _observation_loop(self):
         """Main observation loop (runs in separate thread)."""
+        self._warm_up()
         while self.running:
             try:
                 # Process video frames from queue (sent by frontend)
                 frame = None
                 while not self.video_queue.empty():
                     try:
+                        if frame is not None:
+                            # Only the newest frame is analyzed
+                            self.dropped_frames += 1
+                            DROPPED_FRAMES.inc(reason="superseded")
                         frame = self.video_queue.get_nowait()
                     except queue.Empty:
                         break
                 
                 # Process audio from queue
-                audio_data = self._process_audio_queue()
+                audio_chunks = self._drain_audio_queue()
+                
+                # Analyze frame if available; between frames the last results still stand
+                now = time.monotonic()
+                analyzed = self._analyze_frame(frame) if frame is not None else None
+                if analyzed is not None:
+                    self._face_data, self._emotion_data = analyzed
+                    self._last_frame_analyzed = now
+                elif self._last_frame_analyzed is not None and now - self._last_frame_analyzed > self.frame_max_age:
+                    # Frames stopped arriving - stop reporting the last face
+                    self._face_data = FaceResult(face_detected=False)
+                    self._emotion_data = EmotionResult(emotion="unknown")
+                    self._last_frame_analyzed = None
                 
-                # Analyze frame if available
-                if frame is not None:
-                    face_data = self.face_analyzer.analyze(frame)
-                    emotion_data = self.emotion_analyzer.analyze(frame)
-                else:
-                    # No frame available - create minimal data
-                    face_data = {"face_detected": False}
-                    emotion_data = {"emotion": "unknown"}
+                # Publish on new input; otherwise only a low-rate heartbeat
+                if analyzed is None and not audio_chunks and now - self._last_publish < self.heartbeat_interval:
+                    time.sleep(0.1)
+                    continue
+                
+                with stage("audio"):
+                    audio_data = self.audio_analyzer.analyze()
                 
                 # Create observation
                 observation = {
                     "timestamp": time.time(),
-                    "face": face_data,
-                    "emotion": emotion_data,
+                    "face": self._face_data,
+                    "emotion": self._emotion_data,
                     "audio": audio_data,
                     "pace_adjustment": {}
                 }
                 
                 # Log observation
-                self.logger.log_observation(observation)
+                with stage("logger_write"):
+                    self.logger.log_observation(observation)
                 
                 # Put in queue for retrieval
-                if not self.observation_queue.full():
-                    self.observation_queue.put(observation)
+                self._enqueue_observation(observation)
+                
+                # Precompute payload and notify push subscribers
+                self._publish(observation)
+                
+                # Periodic saves only when something new was observed; the state itself is fixed-size
+                if (self.state_sink is not None and self.observation_count != self._saved_observation_count
+                        and time.monotonic() - self._last_state_save >= self.state_interval):
+                    with stage("state_save"):
+                        self._save_state()
                 
                 # Sleep to control frequency
                 time.sleep(0.1)  # 10 Hz
@@ -249,18 +475,66 @@ class HumanObservationEngine:
                 traceback.print_exc()
                 time.sleep(0.5)
 
-    def _process_audio_queue(self) -> Dict:
-        """Process accumulated audio chunks and analyze."""
-        # Drain audio queue
+    def _analyze_frame(self, frame: np.ndarray):
+        """
+        Run face + emotion analysis locally or on the shared vision pool.
+
+        Returns:
+            (face, emotion) results, or None if the pool timed out or dropped the frame
+        """
+        start = time.perf_counter()
+        if self.vision_pool is None:
+            face_data, emotion_data = run_analyzers(
+                self.face_analyzer, self.emotion_analyzer, self.analyzer_schedule, frame, gate=self.motion_gate
+            )
+            FRAME_GATE.inc(outcome="reused" if self.motion_gate.last_reused else "analyzed")
+            elapsed = time.perf_counter() - start
+            self._record_frame_cost(elapsed)
+            self.capture_controller.record_latency(elapsed)
+            return face_data, emotion_data
+        
+        # Only this session's thread waits; the API process stays responsive
+        future = None
+        try:
+            with stage("vision_roundtrip"):
+                future = self.vision_pool.submit(self.session_id or "", frame)
+                result = future.result(timeout=self.vision_timeout)
+            observe_timings(result.get("timings", {}))
+            FRAME_GATE.inc(outcome="reused" if result.get("reused") else "analyzed")
+            self._record_frame_cost(result.get("analysis_seconds", 0.0))
+            # Wall time includes batching and worker queueing, which is what bounds this session's rate
+            self.capture_controller.record_latency(time.perf_counter() - start)
+            return result["face"], result["emotion"]
+        except FutureTimeoutError:
+            # Withdraw the frame if its batch has not started yet
+            future.cancel()
+            self.dropped_frames += 1
+            DROPPED_FRAMES.inc(reason="vision_timeout")
+            return None
+        except CancelledError:
+            # Dropped from the worker's backlog in favour of newer frames
+            self.dropped_frames += 1
+            DROPPED_FRAMES.inc(reason="vision_backlog")
+            return None
+        except Exception as e:
+            logger.error(f"[HumanObservationEngine] Vision analysis failed: {e!r}")
+            return FaceResult(face_detected=False), EmotionResult(emotion="unknown")
+
+    def _record_frame_cost(self, seconds: float):
+        if self.on_frame_cost is not None:
+            self.on_frame_cost(seconds)
+
+    def _drain_audio_queue(self) -> int:
+        """Feed accumulated audio chunks to the audio analyzer; returns how many there were."""
+        chunks = 0
         while not self.audio_queue.empty():
             try:
                 audio_chunk = self.audio_queue.get_nowait()
                 self.audio_analyzer.add_audio_chunk(audio_chunk)
+                chunks += 1
             except queue.Empty:
                 break
-        
-        # Analyze current audio
-        return self.audio_analyzer.analyze()
+        return chunks
 
     def get_frame(self) -> Optional[np.ndarray]:
         """Get current camera frame for display in UI."""
@@ -272,16 +546,59 @@ class HumanObservationEngine:
             return frame
         return None
 
+    def export_state(self) -> Dict:
+        """Served payloads plus the analyzer and logger state needed to resume this session elsewhere."""
+        return {
+            "observation_count": self.observation_count,
+            "latest": self.latest_payload,
+            "report": self.generate_report(),
+            "audio": self.audio_analyzer.export_state(),
+            "logger": self.logger.export_state(),
+            "pace_mode": self.pace_controller.pressure_mode,
+        }
+
+    def restore_state(self, state: Dict):
+        """Continue a session from export_state() output (e.g. taken over from another worker)."""
+        self.observation_count = state.get("observation_count", 0)
+        self.latest_payload = state.get("latest")
+        self.latest_payload_json = encode_payload(self.latest_payload) if self.latest_payload else None
+        if state.get("audio"):
+            self.audio_analyzer.restore_state(state["audio"])
+        if state.get("logger"):
+            self.logger.restore_state(state["logger"])
+        self.pace_controller.pressure_mode = state.get("pace_mode", "normal")
+
+    def _save_state(self):
+        if self.state_sink is None:
+            return
+        self._last_state_save = time.monotonic()
+        self._saved_observation_count = self.observation_count
+        try:
+            self.state_sink(self.export_state())
+        except Exception as e:
+            logger.warning(f"[HumanObservationEngine] Saving session state failed: {e!r}")
+
     def generate_report(self) -> Dict:
         """Generate final behavioral analysis report."""
         return self.logger.generate_report()
 
     def reset(self):
         """Reset all analyzers and loggers for new interview."""
-        self.face_analyzer.reset()
-        self.emotion_analyzer.reset()
+        if self.vision_pool is None:
+            self.face_analyzer.reset()
+            self.emotion_analyzer.reset()
+            self.analyzer_schedule.reset()
+            self.motion_gate.reset()
+        elif self.session_id is not None:
+            self.vision_pool.reset_session(self.session_id)
         self.audio_analyzer.reset()
-        self.logger = ObservationLogger()
+        self.logger = ObservationLogger(log_file=self.logger.log_file)
         self.pace_controller.reset()
         self.observation_count = 0
+        self.last_observation = None
+        self.latest_payload = None
+        self.latest_payload_json = None
+        self._face_data = FaceResult(face_detected=False)
+        self._emotion_data = EmotionResult(emotion="unknown")
+        self._last_frame_analyzed = None
         logger.info("[HumanObservationEngine] Reset complete")
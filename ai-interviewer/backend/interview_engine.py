@@ -1,15 +1,23 @@
 import asyncio
 import json
 import os
+import random
 from typing import Any, Dict, List, Optional
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
-import google.generativeai as genai
 import requests
 from dotenv import load_dotenv
 
+try:
+    from .lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+# The Gemini SDK is slow to import; it loads when the first live engine is configured
+genai = lazy_import("google.generativeai")
+
 
 class ModelRotator:
     """Manages automatic model rotation when quotas are reached."""
@@ -358,16 +366,24 @@ class InterviewEngine:
 
 
 class MockInterviewEngine(InterviewEngine):
-    """Lightweight mock for tests."""
-
-    def __init__(self) -> None:
+    """Lightweight mock for tests and load tests."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0) -> None:
+        """
+        Args:
+            latency: Seconds each turn takes, to simulate model response time
+            jitter: Extra random delay of up to this many seconds per turn
+        """
         self.system_prompt = "mock"
         self.use_rotation = False
         self.fixed_model = "mock"
         self.temperature = 0.0
+        self.latency = latency
+        self.jitter = jitter
 
     async def generate(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:  # type: ignore[override]
-        await asyncio.sleep(0)
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter > 0 else 0.0)
+        await asyncio.sleep(delay)
         return {
             "system_state": "TECHNICAL",
             "interviewer_response": "Test question: What is your stack?",
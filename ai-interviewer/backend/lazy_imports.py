@@ -0,0 +1,67 @@
+"""
+Deferred imports for heavy dependencies.
+cv2, mediapipe, ultralytics (torch) and google.generativeai together take
+seconds to import. Modules bind them through lazy_import() so importing the
+app stays fast; the real import happens on first attribute access (normally
+during the background warm-up, see VisionWorkerPool.warm_up).
+"""
+import importlib
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+
+
+def module_available(name: str) -> bool:
+    """True if `name` can be imported, without importing it."""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule(ModuleType):
+    """Stand-in that imports the real module on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._lazy_lock = threading.Lock()
+        self._lazy_module = None
+
+    def _load(self) -> ModuleType:
+        module = self._lazy_module
+        if module is None:
+            # Lock so concurrent first uses (warm-up vs. first request) import once
+            with self._lazy_lock:
+                if self._lazy_module is None:
+                    self._lazy_module = importlib.import_module(self.__name__)
+                module = self._lazy_module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Return `name` if it is already imported, otherwise a LazyModule for it.
+
+    Raises:
+        ImportError: If the module is not installed.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if not module_available(name):
+        raise ImportError(f"No module named {name!r}", name=name)
+    return LazyModule(name)
+
+
+def is_loaded(name: str) -> bool:
+    """True once `name` has actually been imported."""
+    return name in sys.modules
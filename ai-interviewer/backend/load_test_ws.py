@@ -0,0 +1,337 @@
+"""
+Concurrent load test for the interview WebSocket.
+
+Starts the app on an in-process uvicorn server with `get_engine` overridden by
+a MockInterviewEngine of configurable latency, then opens many concurrent
+`/ws` sessions. Each session runs a scripted multi-turn conversation while
+streaming binary video/audio frames over `/observation/ws`. Reports turn
+latency percentiles, server event-loop lag and failure counts as JSON, which
+tells us how many candidates a single uvicorn worker can hold.
+
+Usage:
+    python -m backend.load_test_ws --sessions 200 --turns 5 --engine-latency 0.5
+    python -m backend.load_test_ws --sessions 50 --fps 2 --output run.json
+"""
+import argparse
+import asyncio
+import json
+import pathlib
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+import websockets
+
+try:
+    from .benchmark_observation import SAMPLE_RATE, load_audio, load_frames
+    from .frame_ingest import KIND_AUDIO, KIND_VIDEO, PROTOCOL_VERSION, FrameHeader, pack_frame
+    from .interview_engine import MockInterviewEngine
+except ImportError:
+    sys.path.append(str(pathlib.Path(__file__).resolve().parent))
+    from benchmark_observation import SAMPLE_RATE, load_audio, load_frames
+    from frame_ingest import KIND_AUDIO, KIND_VIDEO, PROTOCOL_VERSION, FrameHeader, pack_frame
+    from interview_engine import MockInterviewEngine
+
+# Candidate answers cycled through by every scripted session
+SCRIPT = (
+    "Hi, I'm ready to start.",
+    "I have five years of experience building backend services in Python.",
+    "I would use a hash map to count occurrences, which is O(n) time.",
+    "The main trade-off is memory usage against lookup speed.",
+    "I'd add caching in front of the database and measure the hit rate.",
+    "I once debugged a race condition by adding structured logging around the lock.",
+    "Thanks, I don't have any more questions.",
+)
+
+# Close code sent by /ws when admission control sheds a session
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentiles_ms(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None, "mean": None}
+    data = np.array(values) * 1000.0
+    p50, p95, p99 = np.percentile(data, [50, 95, 99])
+    return {
+        "p50": round(float(p50), 2),
+        "p95": round(float(p95), 2),
+        "p99": round(float(p99), 2),
+        "max": round(float(data.max()), 2),
+        "mean": round(float(data.mean()), 2),
+    }
+
+
+class _ServerThread:
+    """Runs the app on uvicorn in a background thread with its own event loop."""
+
+    def __init__(self, app, port: int):
+        import uvicorn
+
+        self.config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", ws="websockets")
+        self.server = uvicorn.Server(self.config)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread = threading.Thread(target=self._run, name="load-test-server", daemon=True)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.server.serve())
+
+    def start(self, timeout: float = 30.0):
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("uvicorn server failed to start")
+            time.sleep(0.05)
+
+    def stop(self):
+        self.server.should_exit = True
+        self._thread.join(timeout=30.0)
+
+
+async def _monitor_loop_lag(samples: List[float], interval: float):
+    """Record how late each fixed-interval wake-up fires on the running loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - start - interval))
+
+
+class _SessionStats:
+    def __init__(self):
+        self.turn_latencies: List[float] = []
+        self.connect_latencies: List[float] = []
+        self.failures: Counter = Counter()
+        self.completed = 0
+        self.rejected = 0
+        self.frames_sent = 0
+        self.audio_chunks_sent = 0
+
+
+async def _stream_media(uri: str, session_id: str, frames: List[bytes], audio: np.ndarray,
+                        fps: float, stats: _SessionStats, stop: asyncio.Event):
+    """Send video/audio frames for one session, following server capture_config updates."""
+    current_fps = fps
+    sequence = 0
+    try:
+        async with websockets.connect(uri, max_size=None) as ws:
+            async def follow_capture_config():
+                nonlocal current_fps
+                async for message in ws:
+                    if isinstance(message, str):
+                        data = json.loads(message)
+                        if data.get("type") == "capture_config":
+                            current_fps = min(fps, float(data.get("fps", fps)))
+                        elif data.get("type") == "error":
+                            stats.failures["ingest_error"] += 1
+
+            reader = asyncio.ensure_future(follow_capture_config())
+            try:
+                while not stop.is_set():
+                    interval = 1.0 / current_fps if current_fps > 0 else 1.0
+                    chunk = int(SAMPLE_RATE * interval)
+                    if current_fps > 0:
+                        header = FrameHeader(PROTOCOL_VERSION, KIND_VIDEO, sequence, time.time() * 1000.0, session_id)
+                        await ws.send(pack_frame(header, frames[sequence % len(frames)]))
+                        stats.frames_sent += 1
+                    start = (sequence * chunk) % max(len(audio) - chunk, 1)
+                    pcm = (np.clip(audio[start:start + chunk], -1.0, 1.0) * 32767).astype("<i2").tobytes()
+                    header = FrameHeader(PROTOCOL_VERSION, KIND_AUDIO, sequence, time.time() * 1000.0, session_id)
+                    await ws.send(pack_frame(header, pcm))
+                    stats.audio_chunks_sent += 1
+                    sequence += 1
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=interval)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                reader.cancel()
+    except (OSError, websockets.WebSocketException) as exc:
+        stats.failures[f"ingest_{type(exc).__name__}"] += 1
+
+
+async def _run_session(base_uri: str, index: int, turns: int, think_time: float, turn_timeout: float,
+                       frames: List[bytes], audio: np.ndarray, fps: float, stats: _SessionStats):
+    """One candidate: connect, read the greeting, answer `turns` scripted questions."""
+    stop = asyncio.Event()
+    media = None
+    started = time.perf_counter()
+    try:
+        async with websockets.connect(f"{base_uri}/ws", max_size=None, open_timeout=turn_timeout) as ws:
+            greeting = json.loads(await asyncio.wait_for(ws.recv(), timeout=turn_timeout))
+            stats.connect_latencies.append(time.perf_counter() - started)
+            if greeting.get("next_action") == "terminate":
+                stats.rejected += 1
+                return
+
+            session_id = greeting.get("session_id")
+            if session_id and (fps > 0 or len(audio)):
+                media = asyncio.ensure_future(
+                    _stream_media(f"{base_uri}/observation/ws", session_id, frames, audio, fps, stats, stop)
+                )
+
+            for turn in range(turns):
+                if think_time > 0:
+                    await asyncio.sleep(think_time)
+                sent = time.perf_counter()
+                await ws.send(json.dumps({"text": SCRIPT[(index + turn) % len(SCRIPT)]}))
+                response = json.loads(await asyncio.wait_for(ws.recv(), timeout=turn_timeout))
+                stats.turn_latencies.append(time.perf_counter() - sent)
+                if response.get("system_state") == "ERROR" or "error" in response:
+                    stats.failures["error_response"] += 1
+                    return
+                if response.get("next_action") == "terminate":
+                    stats.failures["terminated"] += 1
+                    return
+            stats.completed += 1
+    except websockets.ConnectionClosed as exc:
+        if exc.rcvd is not None and exc.rcvd.code == CLOSE_TRY_AGAIN_LATER:
+            stats.rejected += 1
+        else:
+            stats.failures["connection_closed"] += 1
+    except asyncio.TimeoutError:
+        stats.failures["timeout"] += 1
+    except (OSError, websockets.WebSocketException) as exc:
+        stats.failures[type(exc).__name__] += 1
+    finally:
+        stop.set()
+        if media is not None:
+            await media
+
+
+async def _drive(base_uri: str, sessions: int, ramp: float, turns: int, think_time: float, turn_timeout: float,
+                 frames: List[bytes], audio: np.ndarray, fps: float, stats: _SessionStats):
+    tasks = []
+    for i in range(sessions):
+        tasks.append(asyncio.ensure_future(
+            _run_session(base_uri, i, turns, think_time, turn_timeout, frames, audio, fps, stats)
+        ))
+        if ramp > 0:
+            await asyncio.sleep(ramp / sessions)
+    await asyncio.gather(*tasks)
+
+
+def run_load_test(sessions: int = 50, turns: int = 5, engine_latency: float = 0.2, engine_jitter: float = 0.0,
+                  think_time: float = 0.5, fps: float = 2.0, width: int = 320, height: int = 240,
+                  ramp: float = 5.0, turn_timeout: float = 30.0, lag_interval: float = 0.05) -> Dict:
+    """
+    Run the load test against an in-process server and return the report.
+
+    Args:
+        sessions: Concurrent /ws sessions
+        turns: Scripted candidate answers per session
+        engine_latency: Seconds the mock interview engine takes per turn
+        engine_jitter: Extra random engine delay of up to this many seconds
+        think_time: Seconds each candidate waits before answering
+        fps: Video frames per second per session (0 = audio only)
+        width: Width of the synthetic frames
+        height: Height of the synthetic frames
+        ramp: Seconds over which sessions are opened
+        turn_timeout: Seconds to wait for a reply before counting a timeout
+        lag_interval: Sampling interval of the event-loop lag probe
+    """
+    try:
+        from .main import app, get_engine
+    except ImportError:
+        from main import app, get_engine
+
+    frames = load_frames(None, count=8, width=width, height=height) if fps > 0 else []
+    audio = load_audio(None, seconds=5.0)
+
+    app.dependency_overrides[get_engine] = lambda: MockInterviewEngine(latency=engine_latency, jitter=engine_jitter)
+    server = _ServerThread(app, _free_port())
+    server.start()
+
+    lag_samples: List[float] = []
+    lag_probe = asyncio.run_coroutine_threadsafe(_monitor_loop_lag(lag_samples, lag_interval), server.loop)
+
+    stats = _SessionStats()
+    wall_start = time.perf_counter()
+    try:
+        asyncio.run(_drive(
+            f"ws://127.0.0.1:{server.config.port}", sessions, ramp, turns, think_time, turn_timeout,
+            frames, audio, fps, stats,
+        ))
+    finally:
+        wall = time.perf_counter() - wall_start
+        lag_probe.cancel()
+        server.stop()
+        app.dependency_overrides.pop(get_engine, None)
+
+    return {
+        "config": {
+            "sessions": sessions,
+            "turns": turns,
+            "engine_latency": engine_latency,
+            "engine_jitter": engine_jitter,
+            "think_time": think_time,
+            "fps": fps,
+            "width": width,
+            "height": height,
+            "ramp": ramp,
+        },
+        "wall_seconds": round(wall, 3),
+        "sessions_completed": stats.completed,
+        "sessions_rejected": stats.rejected,
+        "turns_completed": len(stats.turn_latencies),
+        "turn_latency_ms": _percentiles_ms(stats.turn_latencies),
+        "turn_overhead_ms": _percentiles_ms([max(0.0, t - engine_latency) for t in stats.turn_latencies]),
+        "greeting_latency_ms": _percentiles_ms(stats.connect_latencies),
+        "event_loop_lag_ms": _percentiles_ms(lag_samples),
+        "frames_sent": stats.frames_sent,
+        "audio_chunks_sent": stats.audio_chunks_sent,
+        "failures": dict(stats.failures),
+        "failure_count": sum(stats.failures.values()),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Concurrent load test for the interview WebSocket")
+    parser.add_argument("--sessions", type=int, default=50, help="concurrent /ws sessions")
+    parser.add_argument("--turns", type=int, default=5, help="scripted answers per session")
+    parser.add_argument("--engine-latency", type=float, default=0.2, help="mock engine seconds per turn")
+    parser.add_argument("--engine-jitter", type=float, default=0.0, help="extra random engine delay (s)")
+    parser.add_argument("--think-time", type=float, default=0.5, help="candidate pause before each answer (s)")
+    parser.add_argument("--fps", type=float, default=2.0, help="video frames per second per session (0 = audio only)")
+    parser.add_argument("--width", type=int, default=320)
+    parser.add_argument("--height", type=int, default=240)
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which sessions are opened")
+    parser.add_argument("--turn-timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(
+        sessions=args.sessions,
+        turns=args.turns,
+        engine_latency=args.engine_latency,
+        engine_jitter=args.engine_jitter,
+        think_time=args.think_time,
+        fps=args.fps,
+        width=args.width,
+        height=args.height,
+        ramp=args.ramp,
+        turn_timeout=args.turn_timeout,
+    )
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
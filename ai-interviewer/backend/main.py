@@ -1,43 +1,49 @@
 import asyncio
+import importlib
 import json
 import pathlib
 import sys
-from typing import Any, Dict, List
+import os
+import threading
+from typing import Any, Dict, List, Optional
 import numpy as np
 import base64
-import cv2
 
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.websockets import WebSocketState
 
 
-def sanitize_for_json(obj):
-    """Convert numpy types to native Python types for JSON serialization."""
-    if isinstance(obj, dict):
-        return {k: sanitize_for_json(v) for k, v in obj.items()}
-    elif isinstance(obj, (list, tuple)):
-        return [sanitize_for_json(item) for item in obj]
-    elif isinstance(obj, np.bool_):
-        return bool(obj)
-    elif isinstance(obj, (np.integer, np.int64, np.int32)):
-        return int(obj)
-    elif isinstance(obj, (np.floating, np.float64, np.float32)):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    return obj
-
-
 # Allow running both as package (recommended) and as script from backend/ directory.
 try:
     from .interview_engine import InterviewEngine, MockInterviewEngine
     from .human_observation_engine import HumanObservationEngine
+    from .frame_ingest import KIND_AUDIO, KIND_VIDEO, FrameDecoder, decode_pcm16, parse_frame
+    from .observation_payload import encode_payload
+    from .session_recording import SessionRecorder
+    from .session_registry import SessionRegistry
+    from .session_store import create_session_store
+    from .vision_pool import VisionWorkerPool
+    from .admission_control import AdmissionController, SessionRejected
+    from .capture_control import CaptureRateController
+    from . import metrics
+    from . import observation_config
 except ImportError:  # pragma: no cover - fallback for direct execution
     sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))
     from backend.interview_engine import InterviewEngine, MockInterviewEngine
     from backend.human_observation_engine import HumanObservationEngine
+    from backend.frame_ingest import KIND_AUDIO, KIND_VIDEO, FrameDecoder, decode_pcm16, parse_frame
+    from backend.observation_payload import encode_payload
+    from backend.session_recording import SessionRecorder
+    from backend.session_registry import SessionRegistry
+    from backend.session_store import create_session_store
+    from backend.vision_pool import VisionWorkerPool
+    from backend.admission_control import AdmissionController, SessionRejected
+    from backend.capture_control import CaptureRateController
+    from backend import metrics
+    from backend import observation_config
 
 app = FastAPI(title="AI Interviewer", version="1.0.0")
 
@@ -60,14 +66,100 @@ ENV_PATH = pathlib.Path(__file__).resolve().parents[1] / ".env"
 # Load environment variables from project-level .env if present.
 load_dotenv(ENV_PATH)
 
-# Initialize observation engine (global instance)
-try:
-    observation_engine = HumanObservationEngine()
-    print("[INFO] Human Observation Engine initialized successfully")
-except Exception as e:
-    print(f"[WARNING] Failed to initialize observation engine: {e}")
-    print("[INFO] Interview will continue without behavioral observation")
-    observation_engine = None
+
+# Vision worker processes shared by every session (started lazily on first frame)
+vision_pool = VisionWorkerPool(
+    num_workers=observation_config.VISION_WORKER_PROCESSES,
+    batch_window=observation_config.PERSON_BATCH_WINDOW_MS / 1000.0,
+    max_batch=observation_config.PERSON_BATCH_MAX_SIZE,
+    max_pending=observation_config.PERSON_BATCH_MAX_PENDING,
+    warmup_frames=observation_config.OBSERVATION_WARMUP_FRAMES,
+    warmup_size=(observation_config.CAMERA_WIDTH, observation_config.CAMERA_HEIGHT),
+)
+
+# Admits new sessions at full, reduced or audio-only observation based on measured load
+admission_controller = AdmissionController(
+    capacity_cores=max(1, vision_pool.num_workers),
+    full_fps=observation_config.ADMISSION_FULL_FPS,
+    reduced_fps=observation_config.ADMISSION_REDUCED_FPS,
+    max_sessions=observation_config.MAX_SESSIONS,
+    target_utilization=observation_config.ADMISSION_TARGET_UTILIZATION,
+    initial_frame_cost=observation_config.ADMISSION_INITIAL_FRAME_COST,
+)
+
+
+def create_observation_engine(session_id: str) -> HumanObservationEngine:
+    """Build an isolated observation engine for one interview session."""
+    log_file = os.path.join(observation_config.OBSERVATION_LOG_DIR, f"facial_expressions_{session_id}.txt")
+    return HumanObservationEngine(
+        session_id=session_id,
+        log_file=log_file,
+        vision_pool=vision_pool,
+        vision_timeout=observation_config.VISION_RESULT_TIMEOUT,
+        on_frame_cost=admission_controller.record_frame_cost,
+        capture_controller=CaptureRateController(
+            max_fps=observation_config.CAPTURE_MAX_FPS,
+            min_fps=observation_config.CAPTURE_MIN_FPS,
+            update_interval=observation_config.CAPTURE_UPDATE_INTERVAL,
+        ),
+        warmup_frames=observation_config.OBSERVATION_WARMUP_FRAMES,
+        warmup_timeout=observation_config.OBSERVATION_WARMUP_TIMEOUT,
+        state_sink=lambda state: session_registry.save_engine_state(session_id, state),
+        state_interval=observation_config.SESSION_STATE_INTERVAL,
+        heartbeat_interval=observation_config.OBSERVATION_HEARTBEAT_INTERVAL,
+        frame_max_age=observation_config.OBSERVATION_FRAME_MAX_AGE,
+    )
+
+
+# Conversation and observation state shared by every worker serving this app
+session_store = create_session_store(observation_config.SESSION_STORE_PATH)
+
+# One observation engine per interview session (issued at /ws connect)
+session_registry = SessionRegistry(
+    engine_factory=create_observation_engine,
+    retention_seconds=observation_config.SESSION_RETENTION_SECONDS,
+    admission=admission_controller,
+    store=session_store,
+    store_retention_seconds=observation_config.SESSION_STORE_RETENTION_SECONDS,
+)
+
+
+def _latest_observation(session_id: str) -> Optional[Dict[str, Any]]:
+    """Latest observation from the local engine, or from the store if another worker observes the session."""
+    observation_engine = session_registry.serving_engine(session_id)
+    if observation_engine is not None:
+        return observation_engine.get_latest_observation()
+    state = session_registry.get_state(session_id) or {}
+    payload = (state.get("observation") or {}).get("latest")
+    return payload.get("observation") if payload else None
+
+async def _frame_engine(session_id: Optional[str]) -> Optional[HumanObservationEngine]:
+    """Engine for a session's incoming frames; taking the session over from the store runs off the loop."""
+    observation_engine = session_registry.observing_engine(session_id)
+    if observation_engine is None and session_id:
+        observation_engine = await asyncio.to_thread(session_registry.get_engine, session_id, True)
+    return observation_engine
+
+
+async def _release_session(session_id: str, token: int) -> None:
+    """
+    Release a session off the event loop. If the handler is cancelled while
+    waiting (shutdown, test client teardown), block until the release is
+    done, so the engine is stopped and the recording closed when it exits.
+    """
+    releasing = threading.Thread(target=session_registry.release, args=(session_id, token), daemon=True)
+    releasing.start()
+    try:
+        await asyncio.to_thread(releasing.join)
+    except asyncio.CancelledError:
+        releasing.join()
+        raise
+
+# Bounded pool that decodes JPEG frames off the event loop
+frame_decoder = FrameDecoder(
+    max_workers=observation_config.FRAME_DECODE_WORKERS,
+    max_pending=observation_config.FRAME_DECODE_MAX_PENDING,
+)
 
 
 def load_system_prompt() -> str:
@@ -91,27 +183,74 @@ def get_mock_engine() -> InterviewEngine:
 
 @app.websocket("/ws")
 async def websocket_endpoint(
-    websocket: WebSocket, engine: InterviewEngine = Depends(get_engine)
+    websocket: WebSocket, engine: InterviewEngine = Depends(get_engine), session_id: Optional[str] = None
 ) -> None:
     await websocket.accept()
     history: List[Dict[str, str]] = []
     interview_started = False
     violation_detected = False
     
+    # Reconnecting clients pass their session id and continue where they left off,
+    # whichever worker served the interview before
+    resume_state = await asyncio.to_thread(session_registry.get_state, session_id)
+    if resume_state is not None and not resume_state.get("history"):
+        resume_state = None
+    
     try:
-        # Start observation engine
-        if observation_engine is not None:
+        # Builds the engine and writes the store (SQLite may wait on its lock): keep it off the loop
+        session = await asyncio.to_thread(
+            session_registry.create, session_id if resume_state else None, state=resume_state
+        )
+    except SessionRejected as exc:
+        # Shed load at the door instead of degrading interviews already running
+        await websocket.send_json({
+            "system_state": "ERROR",
+            "interviewer_response": str(exc),
+            "avatar_state": "neutral_listening",
+            "tts_enabled": False,
+            "ui_mode": "professional_minimal",
+            "next_action": "terminate",
+        })
+        await websocket.close(code=1013)
+        return
+    # Released only if no newer connection has taken the session over by then
+    session_token = session.token
+    observation_engine = session.engine
+    if observation_engine is None:
+        print("[INFO] Interview will continue without behavioral observation")
+    if observation_config.SESSION_RECORDING_DIR and session.recorder is None:
+        session.recorder = SessionRecorder(
+            os.path.join(observation_config.SESSION_RECORDING_DIR, f"session_{session.session_id}.rec")
+        )
+    recorder = session.recorder
+    
+    try:
+        # Start observation engine (already running if this connection took a live session over)
+        if observation_engine is not None and not observation_engine.running:
             observation_engine.start()
         
-        # Send greeting message immediately upon connection
-        greeting_response = await engine.run_turn(user_text="", history=history)
-        history.append({"role": "assistant", "content": greeting_response.get("interviewer_response", "")})
+        if resume_state is not None:
+            history = resume_state["history"]
+            greeting_response = dict(resume_state.get("last_response") or {})
+            greeting_response["resumed"] = True
+        else:
+            # Send greeting message immediately upon connection
+            greeting_response = await engine.run_turn(user_text="", history=history)
+            history.append({"role": "assistant", "content": greeting_response.get("interviewer_response", "")})
+            await asyncio.to_thread(session_store.update, session.session_id, history=list(history),
+                                    phase=greeting_response.get("system_state"), last_response=greeting_response)
+        # Client scopes its /observation/* calls with this id
+        greeting_response["session_id"] = session.session_id
+        if session.admission is not None:
+            greeting_response["observation_mode"] = session.admission.mode
+        if recorder is not None:
+            recorder.record_assistant(greeting_response)
         await websocket.send_json(greeting_response)
         
         while True:
             # Check for proctoring violations
             if observation_engine is not None:
-                latest_obs = observation_engine.get_latest_observation()
+                latest_obs = await asyncio.to_thread(_latest_observation, session.session_id)
                 if latest_obs:
                     face_data = latest_obs.get("face", {})
                     if face_data.get("multiple_faces") or face_data.get("violation"):
@@ -144,19 +283,21 @@ async def websocket_endpoint(
             if not user_text.strip():
                 continue
                 
+            if recorder is not None:
+                recorder.record_user_text(user_text)
             history.append({"role": "user", "content": user_text})
 
             ai_response = await engine.run_turn(user_text=user_text, history=history)
             history.append({"role": "assistant", "content": ai_response.get("interviewer_response", "")})
+            if recorder is not None:
+                recorder.record_assistant(ai_response)
+            await asyncio.to_thread(session_store.update, session.session_id, history=list(history),
+                                    phase=ai_response.get("system_state"), last_response=ai_response)
 
             await websocket.send_json(ai_response)
     except WebSocketDisconnect:
-        if observation_engine is not None:
-            observation_engine.stop()
         return
     except Exception as exc:  # safeguard
-        if observation_engine is not None:
-            observation_engine.stop()
         if websocket.application_state != WebSocketState.CONNECTED:
             return
         await websocket.send_json(
@@ -170,11 +311,64 @@ async def websocket_endpoint(
                 "details": str(exc),
             }
         )
+    finally:
+        # Stops only this session's engine; its report stays available until expiry
+        await _release_session(session.session_id, session_token)
+
+
+def _preload_api_modules() -> None:
+    """Import the heavy modules the API process itself uses (frame decode, Gemini)."""
+    for name in ("cv2", "google.generativeai"):
+        try:
+            importlib.import_module(name)
+        except ImportError as exc:
+            print(f"[WARN] Could not preload {name}: {exc}")
+
+
+@app.on_event("startup")
+async def start_warm_up() -> None:
+    # Heavy imports and model loading happen off the startup path; see /ready
+    vision_pool.warm_up()
+    asyncio.get_running_loop().run_in_executor(None, _preload_api_modules)
+
+
+@app.on_event("shutdown")
+async def shutdown_workers() -> None:
+    frame_decoder.shutdown()
+    vision_pool.shutdown()
 
 
 @app.get("/health")
-async def health() -> Dict[str, str]:
-    return {"status": "ok"}
+async def health() -> Dict[str, Any]:
+    return {"status": "ok", "capacity": admission_controller.snapshot()}
+
+
+@app.get("/metrics")
+async def get_metrics() -> Response:
+    """Prometheus metrics: stage latencies, queue depths, drops and per-session rates."""
+    # Per-session gauges are rebuilt at scrape time so ended sessions disappear
+    metrics.QUEUE_DEPTH.clear()
+    metrics.SESSION_OBSERVATION_RATE.clear()
+    active = session_registry.active_sessions()
+    for session in active:
+        engine = session.engine
+        if engine is None:
+            continue
+        for queue_name, depth in engine.queue_depths().items():
+            metrics.QUEUE_DEPTH.set(depth, session=session.session_id, queue=queue_name)
+        metrics.SESSION_OBSERVATION_RATE.set(engine.observation_rate(), session=session.session_id)
+    metrics.QUEUE_DEPTH.set(frame_decoder.pending, session="", queue="frame_decoder")
+    metrics.ACTIVE_SESSIONS.set(len(active))
+    if vision_pool.warmup_seconds is not None:
+        metrics.WARMUP_SECONDS.set(vision_pool.warmup_seconds)
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness probe: 200 once the vision models are loaded, 503 while warming up."""
+    status = vision_pool.readiness()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
 
 
 # ============================================================================
@@ -182,8 +376,10 @@ async def health() -> Dict[str, str]:
 # ============================================================================
 
 @app.post("/observation/start")
-async def start_observation() -> Dict[str, Any]:
-    """Start the observation engine (camera + audio monitoring)."""
+async def start_observation(session_id: Optional[str] = None) -> Dict[str, Any]:
+    """Start the session's observation engine (camera + audio monitoring)."""
+    # A session held by another worker is taken over from the store
+    observation_engine = await asyncio.to_thread(session_registry.get_engine, session_id, True)
     if observation_engine is None:
         return {"success": True, "message": "Observation not available, interview proceeding without behavioral analysis"}
     success = observation_engine.start()
@@ -194,23 +390,29 @@ async def start_observation() -> Dict[str, Any]:
 
 
 @app.post("/observation/stop")
-async def stop_observation() -> Dict[str, str]:
-    """Stop the observation engine."""
-    if observation_engine is not None:
-        observation_engine.stop()
+async def stop_observation(session_id: Optional[str] = None) -> Dict[str, str]:
+    """Stop the session's observation engine."""
+    # Joins the observation thread and saves the session state, or ends the
+    # session through the store if another worker holds it
+    await asyncio.to_thread(session_registry.stop_observation, session_id)
     return {"success": "true", "message": "Observation engine stopped"}
 
 
 @app.post("/observation/add_audio")
-async def add_audio_frame(payload: Dict[str, Any]) -> Dict[str, str]:
+async def add_audio_frame(payload: Dict[str, Any], session_id: Optional[str] = None) -> Dict[str, str]:
     """Add audio frame for analysis (base64 encoded)."""
+    observation_engine = await _frame_engine(session_id)
     if observation_engine is None:
         return {"success": "true"}
     import base64
     try:
         audio_base64 = payload.get("audio_data", "")
         if audio_base64:
-            audio_bytes = base64.b64decode(audio_base64)
+            with metrics.stage("base64_decode"):
+                audio_bytes = base64.b64decode(audio_base64)
+            recorder = session_registry.get_recorder(session_id)
+            if recorder is not None:
+                recorder.record_audio(audio_bytes)
             audio_array = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
             observation_engine.add_audio_frame(audio_array)
         return {"success": "true"}
@@ -219,19 +421,24 @@ async def add_audio_frame(payload: Dict[str, Any]) -> Dict[str, str]:
 
 
 @app.post("/observation/add_video_frame")
-async def add_video_frame(payload: Dict[str, Any]) -> Dict[str, str]:
-    """Add video frame for analysis (base64 encoded image)."""
+async def add_video_frame(payload: Dict[str, Any], session_id: Optional[str] = None) -> Dict[str, str]:
+    """Add video frame for analysis (base64 encoded image).
+
+    Kept for older clients; new clients stream binary frames over /observation/ws.
+    """
+    observation_engine = await _frame_engine(session_id)
     if observation_engine is None:
         return {"success": "true"}
-    import base64
-    import cv2
     try:
         frame_base64 = payload.get("frame_data", "")
         if frame_base64:
             # Decode base64 to image
-            img_bytes = base64.b64decode(frame_base64)
-            img_array = np.frombuffer(img_bytes, dtype=np.uint8)
-            frame = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+            with metrics.stage("base64_decode"):
+                img_bytes = base64.b64decode(frame_base64)
+            recorder = session_registry.get_recorder(session_id)
+            if recorder is not None:
+                recorder.record_video(img_bytes)
+            frame = await frame_decoder.decode(img_bytes)
             
             if frame is not None:
                 observation_engine.add_video_frame(frame)
@@ -241,6 +448,53 @@ async def add_video_frame(payload: Dict[str, Any]) -> Dict[str, str]:
         return {"success": "false", "error": str(e)}
 
 
+@app.websocket("/observation/ws")
+async def observation_ingest(websocket: WebSocket) -> None:
+    """Persistent ingest channel for binary video/audio frames (see frame_ingest)."""
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            data = message.get("bytes")
+            if data is None:
+                # Text messages are reserved for control traffic
+                continue
+
+            try:
+                header, frame_payload = parse_frame(data)
+            except ValueError as exc:
+                await websocket.send_json({"type": "error", "error": str(exc)})
+                continue
+
+            recorder = session_registry.get_recorder(header.session_id)
+            if recorder is not None:
+                if header.kind == KIND_VIDEO:
+                    recorder.record_video(frame_payload)
+                elif header.kind == KIND_AUDIO:
+                    recorder.record_audio(frame_payload)
+
+            # Frames are routed by the session id carried in each header
+            observation_engine = await _frame_engine(header.session_id)
+            if observation_engine is None:
+                continue
+
+            if header.kind == KIND_VIDEO:
+                frame = await frame_decoder.decode(frame_payload)
+                if frame is not None:
+                    observation_engine.add_video_frame(frame)
+                # Tell the client how fast / how large to capture given this session's latency
+                capture_config = observation_engine.poll_capture_config()
+                if capture_config is not None:
+                    await websocket.send_json(capture_config)
+            elif header.kind == KIND_AUDIO:
+                observation_engine.add_audio_frame(decode_pcm16(frame_payload))
+    except WebSocketDisconnect:
+        return
+
+
 @app.options("/observation/latest")
 async def options_latest():
     """Handle CORS preflight for /observation/latest"""
@@ -248,99 +502,100 @@ async def options_latest():
 
 
 @app.get("/observation/latest")
-async def get_latest_observation() -> Dict[str, Any]:
-    """Get the latest behavioral observation."""
+async def get_latest_observation(session_id: Optional[str] = None):
+    """Get the session's latest behavioral observation with its precomputed warnings."""
+    observation_engine = session_registry.serving_engine(session_id)
     if observation_engine is None:
+        # Observed by another worker (or finished): serve the shared state
+        state = await asyncio.to_thread(session_registry.get_state, session_id) or {}
+        payload = (state.get("observation") or {}).get("latest")
+        return payload or {"success": True, "observation": None, "warnings": []}
+    
+    # Payload (warnings + sanitized observation) is built once by the engine
+    payload_json = observation_engine.get_latest_payload_json()
+    if payload_json is None:
         return {"success": True, "observation": None, "warnings": []}
+    return Response(content=payload_json, media_type="application/json")
+
+
+@app.websocket("/observation/stream")
+async def observation_stream(websocket: WebSocket, session_id: Optional[str] = None) -> None:
+    """Push each new observation (and its warnings) as soon as the session's engine produces it."""
+    await websocket.accept()
+    # Only the engine receiving the session's frames has anything to push;
+    # elsewhere the socket is closed and the client polls /observation/latest
+    observation_engine = await asyncio.to_thread(session_registry.held_engine, session_id)
+    if observation_engine is None or not observation_engine.running:
+        await websocket.close()
+        return
     
-    obs = observation_engine.get_latest_observation()
-    warnings = []
+    loop = asyncio.get_running_loop()
+    # Latest-wins mailbox: a slow client skips stale observations instead of queueing them
+    updates: asyncio.Queue = asyncio.Queue(maxsize=1)
     
-    if obs:
-        # Check for violations
-        face_data = obs.get("face", {})
-        
-        # Multiple persons detected (YOLOv8 based - much more reliable)
-        if face_data.get("multiple_faces") or face_data.get("face_count", 0) > 1:
-            warnings.append({
-                "type": "VIOLATION",
-                "severity": "CRITICAL",
-                "message": "⚠️ Multiple persons detected in frame! Please ensure only you are visible to the camera.",
-                "icon": "🚨"
-            })
-        
-        # Eye contact detection with proper confidence-based thresholds
-        # These thresholds are based on actual camera looking values:
-        # 0.8-1.0 = looking at camera (good)
-        # 0.5-0.8 = mostly looking (acceptable)
-        # 0.3-0.5 = borderline (warning)
-        # 0.0-0.3 = not looking (warning)
-        eye_contact = face_data.get("eye_contact_confidence", 0.5)
-        looking_away = face_data.get("looking_away", False)
-        
-        # Only warn if eye contact is low (< 0.35) AND explicitly looking away
-        # This prevents false positives from slight head movements
-        if eye_contact < 0.35 and looking_away:
-            warnings.append({
-                "type": "BEHAVIOR",
-                "severity": "WARNING",
-                "message": "👁️ You're looking away from the camera. Please maintain eye contact with the camera lens.",
-                "icon": "⚠️"
-            })
-        # Additional warning for very low eye contact (< 0.25) regardless of looking_away
-        elif eye_contact < 0.25:
-            warnings.append({
-                "type": "BEHAVIOR",
-                "severity": "WARNING",
-                "message": "👁️ Please look at the camera. Eye contact is important for the interview.",
-                "icon": "⚠️"
-            })
-        
-        # Face not detected
-        if not face_data.get("face_detected", False):
-            warnings.append({
-                "type": "TECHNICAL",
-                "severity": "WARNING",
-                "message": "📸 Face not detected. Please ensure you're visible in the camera frame.",
-                "icon": "⚠️"
-            })
-        
-        # Sanitize observation data
-        sanitized_obs = sanitize_for_json({
-            "timestamp": obs.get("timestamp", 0),
-            "face": obs.get("face", {}),
-            "emotion": obs.get("emotion", {}),
-            "audio": obs.get("audio", {}),
-            "pace_adjustment": obs.get("pace_adjustment", {}),
-        })
-        
-        return {
-            "success": True,
-            "observation": sanitized_obs,
-            "warnings": warnings
-        }
+    def offer(payload_json: str) -> None:
+        if updates.full():
+            updates.get_nowait()
+        updates.put_nowait(payload_json)
     
-    return {"success": True, "observation": None, "warnings": []}
+    def on_payload(payload_json: str) -> None:
+        # Called from the observation thread
+        loop.call_soon_threadsafe(offer, payload_json)
+    
+    observation_engine.add_listener(on_payload)
+    incoming = None
+    try:
+        latest = observation_engine.get_latest_payload_json()
+        if latest is not None:
+            await websocket.send_text(latest)
+        # Watch the socket as well so an idle stream notices the client leaving
+        incoming = asyncio.ensure_future(websocket.receive())
+        owner_check = observation_config.OBSERVATION_STREAM_OWNER_CHECK
+        checked_at = loop.time()
+        while True:
+            next_update = asyncio.ensure_future(updates.get())
+            done, _ = await asyncio.wait({incoming, next_update}, timeout=owner_check,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if next_update in done:
+                await websocket.send_text(next_update.result())
+            else:
+                next_update.cancel()
+            if incoming in done:
+                if incoming.result()["type"] == "websocket.disconnect":
+                    break
+                incoming = asyncio.ensure_future(websocket.receive())
+            if loop.time() - checked_at >= owner_check:
+                checked_at = loop.time()
+                # Frames moved to another worker: this engine only repeats
+                # heartbeats, so let the client poll the shared state instead
+                if await asyncio.to_thread(session_registry.held_engine, session_id) is not observation_engine:
+                    await websocket.close()
+                    break
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        observation_engine.remove_listener(on_payload)
+        if incoming is not None:
+            incoming.cancel()
 
 
 @app.get("/observation/report")
-async def get_observation_report() -> Dict[str, Any]:
-    """Get final behavioral analysis report."""
+async def get_observation_report(session_id: Optional[str] = None):
+    """Get the session's final behavioral analysis report."""
+    observation_engine = session_registry.serving_engine(session_id)
     if observation_engine is None:
-        return {"success": True, "report": None}
-    report = observation_engine.get_report()
-    return {
-        "success": True,
-        "report": sanitize_for_json(report)
-    }
+        state = await asyncio.to_thread(session_registry.get_state, session_id) or {}
+        return {"success": True, "report": (state.get("observation") or {}).get("report")}
     report = observation_engine.generate_report()
-    return {"success": True, "report": report}
+    return Response(
+        content=encode_payload({"success": True, "report": report}),
+        media_type="application/json",
+    )
 
 
 @app.post("/observation/reset")
-async def reset_observation() -> Dict[str, str]:
-    """Reset observation engine for new interview."""
-    if observation_engine is not None:
-        observation_engine.reset()
+async def reset_observation(session_id: Optional[str] = None) -> Dict[str, Any]:
+    """Reset the session's observation engine for a new interview."""
+    await asyncio.to_thread(session_registry.reset_observation, session_id)
     return {"success": True, "message": "Observation engine reset"}
 
@@ -0,0 +1,123 @@
+"""
+Micro-batching of work submitted from many threads.
+Items that arrive within a short window are handed to one batched call,
+so N concurrent sessions cost one forward pass instead of N.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects submitted items for up to `window` seconds (or `max_batch` items)
+    and runs them through `run_batch` on a dedicated dispatcher thread.
+
+    `run_batch` receives the list of items and must return one result per item,
+    in order. A result that is an Exception instance fails only that item.
+
+    At most `max_pending` items wait for dispatch; past that the oldest waiting
+    item is cancelled. Items whose future was cancelled before their batch
+    started are skipped.
+    """
+
+    def __init__(self, run_batch: Callable[[List[Any]], List[Any]], max_batch: int = 8,
+                 window: float = 0.015, name: str = "micro-batcher", max_pending: int = 64):
+        self.run_batch = run_batch
+        self.max_batch = max(1, max_batch)
+        self.window = window
+        self.name = name
+        self.max_pending = max(self.max_batch, max_pending)
+
+        self._pending: List[Tuple[Any, Future]] = []
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = None
+
+        # Stats
+        self.batches_run = 0
+        self.items_run = 0
+        self.items_dropped = 0
+
+    def submit(self, item: Any) -> Future:
+        """Queue an item; the returned future resolves to its batch result."""
+        future: Future = Future()
+        with self._cond:
+            if not self._running:
+                raise RuntimeError(f"{self.name} is stopped")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch_loop, name=self.name, daemon=True)
+                self._thread.start()
+            self._pending.append((item, future))
+            dropped = self._pending[:-self.max_pending] if len(self._pending) > self.max_pending else []
+            if dropped:
+                del self._pending[:len(dropped)]
+                self.items_dropped += len(dropped)
+            self._cond.notify()
+        for _, stale in dropped:
+            stale.cancel()
+        return future
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.items_run / self.batches_run if self.batches_run else 0.0
+
+    def _take_batch(self) -> List[Tuple[Any, Future]]:
+        """Wait for a first item, then keep collecting until the window closes or the batch fills."""
+        with self._cond:
+            while self._running and not self._pending:
+                self._cond.wait()
+            if not self._pending:
+                return []
+
+            deadline = time.monotonic() + self.window
+            while self._running and len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = self._pending[:self.max_batch]
+            self._pending = self._pending[self.max_batch:]
+            return batch
+
+    def _dispatch_loop(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            # Callers that gave up (cancelled their future) are not run
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                results = self.run_batch(items)
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: expected {len(batch)} results, got {len(results)}")
+            except Exception as e:
+                logger.error(f"[MicroBatcher] {self.name} batch failed: {e!r}")
+                results = [e] * len(batch)
+
+            self.batches_run += 1
+            self.items_run += len(batch)
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def stop(self):
+        """Stop dispatching; items still pending are failed."""
+        with self._cond:
+            self._running = False
+            pending, self._pending = self._pending, []
+            self._cond.notify_all()
+        for _, future in pending:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError(f"{self.name} stopped"))
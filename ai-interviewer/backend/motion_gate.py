@@ -0,0 +1,138 @@
+"""
+Motion / scene-change gate in front of frame analysis.
+A candidate mostly sits still, so consecutive frames often carry no new
+information. The gate compares a tiny grayscale thumbnail of each frame
+(plus one of the face region, so blinks and glances still count as change)
+with the last analyzed frame. When neither changed, the previous face and
+emotion results are reused with refreshed ages instead of running the
+analyzers. A full analysis is forced once the reused results get too old.
+"""
+import time
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+cv2 = lazy_import("cv2")
+
+# Thumbnail sizes (width, height) for the whole frame and the face region
+GATE_FRAME_SIZE = (32, 24)
+GATE_FACE_SIZE = (24, 24)
+# A thumbnail pixel counts as changed when it differs by more than this many gray levels
+GATE_PIXEL_THRESHOLD = 10
+# A frame is new when more than this fraction of its thumbnail pixels changed
+GATE_FRAME_CHANGE = 0.02
+GATE_FACE_CHANGE = 0.01
+# Re-analyze at least this often even if nothing changed (seconds)
+GATE_MAX_STALENESS = 1.0
+
+
+class MotionGate:
+    """Decides whether a frame differs enough from the last analyzed one to analyze it."""
+
+    def __init__(self, pixel_threshold: int = GATE_PIXEL_THRESHOLD, frame_change: float = GATE_FRAME_CHANGE,
+                 face_change: float = GATE_FACE_CHANGE, max_staleness: float = GATE_MAX_STALENESS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.pixel_threshold = pixel_threshold
+        self.frame_change = frame_change
+        self.face_change = face_change
+        self.max_staleness = max_staleness
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.last_reused = False
+        self._reference: Optional[Tuple[np.ndarray, Optional[np.ndarray]]] = None
+        self._face_box: Optional[Tuple[int, int, int, int]] = None
+        self._analyzed_at: Optional[float] = None
+        self._results = None
+        # Decision and thumbnails for the frame last passed to check()
+        self._checked_frame: Optional[np.ndarray] = None
+        self._checked: Tuple[bool, Tuple[np.ndarray, Optional[np.ndarray]]] = (False, None)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _thumbnails(self, frame: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        # Averaging every pixel is not needed to spot change; a strided view
+        # still leaves ~16 samples per thumbnail pixel and halves the cost
+        step = max(1, frame.shape[1] // (GATE_FRAME_SIZE[0] * 4))
+        small = cv2.resize(frame[::step, ::step], GATE_FRAME_SIZE, interpolation=cv2.INTER_AREA)
+        frame_thumb = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        face_thumb = None
+        if self._face_box is not None:
+            x, y, w, h = self._face_box
+            region = frame[max(0, y):y + h, max(0, x):x + w]
+            if region.size:
+                face_thumb = cv2.cvtColor(
+                    cv2.resize(region, GATE_FACE_SIZE, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY
+                )
+        return frame_thumb, face_thumb
+
+    def _changed(self, current: np.ndarray, reference: np.ndarray) -> float:
+        """Fraction of thumbnail pixels that changed."""
+        diff = cv2.absdiff(current, reference)
+        return np.count_nonzero(diff > self.pixel_threshold) / diff.size
+
+    def check(self, frame: np.ndarray, now: Optional[float] = None) -> bool:
+        """
+        Whether `frame` can reuse the last analyzed results.
+        Checking the same frame object again returns the first decision.
+        """
+        if frame is self._checked_frame:
+            return self._checked[0]
+        now = self.clock() if now is None else now
+        thumbnails = self._thumbnails(frame)
+        reuse = False
+        if (self._reference is not None and self._results is not None
+                and now - self._analyzed_at < self.max_staleness):
+            frame_thumb, face_thumb = thumbnails
+            ref_frame, ref_face = self._reference
+            reuse = self._changed(frame_thumb, ref_frame) <= self.frame_change
+            if reuse and face_thumb is not None and ref_face is not None:
+                reuse = self._changed(face_thumb, ref_face) <= self.face_change
+
+        self._checked_frame = frame
+        self._checked = (reuse, thumbnails)
+        self.last_reused = reuse
+        if reuse:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return reuse
+
+    def reused_results(self, now: Optional[float] = None):
+        """The last analyzed results and their age in seconds."""
+        now = self.clock() if now is None else now
+        return self._results, now - self._analyzed_at
+
+    def analyzed(self, frame: np.ndarray, results, face_box: Optional[Tuple[int, int, int, int]] = None,
+                 now: Optional[float] = None):
+        """Make `frame` the reference for later frames, with the results computed for it."""
+        now = self.clock() if now is None else now
+        box_changed = face_box != self._face_box
+        self._face_box = face_box
+        if frame is self._checked_frame and not box_changed:
+            self._reference = self._checked[1]
+        else:
+            # Thumbnails must cover the face region of this frame's result
+            self._reference = self._thumbnails(frame)
+        self._results = results
+        self._analyzed_at = now
+        self._checked_frame = None
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+        self.last_reused = False
+        self._reference = None
+        self._face_box = None
+        self._analyzed_at = None
+        self._results = None
+        self._checked_frame = None
+        self._checked = (False, None)
@@ -2,6 +2,7 @@
 Observation Engine Configuration
 Centralized settings for all observation analyzers.
 """
+import os
 
 # ============================================================================
 # CAMERA SETTINGS
@@ -32,8 +33,9 @@ PITCH_LOOKING_AWAY_THRESHOLD = 20  # Head turn up/down
 # Emotion model type: 'heuristic' or 'model'
 EMOTION_MODEL_TYPE = 'heuristic'
 
-# Optional path to local emotion model
-EMOTION_MODEL_PATH = None  # e.g., './emotion_model.onnx'
+# Optional path to the ONNX emotion model (EMOTION_MODEL_PATH env var);
+# emotion_analyzer falls back to backend/emotion_model.onnx
+EMOTION_MODEL_PATH = os.environ.get("EMOTION_MODEL_PATH") or None
 
 # ============================================================================
 # AUDIO ANALYZER SETTINGS
@@ -83,11 +85,55 @@ OBSERVATION_LOOP_INTERVAL = 0.1  # ~10 Hz
 # Frontend polling frequency (milliseconds)
 FRONTEND_POLLING_INTERVAL = 500  # 500ms
 
+# Seconds between observations published while no new frame or audio arrives
+OBSERVATION_HEARTBEAT_INTERVAL = 1.0
+
+# Seconds the last frame's face/emotion results are reported once frames stop
+OBSERVATION_FRAME_MAX_AGE = 3.0
+
+# Seconds between checks that an /observation/stream socket's engine still
+# receives the session's frames (with several workers, another may take over)
+OBSERVATION_STREAM_OWNER_CHECK = 5.0
+
 # Maximum queue sizes
 FRAME_QUEUE_SIZE = 5
 AUDIO_QUEUE_SIZE = 10
 OBSERVATION_QUEUE_SIZE = 100
 
+# ============================================================================
+# FRAME INGEST SETTINGS
+# ============================================================================
+
+# Threads used to decode incoming JPEG frames off the event loop
+FRAME_DECODE_WORKERS = 2
+
+# Maximum decodes in flight before new frames are dropped
+FRAME_DECODE_MAX_PENDING = 8
+
+# ============================================================================
+# VISION WORKER POOL SETTINGS
+# ============================================================================
+
+# Worker processes for face/emotion analysis, shared by all sessions.
+# None = one per core (minus one for the API), 0 = analyze in-process.
+# Override with the VISION_WORKERS environment variable.
+VISION_WORKER_PROCESSES = int(os.environ["VISION_WORKERS"]) if os.environ.get("VISION_WORKERS") else None
+
+# Seconds a session waits for a pooled analysis result before skipping the frame
+VISION_RESULT_TIMEOUT = 2.0
+
+# Cross-session micro-batching of YOLO person detection
+PERSON_BATCH_WINDOW_MS = 15  # wait this long for other sessions' frames
+PERSON_BATCH_MAX_SIZE = 8    # or until this many frames are pending
+PERSON_BATCH_MAX_PENDING = 32  # frames waiting per worker before the oldest is dropped
+
+# Synthetic frames run through the analyzers when a worker or session starts,
+# so the first real frame hits steady-state latency (0 disables)
+OBSERVATION_WARMUP_FRAMES = 2
+
+# Seconds a starting session waits for its analyzers to warm up
+OBSERVATION_WARMUP_TIMEOUT = 30.0
+
 # ============================================================================
 # LOGGING SETTINGS
 # ============================================================================
@@ -98,6 +144,58 @@ DETAILED_LOGGING = False
 # Enable debug output
 DEBUG_MODE = True
 
+# Directory for per-session facial expression logs
+OBSERVATION_LOG_DIR = "logs"
+
+# ============================================================================
+# SESSION SETTINGS
+# ============================================================================
+
+# How long a finished session is kept so its report can still be fetched (seconds)
+SESSION_RETENTION_SECONDS = 600
+
+# Directory for per-session replay recordings (see session_recording).
+# None disables recording; set with the SESSION_RECORDING_DIR environment variable.
+SESSION_RECORDING_DIR = os.environ.get("SESSION_RECORDING_DIR") or None
+
+# SQLite file holding session state shared by all uvicorn workers on the host.
+# None keeps state in process memory (single worker); set with SESSION_STORE_PATH.
+SESSION_STORE_PATH = os.environ.get("SESSION_STORE_PATH") or None
+
+# Seconds between saves of a session's observation state to the store
+SESSION_STATE_INTERVAL = 5.0
+
+# How long an idle session's state is kept in the store (seconds)
+SESSION_STORE_RETENTION_SECONDS = 86400
+
+# ============================================================================
+# ADMISSION CONTROL SETTINGS
+# ============================================================================
+
+# Hard cap on concurrent interviews per process (None = limited only by load)
+MAX_SESSIONS = None
+
+# Frame rates analyzed for normal and degraded sessions
+ADMISSION_FULL_FPS = 6.0
+ADMISSION_REDUCED_FPS = 2.0
+
+# Fraction of vision worker capacity that may be committed to sessions
+ADMISSION_TARGET_UTILIZATION = 0.8
+
+# Per-frame analysis cost assumed before any frame has been measured (seconds)
+ADMISSION_INITIAL_FRAME_COST = 0.08
+
+# ============================================================================
+# CAPTURE NEGOTIATION SETTINGS
+# ============================================================================
+
+# Bounds of the capture fps requested from the client
+CAPTURE_MAX_FPS = 6.0
+CAPTURE_MIN_FPS = 1.0
+
+# Minimum seconds between capture_config updates sent to a client
+CAPTURE_UPDATE_INTERVAL = 1.0
+
 # ============================================================================
 # REPORT GENERATION SETTINGS
 # ============================================================================
@@ -1,36 +1,82 @@
 """
 Observation logging and final behavioral report generation.
-Accumulates observations throughout interview.
+Keeps running aggregates of the observations made throughout an interview.
 """
 import json
 import time
 from typing import Dict, List, Optional
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
 import os
 
+# Observations kept verbatim; the report is built from running aggregates
+RECENT_OBSERVATIONS = 300
+
+_STRESS_LEVELS = ("low", "medium", "high")
+
 
 class ObservationLogger:
-    """Logs observations and generates final behavioral analysis report."""
+    """
+    Logs observations and generates final behavioral analysis report.
+    Each observation updates running counts and sums, and only the most
+    recent ones are kept, so memory stays flat however long the interview.
+    """
 
-    def __init__(self):
-        self.observations = []
+    def __init__(self, log_file: str = "facial_expressions.txt"):
+        self.observations = deque(maxlen=RECENT_OBSERVATIONS)
+        self.observation_count = 0
         self.violations = defaultdict(int)
         self.session_start = time.time()
-        self.eye_contact_periods = []
-        self.stress_timeline = []
-        self.voice_confidence_scores = []
-        self.expression_scores = defaultdict(list)
-        self.looking_away_cumulative = 0
+        self.face_detected_count = 0
+        self.looking_away_cumulative = 0  # looking away while the face was detected
+        self.stress_counts = defaultdict(int)  # audio stress level -> observations
+        self.fallback_stress_counts = defaultdict(int)  # audio or facial stress, for sessions without audio
+        self.voice_confidence_sum = 0.0
+        self.voice_confidence_count = 0
+        self.expression_sums = defaultdict(float)
+        self.expression_counts = defaultdict(int)
         self.total_observation_time = 0
         
         # Create log file for facial expressions
-        self.log_file = "facial_expressions.txt"
+        self.log_file = log_file
         self._initialize_log_file()
     
+    def export_state(self) -> Dict:
+        """Aggregates behind the report, for resuming the session in another process."""
+        return {
+            "elapsed": time.time() - self.session_start,
+            "observation_count": self.observation_count,
+            "violations": dict(self.violations),
+            "face_detected_count": self.face_detected_count,
+            "looking_away_cumulative": self.looking_away_cumulative,
+            "stress_counts": dict(self.stress_counts),
+            "fallback_stress_counts": dict(self.fallback_stress_counts),
+            "voice_confidence_sum": float(self.voice_confidence_sum),
+            "voice_confidence_count": self.voice_confidence_count,
+            "expression_sums": {k: float(v) for k, v in self.expression_sums.items()},
+            "expression_counts": dict(self.expression_counts),
+        }
+
+    def restore_state(self, state: Dict):
+        """Load state produced by export_state; new observations continue the same report."""
+        self.session_start = time.time() - state.get("elapsed", 0.0)
+        self.observation_count = state.get("observation_count", 0)
+        self.violations = defaultdict(int, state.get("violations", {}))
+        self.face_detected_count = state.get("face_detected_count", 0)
+        self.looking_away_cumulative = state.get("looking_away_cumulative", 0)
+        self.stress_counts = defaultdict(int, state.get("stress_counts", {}))
+        self.fallback_stress_counts = defaultdict(int, state.get("fallback_stress_counts", {}))
+        self.voice_confidence_sum = state.get("voice_confidence_sum", 0.0)
+        self.voice_confidence_count = state.get("voice_confidence_count", 0)
+        self.expression_sums = defaultdict(float, state.get("expression_sums", {}))
+        self.expression_counts = defaultdict(int, state.get("expression_counts", {}))
+
     def _initialize_log_file(self):
         """Initialize the facial expressions log file."""
         try:
+            log_dir = os.path.dirname(self.log_file)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
             with open(self.log_file, "w", encoding="utf-8") as f:
                 f.write("="*80 + "\n")
                 f.write("FACIAL EXPRESSION ANALYSIS LOG\n")
@@ -47,47 +93,41 @@ class ObservationLogger:
             **observation
         }
         self.observations.append(obs_entry)
+        self.observation_count += 1
         self._update_analytics(observation)
         self._log_facial_data_to_file(observation)
 
     def _update_analytics(self, observation: Dict):
         """Update running analytics from observation."""
         # Debug: Print observation structure periodically
-        if len(self.observations) % 50 == 1:
+        if self.observation_count % 50 == 1:
             print(f"[DEBUG] Observation structure sample: face_detected={observation.get('face_detected')}, face keys={list(observation.get('face', {}).keys())}")
         
         # Eye contact tracking
         face_data = observation.get("face", {})
         if face_data.get("face_detected"):
-            looking_away = face_data.get("looking_away", False)
-            eye_contact = not looking_away
-            self.eye_contact_periods.append({
-                "timestamp": time.time() - self.session_start,
-                "eye_contact": eye_contact
-            })
-            if looking_away:
+            self.face_detected_count += 1
+            if face_data.get("looking_away", False):
                 self.looking_away_cumulative += 1
         
-        # Stress timeline
+        # Stress levels
         audio_data = observation.get("audio", {})
+        emotion_data = observation.get("emotion", {})
         if audio_data.get("stress_level"):
-            self.stress_timeline.append({
-                "timestamp": time.time() - self.session_start,
-                "stress_level": audio_data["stress_level"],
-                "pitch_spike": audio_data.get("pitch_spike", False),
-                "silence": audio_data.get("silence_detected", False)
-            })
+            self.stress_counts[audio_data["stress_level"]] += 1
+        stress = audio_data.get("stress_level") or emotion_data.get("stress_level")
+        if stress in _STRESS_LEVELS:
+            self.fallback_stress_counts[stress] += 1
         
         # Voice confidence
         if "voice_confidence" in audio_data:
-            self.voice_confidence_scores.append(audio_data["voice_confidence"])
+            self.voice_confidence_sum += float(audio_data["voice_confidence"])
+            self.voice_confidence_count += 1
         
         # Expression tracking
-        emotion_data = observation.get("emotion", {})
         if emotion_data.get("emotion"):
-            self.expression_scores[emotion_data["emotion"]].append(
-                emotion_data.get("confidence", 0.0)
-            )
+            self.expression_sums[emotion_data["emotion"]] += float(emotion_data.get("confidence", 0.0))
+            self.expression_counts[emotion_data["emotion"]] += 1
         
         # Violation tracking
         if face_data.get("looking_away"):
@@ -184,12 +224,12 @@ class ObservationLogger:
             "behavioral_improvements": improvements,
             "overall_interview_readiness": readiness,
             "detailed_metrics": {
-                "total_observations": len(self.observations),
+                "total_observations": self.observation_count,
                 "looking_away_incidents": int(self.violations.get("looked_away", 0)),
                 "high_stress_incidents": int(self.violations.get("high_stress", 0)),
                 "long_silence_incidents": int(self.violations.get("long_silence", 0)),
                 "face_not_detected": int(self.violations.get("face_not_detected", 0)),
-                "avg_voice_confidence": float(np.mean(self.voice_confidence_scores)) if self.voice_confidence_scores else 0.0,
+                "avg_voice_confidence": self._mean_voice_confidence(0.0),
                 "dominant_expressions": dict(self._get_dominant_expressions()),
             }
         }
@@ -198,57 +238,22 @@ class ObservationLogger:
 
     def _calculate_eye_contact_score(self) -> float:
         """Calculate eye contact score (0-10)."""
-        if not self.eye_contact_periods:
-            # Fallback: check all observations for face data
-            total_frames = 0
-            looking_at_camera_frames = 0
-            
-            for obs in self.observations:
-                face_data = obs.get("face", {})
-                if face_data.get("face_detected"):
-                    total_frames += 1
-                    if face_data.get("looking_at_camera"):
-                        looking_at_camera_frames += 1
-                    # Also use eye contact confidence if available
-                    elif face_data.get("eye_contact_confidence", 0) > 0.7:
-                        looking_at_camera_frames += 1
-            
-            if total_frames == 0:
-                return 0.0
-            
-            score = (looking_at_camera_frames / total_frames) * 10
-            return float(np.clip(score, 0, 10))
-        
-        eye_contact_count = sum(1 for p in self.eye_contact_periods if p["eye_contact"])
-        total = len(self.eye_contact_periods)
-        score = (eye_contact_count / total) * 10 if total > 0 else 0
+        if self.face_detected_count == 0:
+            return 0.0
+        eye_contact_count = self.face_detected_count - self.looking_away_cumulative
+        score = (eye_contact_count / self.face_detected_count) * 10
         return float(np.clip(score, 0, 10))
 
     def _calculate_focus_score(self) -> float:
         """Calculate focus/consistency score (0-10)."""
-        if not self.observations:
-            return 5.0
-        
-        # Focus = consistent eye contact + low looking away incidents + face detected
-        total_frames = len(self.observations)
-        face_detected_count = 0
-        looking_away_count = 0
-        
-        for obs in self.observations:
-            face_data = obs.get("face", {})
-            if face_data.get("face_detected"):
-                face_detected_count += 1
-                if face_data.get("looking_away"):
-                    looking_away_count += 1
-        
-        if total_frames == 0:
+        if not self.observation_count:
             return 5.0
         
         # Calculate focus: presence (face detected) + attention (not looking away)
-        presence_score = (face_detected_count / total_frames) * 10
+        presence_score = (self.face_detected_count / self.observation_count) * 10
         
-        if face_detected_count > 0:
-            attention_ratio = 1 - (looking_away_count / face_detected_count)
+        if self.face_detected_count > 0:
+            attention_ratio = 1 - (self.looking_away_cumulative / self.face_detected_count)
             attention_score = attention_ratio * 10
         else:
             attention_score = 0
@@ -259,34 +264,16 @@ class ObservationLogger:
         return float(np.clip(focus_score, 0, 10))
 
     def _calculate_stress_level(self) -> str:
-        """Determine overall stress level from timeline."""
-        if not self.stress_timeline:
-            # Fallback: check observations
-            stress_counts = {"low": 0, "medium": 0, "high": 0, "calibrating": 0}
-            
-            for obs in self.observations:
-                audio_data = obs.get("audio", {})
-                emotion_data = obs.get("emotion", {})
-                
-                stress = audio_data.get("stress_level") or emotion_data.get("stress_level")
-                if stress and stress in stress_counts:
-                    stress_counts[stress] += 1
-            
-            # Remove calibrating from consideration
-            del stress_counts["calibrating"]
-            
-            if sum(stress_counts.values()) == 0:
+        """Determine overall stress level from the observed stress levels."""
+        total = sum(self.stress_counts.values())
+        if not total:
+            # No voice stress observed: use the most common facial stress level
+            if sum(self.fallback_stress_counts[level] for level in _STRESS_LEVELS) == 0:
                 return "low"
-            
-            # Return the most common stress level
-            return max(stress_counts, key=stress_counts.get)
-        
-        high_stress_count = sum(1 for s in self.stress_timeline if s["stress_level"] == "high")
-        medium_stress_count = sum(1 for s in self.stress_timeline if s["stress_level"] == "medium")
-        total = len(self.stress_timeline)
+            return max(_STRESS_LEVELS, key=lambda level: self.fallback_stress_counts[level])
         
-        high_ratio = high_stress_count / total if total > 0 else 0
-        medium_ratio = medium_stress_count / total if total > 0 else 0
+        high_ratio = self.stress_counts.get("high", 0) / total
+        medium_ratio = self.stress_counts.get("medium", 0) / total
         
         if high_ratio > 0.3:
             return "high"
@@ -295,22 +282,15 @@ class ObservationLogger:
         else:
             return "low"
 
+    def _mean_voice_confidence(self, default: float) -> float:
+        if not self.voice_confidence_count:
+            return default
+        return float(self.voice_confidence_sum / self.voice_confidence_count)
+
     def _calculate_voice_confidence(self) -> float:
         """Calculate average voice confidence (0-10)."""
-        if not self.voice_confidence_scores:
-            # Fallback: extract from all observations
-            voice_scores = []
-            for obs in self.observations:
-                audio_data = obs.get("audio", {})
-                if "voice_confidence" in audio_data and audio_data["voice_confidence"] > 0:
-                    voice_scores.append(audio_data["voice_confidence"])
-            
-            if not voice_scores:
-                return 5.0  # Neutral score if no data
-            
-            return float(np.clip(np.mean(voice_scores), 0, 10))
-        
-        return float(np.clip(np.mean(self.voice_confidence_scores), 0, 10))
+        # Neutral score if no data
+        return float(np.clip(self._mean_voice_confidence(5.0), 0, 10))
 
     def _identify_strengths(self, eye_contact: float, voice: float, focus: float) -> List[str]:
         """Identify behavioral strengths."""
@@ -335,12 +315,12 @@ class ObservationLogger:
         
         # Calculate metrics
         eye_contact_score = self._calculate_eye_contact_score()
-        voice_avg = np.mean(self.voice_confidence_scores) if self.voice_confidence_scores else 5.0
+        voice_avg = self._mean_voice_confidence(5.0)
         looked_away_count = self.violations.get("looked_away", 0)
         face_not_detected = self.violations.get("face_not_detected", 0)
         high_stress_count = self.violations.get("high_stress", 0)
         long_silence_count = self.violations.get("long_silence", 0)
-        total_observations = max(len(self.observations), 1)
+        total_observations = max(self.observation_count, 1)
         
         # Eye contact improvements (priority 1)
         if eye_contact_score < 5.0:
@@ -442,9 +422,9 @@ class ObservationLogger:
     def _get_dominant_expressions(self) -> Dict[str, float]:
         """Get average confidence for each emotion detected."""
         dominant = {}
-        for emotion, scores in self.expression_scores.items():
-            if scores:
-                dominant[emotion] = float(np.mean(scores))
+        for emotion, count in self.expression_counts.items():
+            if count:
+                dominant[emotion] = float(self.expression_sums[emotion] / count)
         return dominant
 
     def to_json(self) -> str:
@@ -460,7 +440,7 @@ class ObservationLogger:
                 f.write("SESSION COMPLETED\n")
                 f.write(f"End Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write(f"Total Duration: {self.total_observation_time:.2f} seconds\n")
-                f.write(f"Total Observations: {len(self.observations)}\n")
+                f.write(f"Total Observations: {self.observation_count}\n")
                 f.write("="*80 + "\n")
             print(f"[INFO] Facial expression log file closed: {self.log_file}")
         except Exception as e:
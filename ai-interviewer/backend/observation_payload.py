@@ -0,0 +1,87 @@
+"""
+Client-facing observation payloads.
+Warnings and JSON are computed once per observation by the engine, so the
+/observation/latest endpoint and the push stream only hand out cached results.
+Analyzer results are typed records holding native values, so payloads are
+encoded directly without a sanitize pass.
+"""
+from typing import Dict, List
+
+try:
+    from . import observation_records
+except ImportError:
+    import observation_records
+
+
+def build_warnings(observation: Dict) -> List[Dict]:
+    """Derive UI warnings (violations, eye contact, framing) from an observation."""
+    warnings = []
+    face_data = observation.get("face", {})
+
+    # Multiple persons detected (YOLOv8 based - much more reliable)
+    if face_data.get("multiple_faces") or face_data.get("face_count", 0) > 1:
+        warnings.append({
+            "type": "VIOLATION",
+            "severity": "CRITICAL",
+            "message": "⚠️ Multiple persons detected in frame! Please ensure only you are visible to the camera.",
+            "icon": "🚨"
+        })
+
+    # Eye contact detection with proper confidence-based thresholds
+    # These thresholds are based on actual camera looking values:
+    # 0.8-1.0 = looking at camera (good)
+    # 0.5-0.8 = mostly looking (acceptable)
+    # 0.3-0.5 = borderline (warning)
+    # 0.0-0.3 = not looking (warning)
+    eye_contact = face_data.get("eye_contact_confidence", 0.5)
+    looking_away = face_data.get("looking_away", False)
+
+    # Only warn if eye contact is low (< 0.35) AND explicitly looking away
+    # This prevents false positives from slight head movements
+    if eye_contact < 0.35 and looking_away:
+        warnings.append({
+            "type": "BEHAVIOR",
+            "severity": "WARNING",
+            "message": "👁️ You're looking away from the camera. Please maintain eye contact with the camera lens.",
+            "icon": "⚠️"
+        })
+    # Additional warning for very low eye contact (< 0.25) regardless of looking_away
+    elif eye_contact < 0.25:
+        warnings.append({
+            "type": "BEHAVIOR",
+            "severity": "WARNING",
+            "message": "👁️ Please look at the camera. Eye contact is important for the interview.",
+            "icon": "⚠️"
+        })
+
+    # Face not detected
+    if not face_data.get("face_detected", False):
+        warnings.append({
+            "type": "TECHNICAL",
+            "severity": "WARNING",
+            "message": "📸 Face not detected. Please ensure you're visible in the camera frame.",
+            "icon": "⚠️"
+        })
+
+    return warnings
+
+
+def build_observation_payload(observation: Dict, sequence: int) -> Dict:
+    """Build the response body served by /observation/latest and /observation/stream."""
+    return {
+        "success": True,
+        "sequence": sequence,
+        "observation": {
+            "timestamp": observation.get("timestamp", 0),
+            "face": observation.get("face", {}),
+            "emotion": observation.get("emotion", {}),
+            "audio": observation.get("audio", {}),
+            "pace_adjustment": observation.get("pace_adjustment", {}),
+        },
+        "warnings": build_warnings(observation),
+    }
+
+
+def encode_payload(payload: Dict) -> str:
+    """Serialize a payload once so every consumer can reuse the same text."""
+    return observation_records.dumps(payload, ensure_ascii=False)
@@ -0,0 +1,185 @@
+"""
+Typed observation records.
+Analyzers return these compact, slotted records instead of ad-hoc dicts.
+Values are coerced to native Python types when a record is built, so records
+can go straight to json.dumps without a recursive sanitize pass, and the
+logger's per-session history stays small. Records are read-only Mappings,
+so existing `.get("key", default)` consumers keep working.
+"""
+import json
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+
+
+def _as_float(value) -> float:
+    return float(value)
+
+
+def _as_int(value) -> int:
+    return int(value)
+
+
+def _as_bool(value) -> bool:
+    return bool(value)
+
+
+def _as_str(value) -> str:
+    return str(value)
+
+
+def _as_float_map(value) -> Dict[str, float]:
+    return {str(k): float(v) for k, v in value.items()}
+
+
+def _as_box(value) -> Tuple[int, int, int, int]:
+    x, y, w, h = value
+    return int(x), int(y), int(w), int(h)
+
+
+def _rebuild(cls, values: Dict):
+    return cls(**values)
+
+
+class ObservationRecord(Mapping):
+    """
+    Base for slotted, read-only result records.
+
+    Subclasses list their fields in `_fields` as (name, converter) pairs.
+    Fields that were never set are absent, exactly like a missing dict key.
+    """
+
+    __slots__ = ()
+    _fields: Tuple[Tuple[str, Callable], ...] = ()
+    _converters: Dict[str, Callable] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._converters = dict(cls._fields)
+
+    def __init__(self, **values):
+        converters = self._converters
+        for name, value in values.items():
+            convert = converters.get(name)
+            if convert is None:
+                raise TypeError(f"{type(self).__name__} has no field {name!r}")
+            object.__setattr__(self, name, None if value is None else convert(value))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._converters:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        for name, _ in self._fields:
+            if hasattr(self, name):
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __reduce__(self):
+        # Slotted records cross the vision worker process boundary
+        return _rebuild, (type(self), self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self}
+
+    def replace(self, **changes) -> "ObservationRecord":
+        """Copy of this record with some fields changed."""
+        values = self.to_dict()
+        values.update(changes)
+        return type(self)(**values)
+
+
+class FaceResult(ObservationRecord):
+    """Output of FaceAnalyzer.analyze."""
+
+    _fields = (
+        ("face_detected", _as_bool),
+        ("multiple_faces", _as_bool),
+        ("face_count", _as_int),
+        ("violation", _as_str),
+        ("head_yaw", _as_float),
+        ("head_pitch", _as_float),
+        ("gaze_direction", _as_str),
+        ("gaze_offset", _as_float),
+        ("blink_detected", _as_bool),
+        ("blink_count", _as_int),
+        ("eye_aspect_ratio", _as_float),
+        ("looking_away", _as_bool),
+        ("looking_at_camera", _as_bool),
+        ("eye_contact_confidence", _as_float),
+        ("eye_aspect_ratio_left", _as_float),
+        ("eye_aspect_ratio_right", _as_float),
+        ("iris_confidence", _as_float),
+        ("head_confidence", _as_float),
+        ("face_box", _as_box),  # x, y, w, h in frame pixels
+        ("person_check_age", _as_float),  # seconds since the multi-person check ran
+        ("age_seconds", _as_float),  # > 0 when reused from an earlier frame
+    )
+    __slots__ = tuple(name for name, _ in _fields)
+
+
+class EmotionResult(ObservationRecord):
+    """Output of EmotionAnalyzer.analyze."""
+
+    _fields = (
+        ("emotion", _as_str),
+        ("confidence", _as_float),
+        ("emotion_scores", _as_float_map),
+        ("stress_level", _as_str),
+        ("brightness_variance", _as_float),
+        ("eye_brightness", _as_float),
+        ("mouth_brightness", _as_float),
+        ("edge_density", _as_float),
+        ("cheek_symmetry", _as_float),
+        ("age_seconds", _as_float),  # > 0 when carried forward from an earlier frame
+    )
+    __slots__ = tuple(name for name, _ in _fields)
+
+
+class AudioResult(ObservationRecord):
+    """Output of AudioAnalyzer.analyze."""
+
+    _fields = (
+        ("pitch", _as_float),
+        ("energy", _as_float),
+        ("speaking_rate", _as_float),
+        ("silence_duration", _as_float),
+        ("max_silence", _as_float),
+        ("silence_detected", _as_bool),
+        ("pitch_spike", _as_bool),
+        ("energy_spike", _as_bool),
+        ("stress_level", _as_str),
+        ("voice_confidence", _as_float),
+        ("baseline_pitch", _as_float),
+        ("baseline_energy", _as_float),
+    )
+    __slots__ = tuple(name for name, _ in _fields)
+
+
+def _json_default(obj):
+    """Hook for json.dumps: only called for values that are not native JSON types."""
+    if isinstance(obj, ObservationRecord):
+        return obj.to_dict()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj, **kwargs) -> str:
+    """json.dumps that encodes observation records directly."""
+    return json.dumps(obj, default=_json_default, **kwargs)
@@ -0,0 +1,264 @@
+"""
+Person detector backends for the multi-person check.
+RobustFaceDetector used to be hard-wired to ultralytics YOLOv8s (torch) at
+640 px. A backend only has to turn frames into person boxes, so cheaper
+CPU options can be swapped in by tier name:
+
+    yolov8s-torch-640      ultralytics + torch (the original detector)
+    yolov8{n,s}-onnx-{320,640}        OpenCV DNN running an exported ONNX model
+    yolov8{n,s}-onnx-320-int8         same, int8 (QDQ) quantized
+
+ONNX tiers need no torch at runtime; their model files are looked up in
+PERSON_DETECTOR_MODEL_DIR and can be produced with
+`python -m backend.benchmark_person_detectors --export <tier>`.
+The tier used by the observation pipeline is set with PERSON_DETECTOR_TIER.
+"""
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .lazy_imports import lazy_import, module_available
+except ImportError:
+    from lazy_imports import lazy_import, module_available
+
+cv2 = lazy_import("cv2")
+
+# (n, 5) float32 array of x1, y1, x2, y2 (frame pixels) and confidence, one row per person
+PersonBoxes = np.ndarray
+
+PERSON_CLASS_ID = 0  # "person" in COCO
+
+_NO_BOXES = np.zeros((0, 5), dtype=np.float32)
+
+
+class DetectorTier(NamedTuple):
+    backend: str     # "torch" (ultralytics) or "onnx" (OpenCV DNN)
+    model: str       # weights name (torch) or ONNX file name in the model dir
+    input_size: int  # square network input, pixels
+
+
+DETECTOR_TIERS: Dict[str, DetectorTier] = {
+    "yolov8s-torch-640": DetectorTier("torch", "yolov8s.pt", 640),
+    "yolov8n-torch-640": DetectorTier("torch", "yolov8n.pt", 640),
+    "yolov8s-onnx-640": DetectorTier("onnx", "yolov8s-640.onnx", 640),
+    "yolov8s-onnx-320": DetectorTier("onnx", "yolov8s-320.onnx", 320),
+    "yolov8n-onnx-640": DetectorTier("onnx", "yolov8n-640.onnx", 640),
+    "yolov8n-onnx-320": DetectorTier("onnx", "yolov8n-320.onnx", 320),
+    "yolov8s-onnx-320-int8": DetectorTier("onnx", "yolov8s-320-int8.onnx", 320),
+    "yolov8n-onnx-320-int8": DetectorTier("onnx", "yolov8n-320-int8.onnx", 320),
+}
+
+DEFAULT_DETECTOR_TIER = os.environ.get("PERSON_DETECTOR_TIER") or "yolov8s-torch-640"
+MODEL_DIR = os.environ.get("PERSON_DETECTOR_MODEL_DIR") or os.path.join(os.path.dirname(__file__), "models")
+
+# IoU for the backend's own duplicate suppression (ultralytics' default)
+BACKEND_NMS_IOU = 0.7
+
+
+def get_tier(name: str) -> DetectorTier:
+    tier = DETECTOR_TIERS.get(name)
+    if tier is None:
+        raise ValueError(f"Unknown person detector tier {name!r}; choose from {', '.join(DETECTOR_TIERS)}")
+    return tier
+
+
+def model_path(tier: DetectorTier, model_dir: Optional[str] = None) -> str:
+    return os.path.join(model_dir or MODEL_DIR, tier.model)
+
+
+def tier_available(name: str, model_dir: Optional[str] = None) -> bool:
+    """Whether the tier's runtime (and, for ONNX, its model file) is present."""
+    tier = get_tier(name)
+    if tier.backend == "torch":
+        return module_available("ultralytics")
+    return os.path.exists(model_path(tier, model_dir))
+
+
+class PersonDetectorBackend:
+    """Turns frames into person boxes. Implementations are shared by every detector in a process."""
+
+    def __init__(self, tier_name: str, tier: DetectorTier):
+        self.tier_name = tier_name
+        self.tier = tier
+        # Inference objects are not thread-safe; calls on one backend are serialized
+        self.lock = threading.Lock()
+
+    def detect(self, frames: Sequence[np.ndarray], conf_threshold: float) -> List[PersonBoxes]:
+        """Person boxes with confidence >= `conf_threshold`, one array per frame."""
+        raise NotImplementedError
+
+
+class UltralyticsBackend(PersonDetectorBackend):
+    """ultralytics YOLO on torch, as originally used."""
+
+    def __init__(self, tier_name: str, tier: DetectorTier):
+        super().__init__(tier_name, tier)
+        from ultralytics import YOLO
+        self.model = YOLO(tier.model)
+        self.model.to("cpu")
+
+    def detect(self, frames: Sequence[np.ndarray], conf_threshold: float) -> List[PersonBoxes]:
+        with self.lock:
+            # Other classes are dropped inside the model's own NMS
+            results = self.model(list(frames), verbose=False, conf=conf_threshold, imgsz=self.tier.input_size,
+                                 classes=[PERSON_CLASS_ID])
+        outputs = []
+        for result in results:
+            if result.boxes is None or len(result.boxes) == 0:
+                outputs.append(_NO_BOXES)
+                continue
+            # data rows are x1, y1, x2, y2, confidence, class
+            outputs.append(result.boxes.data[:, :5].cpu().numpy().astype(np.float32))
+        return outputs
+
+
+def letterbox(frame: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """
+    Resize keeping the aspect ratio and pad to a size x size square (gray 114,
+    as ultralytics does).
+
+    Returns:
+        (image, scale, (pad_x, pad_y)) so that frame = (network - pad) / scale
+    """
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR) if (new_w, new_h) != (w, h) else frame
+    pad_x, pad_y = (size - new_w) / 2, (size - new_h) / 2
+    top, left = int(round(pad_y - 0.1)), int(round(pad_x - 0.1))
+    image = cv2.copyMakeBorder(
+        resized, top, size - new_h - top, left, size - new_w - left, cv2.BORDER_CONSTANT, value=(114, 114, 114)
+    )
+    return image, scale, (left, top)
+
+
+def decode_yolov8(output: np.ndarray, conf_threshold: float, scale: float, pad: Tuple[float, float],
+                  frame_shape: Tuple[int, int], nms_iou: float = BACKEND_NMS_IOU) -> PersonBoxes:
+    """
+    Person boxes from a raw YOLOv8 head output.
+
+    Args:
+        output: (1, 4 + classes, anchors) array of cx, cy, w, h and class scores
+        conf_threshold: Minimum person score
+        scale, pad: Letterbox transform of the input (see `letterbox`)
+        frame_shape: (height, width) of the original frame
+        nms_iou: IoU above which overlapping person boxes are merged
+    """
+    predictions = output.reshape(output.shape[-2], output.shape[-1])
+    scores = predictions[4 + PERSON_CLASS_ID]
+    keep = scores >= conf_threshold
+    if not keep.any():
+        return _NO_BOXES
+    cx, cy, bw, bh = predictions[:4, keep]
+    scores = scores[keep]
+    height, width = frame_shape
+    x1 = np.clip((cx - bw / 2 - pad[0]) / scale, 0, width)
+    y1 = np.clip((cy - bh / 2 - pad[1]) / scale, 0, height)
+    x2 = np.clip((cx + bw / 2 - pad[0]) / scale, 0, width)
+    y2 = np.clip((cy + bh / 2 - pad[1]) / scale, 0, height)
+
+    rects = np.stack([x1, y1, x2 - x1, y2 - y1], axis=1)
+    indices = cv2.dnn.NMSBoxes(rects.tolist(), scores.tolist(), conf_threshold, nms_iou)
+    indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+    return np.stack([x1, y1, x2, y2, scores], axis=1)[indices].astype(np.float32)
+
+
+class OpenCVDnnBackend(PersonDetectorBackend):
+    """Exported YOLOv8 ONNX model (float or int8 QDQ) on OpenCV's DNN module; no torch needed."""
+
+    def __init__(self, tier_name: str, tier: DetectorTier, model_dir: Optional[str] = None):
+        super().__init__(tier_name, tier)
+        path = model_path(tier, model_dir)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Person detector model {path} not found (export it first)")
+        self.net = cv2.dnn.readNetFromONNX(path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    def detect(self, frames: Sequence[np.ndarray], conf_threshold: float) -> List[PersonBoxes]:
+        size = self.tier.input_size
+        outputs = []
+        # Exported models have a fixed batch of one
+        for frame in frames:
+            image, scale, pad = letterbox(frame, size)
+            blob = cv2.dnn.blobFromImage(image, 1.0 / 255.0, (size, size), swapRB=True)
+            with self.lock:
+                self.net.setInput(blob)
+                output = self.net.forward()
+            outputs.append(decode_yolov8(output, conf_threshold, scale, pad, frame.shape[:2]))
+        return outputs
+
+
+_BACKENDS: Dict[Tuple[str, str], PersonDetectorBackend] = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+def create_backend(tier_name: Optional[str] = None, model_dir: Optional[str] = None) -> PersonDetectorBackend:
+    """
+    Backend for a tier, loaded once per process and shared by every detector
+    (per-session detectors only hold their temporal state).
+    """
+    tier_name = tier_name or DEFAULT_DETECTOR_TIER
+    tier = get_tier(tier_name)
+    key = (tier_name, model_dir or MODEL_DIR)
+    with _BACKENDS_LOCK:
+        backend = _BACKENDS.get(key)
+        if backend is None:
+            if tier.backend == "torch":
+                backend = UltralyticsBackend(tier_name, tier)
+            else:
+                backend = OpenCVDnnBackend(tier_name, tier, model_dir)
+            _BACKENDS[key] = backend
+        return backend
+
+
+def export_tier(tier_name: str, model_dir: Optional[str] = None,
+                calibration_frames: Optional[Sequence[np.ndarray]] = None) -> str:
+    """
+    Export an ONNX tier's model file from the ultralytics weights.
+
+    Needs ultralytics and onnx; int8 tiers also need onnxruntime and
+    calibration frames (ideally recorded interview frames).
+
+    Returns:
+        Path of the written model.
+    """
+    tier = get_tier(tier_name)
+    if tier.backend != "onnx":
+        raise ValueError(f"{tier_name} is not an ONNX tier")
+    from ultralytics import YOLO
+
+    model_dir = model_dir or MODEL_DIR
+    os.makedirs(model_dir, exist_ok=True)
+    target = model_path(tier, model_dir)
+    weights = tier.model.split("-")[0] + ".pt"
+    exported = YOLO(weights).export(format="onnx", imgsz=tier.input_size, dynamic=False, simplify=True)
+
+    if not tier_name.endswith("-int8"):
+        os.replace(exported, target)
+        return target
+
+    if not calibration_frames:
+        raise ValueError("int8 export needs calibration frames")
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    class _Frames(CalibrationDataReader):
+        def __init__(self):
+            self._blobs = iter([
+                cv2.dnn.blobFromImage(letterbox(frame, tier.input_size)[0], 1.0 / 255.0,
+                                      (tier.input_size, tier.input_size), swapRB=True)
+                for frame in calibration_frames
+            ])
+
+        def get_next(self):
+            blob = next(self._blobs, None)
+            return None if blob is None else {"images": blob}
+
+    # QDQ keeps the graph readable by OpenCV's DNN importer
+    quantize_static(exported, target, _Frames(), quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8, per_channel=True)
+    os.remove(exported)
+    return target
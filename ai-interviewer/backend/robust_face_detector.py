@@ -2,16 +2,27 @@
 Robust face and person detection using YOLOv8.
 Provides accurate multi-person detection with strict filtering to avoid false positives.
 """
-import cv2
 import numpy as np
-from typing import List, Tuple, Dict
-import os
+from typing import List, Optional, Tuple, Dict
 
 try:
-    from ultralytics import YOLO
-    YOLO_AVAILABLE = True
+    from .lazy_imports import lazy_import, module_available
+    from .metrics import stage
+    from .person_detectors import DEFAULT_DETECTOR_TIER, PersonBoxes, PersonDetectorBackend, create_backend, tier_available
 except ImportError:
-    YOLO_AVAILABLE = False
+    from lazy_imports import lazy_import, module_available
+    from metrics import stage
+    from person_detectors import DEFAULT_DETECTOR_TIER, PersonBoxes, PersonDetectorBackend, create_backend, tier_available
+
+cv2 = lazy_import("cv2")
+
+# ultralytics pulls in torch; it is imported when the first model is loaded
+YOLO_AVAILABLE = module_available("ultralytics")
+
+
+def person_detection_available(tier: Optional[str] = None) -> bool:
+    """Whether the configured person detector tier can be loaded."""
+    return tier_available(tier or DEFAULT_DETECTOR_TIER)
 
 
 class RobustFaceDetector:
@@ -20,34 +31,36 @@ class RobustFaceDetector:
     More reliable than Haar Cascade with strict filtering to prevent false positives.
     """
     
-    def __init__(self, model_size: str = "s"):
+    def __init__(self, model_size: Optional[str] = None, tier: Optional[str] = None,
+                 backend: Optional[PersonDetectorBackend] = None):
         """
         Initialize YOLOv8 face detector.
         
         Args:
-            model_size: Model size - 'n' (nano), 's' (small), 'm' (medium)
-                       Small is recommended for balance between speed and accuracy
+            model_size: Torch model size - 'n' (nano), 's' (small), 'm' (medium);
+                        selects the yolov8<size>-torch-640 tier
+            tier: Person detector tier (see person_detectors.DETECTOR_TIERS);
+                  defaults to PERSON_DETECTOR_TIER
+            backend: Use this backend instead of loading one for a tier
         """
-        if not YOLO_AVAILABLE:
-            raise RuntimeError(
-                "YOLOv8 not available. Install with: pip install ultralytics"
-            )
-        
-        # Use the appropriate model
-        model_name = f"yolov8{model_size}.pt"
-        self.model = YOLO(model_name)
-        
-        # Set model to evaluation mode
-        self.model.to('cpu')  # Use CPU for consistency
+        if backend is None:
+            if tier is None and model_size is not None:
+                tier = f"yolov8{model_size}-torch-640"
+            tier = tier or DEFAULT_DETECTOR_TIER
+            if not person_detection_available(tier):
+                raise RuntimeError(
+                    f"Person detector tier {tier} not available "
+                    "(torch tiers: pip install ultralytics; ONNX tiers: export the model)"
+                )
+            # Loaded once per process and shared with other detectors
+            backend = create_backend(tier)
+        self.backend = backend
         
         # STRICT THRESHOLDS to reduce false positives
         self.person_conf_threshold = 0.75  # Only count persons with >75% confidence (STRICT)
         self.min_person_area = 10000       # Minimum 100x100 pixels to avoid small false detections
         self.iou_threshold = 0.5           # IoU threshold for removing duplicate detections
         
-        # Class IDs in COCO dataset
-        self.PERSON_CLASS_ID = 0  # "person" class in COCO
-        
         # Temporal smoothing for multi-person detection
         self.multi_person_frames = []      # Store recent detection results
         self.temporal_window = 5           # Require 5 frames to confirm
@@ -66,61 +79,91 @@ class RobustFaceDetector:
             return 0, []
         
         try:
-            # Run YOLO inference with STRICT confidence threshold
-            results = self.model(frame, verbose=False, conf=self.person_conf_threshold)
-            
-            if not results or len(results) == 0:
-                return 0, []
-            
-            result = results[0]
-            raw_persons = []
-            
-            # Extract detections with area filtering
-            if result.boxes is not None and len(result.boxes) > 0:
-                for box in result.boxes:
-                    # Check if this is a person detection
-                    if int(box.cls) == self.PERSON_CLASS_ID:
-                        # Get bounding box coordinates
-                        x1, y1, x2, y2 = map(float, box.xyxy[0])
-                        conf = float(box.conf)
-                        
-                        # Calculate area
-                        width = int(x2 - x1)
-                        height = int(y2 - y1)
-                        area = width * height
-                        
-                        # Filter by area (remove tiny detections - likely false positives)
-                        if area >= self.min_person_area:
-                            raw_persons.append({
-                                "bbox": (int(x1), int(y1), int(x2), int(y2)),
-                                "confidence": conf,
-                                "center": (int((x1 + x2) / 2), int((y1 + y2) / 2)),
-                                "width": width,
-                                "height": height,
-                                "area": area
-                            })
-            
-            # Apply Non-Maximum Suppression (NMS) to remove duplicate/overlapping detections
-            persons = self._apply_nms(raw_persons)
+            # Run inference with STRICT confidence threshold
+            with stage("yolo"):
+                boxes = self.backend.detect([frame], self.person_conf_threshold)[0]
             
+            persons = self._extract_persons(boxes)
             return len(persons), persons
             
         except Exception as e:
             print(f"Error in person detection: {e}")
             return 0, []
     
-    def is_multiple_persons(self, frame: np.ndarray) -> bool:
+    def detect_persons_batch(self, frames: List[np.ndarray]) -> List[Tuple[int, List[Dict]]]:
+        """
+        Detect persons in several frames with one backend call (a single
+        batched forward pass on the torch backend).
+        
+        Args:
+            frames: Input images (BGR format), e.g. one per session
+            
+        Returns:
+            One (person_count, detections) tuple per input frame
+        """
+        outputs: List[Tuple[int, List[Dict]]] = [(0, [])] * len(frames)
+        valid = [i for i, frame in enumerate(frames) if frame is not None and frame.size > 0]
+        if not valid:
+            return outputs
+        
+        try:
+            with stage("yolo"):
+                results = self.backend.detect([frames[i] for i in valid], self.person_conf_threshold)
+            
+            for i, boxes in zip(valid, results):
+                persons = self._extract_persons(boxes)
+                outputs[i] = (len(persons), persons)
+        except Exception as e:
+            print(f"Error in batched person detection: {e}")
+        
+        return outputs
+    
+    def _extract_persons(self, boxes: PersonBoxes) -> List[Dict]:
+        """Filter one frame's person boxes down to confident, large, de-duplicated persons."""
+        if len(boxes) == 0:
+            return []
+        boxes = np.asarray(boxes, dtype=np.float64)
+        
+        # Integer pixel sizes, truncated like int()
+        bboxes = boxes[:, :4].astype(np.int64)
+        sizes = (boxes[:, 2:4] - boxes[:, :2]).astype(np.int64)
+        widths, heights = sizes[:, 0], sizes[:, 1]
+        areas = widths * heights
+        
+        # Filter by area (remove tiny detections - likely false positives)
+        large = np.flatnonzero(areas >= self.min_person_area)
+        
+        # Apply Non-Maximum Suppression (NMS) to remove duplicate/overlapping detections
+        kept = large[self._apply_nms(bboxes[large], boxes[large, 4])]
+        
+        centers = ((boxes[kept, :2] + boxes[kept, 2:4]) / 2).astype(np.int64)
+        return [
+            {
+                "bbox": tuple(bboxes[i].tolist()),
+                "confidence": float(boxes[i, 4]),
+                "center": tuple(center),
+                "width": int(widths[i]),
+                "height": int(heights[i]),
+                "area": int(areas[i])
+            }
+            for i, center in zip(kept.tolist(), centers.tolist())
+        ]
+    
+    def is_multiple_persons(self, frame: np.ndarray, person_count: Optional[int] = None) -> bool:
         """
         Check if multiple persons are detected in the frame.
         Uses temporal smoothing to avoid false positives from momentary detections.
         
         Args:
             frame: Input image (BGR format)
+            person_count: Count already computed for this frame (e.g. by a batched
+                          detection); skips running the model again
             
         Returns:
             True if multiple persons detected consistently, False otherwise
         """
-        person_count, _ = self.detect_persons(frame)
+        if person_count is None:
+            person_count, _ = self.detect_persons(frame)
         
         # Add to temporal window
         self.multi_person_frames.append(person_count > 1)
@@ -138,6 +181,15 @@ class RobustFaceDetector:
         # Not enough frames yet, return False (conservative)
         return False
     
+    @property
+    def positive_pending(self) -> bool:
+        """
+        True while the temporal window holds a multiple-person check.
+        Callers run the full-frame check on every frame until it clears, so the
+        window fills in consecutive frames rather than sparse ROI refreshes.
+        """
+        return any(self.multi_person_frames)
+    
     def get_largest_person_bbox(self, frame: np.ndarray) -> Tuple[bool, Tuple[int, int, int, int]]:
         """
         Get the bounding box of the largest person in the frame.
@@ -225,70 +277,49 @@ class RobustFaceDetector:
             "all_detections": persons
         }
     
-    def _apply_nms(self, detections: List[Dict]) -> List[Dict]:
+    def _apply_nms(self, bboxes: np.ndarray, scores: np.ndarray) -> np.ndarray:
         """
         Apply Non-Maximum Suppression to remove duplicate/overlapping detections.
         
         Args:
-            detections: List of detection dictionaries with bbox and confidence
+            bboxes: (n, 4) boxes as x1, y1, x2, y2
+            scores: (n,) confidences
             
         Returns:
-            Filtered list of detections with duplicates removed
+            Indices of the kept boxes, highest confidence first
         """
-        if len(detections) <= 1:
-            return detections
-        
-        # Sort by confidence (highest first)
-        detections = sorted(detections, key=lambda x: x["confidence"], reverse=True)
+        # Sort by confidence (highest first); ties keep detection order
+        order = np.argsort(-scores, kind="stable")
+        if len(order) <= 1:
+            return order
         
+        iou = box_iou_matrix(bboxes[order])
+        suppressed = np.zeros(len(order), dtype=bool)
         keep = []
-        while detections:
-            # Keep the highest confidence detection
-            best = detections.pop(0)
-            keep.append(best)
-            
-            # Remove overlapping detections
-            detections = [
-                det for det in detections 
-                if self._calculate_iou(best["bbox"], det["bbox"]) < self.iou_threshold
-            ]
-        
-        return keep
+        for i in range(len(order)):
+            if suppressed[i]:
+                continue
+            # Keep the highest remaining detection and drop everything overlapping it
+            keep.append(i)
+            suppressed |= iou[i] >= self.iou_threshold
+        return order[keep]
+
+
+def box_iou_matrix(bboxes: np.ndarray) -> np.ndarray:
+    """
+    Pairwise Intersection over Union of (n, 4) x1, y1, x2, y2 boxes.
     
-    def _calculate_iou(self, bbox1: Tuple[int, int, int, int], bbox2: Tuple[int, int, int, int]) -> float:
-        """
-        Calculate Intersection over Union (IoU) between two bounding boxes.
-        
-        Args:
-            bbox1: First bounding box (x1, y1, x2, y2)
-            bbox2: Second bounding box (x1, y1, x2, y2)
-            
-        Returns:
-            IoU value between 0 and 1
-        """
-        x1_1, y1_1, x2_1, y2_1 = bbox1
-        x1_2, y1_2, x2_2, y2_2 = bbox2
-        
-        # Calculate intersection area
-        x_left = max(x1_1, x1_2)
-        y_top = max(y1_1, y1_2)
-        x_right = min(x2_1, x2_2)
-        y_bottom = min(y2_1, y2_2)
-        
-        if x_right < x_left or y_bottom < y_top:
-            return 0.0
-        
-        intersection_area = (x_right - x_left) * (y_bottom - y_top)
-        
-        # Calculate union area
-        bbox1_area = (x2_1 - x1_1) * (y2_1 - y1_1)
-        bbox2_area = (x2_2 - x1_2) * (y2_2 - y1_2)
-        union_area = bbox1_area + bbox2_area - intersection_area
-        
-        if union_area == 0:
-            return 0.0
-        
-        return intersection_area / union_area
+    Returns:
+        (n, n) IoU values between 0 and 1 (0 where the union is empty)
+    """
+    bboxes = bboxes.astype(np.float64)
+    top_left = np.maximum(bboxes[:, None, :2], bboxes[:, :2])
+    bottom_right = np.minimum(bboxes[:, None, 2:], bboxes[:, 2:])
+    overlap = np.maximum(bottom_right - top_left, 0.0)
+    intersection = overlap[..., 0] * overlap[..., 1]
+    areas = (bboxes[:, 2] - bboxes[:, 0]) * (bboxes[:, 3] - bboxes[:, 1])
+    union = areas[:, None] + areas - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union != 0)
 
 
 class HybridFaceAnalyzer:
@@ -299,7 +330,7 @@ class HybridFaceAnalyzer:
     
     def __init__(self):
         """Initialize both detectors."""
-        self.robust_detector = RobustFaceDetector(model_size="s")
+        self.robust_detector = RobustFaceDetector()
         self.person_detected_cache = 0
         
     def check_multiple_persons(self, frame: np.ndarray) -> bool:
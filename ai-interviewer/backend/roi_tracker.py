@@ -0,0 +1,117 @@
+"""
+Face region-of-interest tracking.
+While a single candidate sits still, their face stays inside a padded box
+around where it was last found. FaceAnalyzer then skips the full-frame
+multi-person checks (YOLO, multi-face Haar) and looks for the face only
+inside that box. It goes back to full-frame detection on a periodic
+refresh, when the face is lost, or when it moves far enough to leave the
+box soon.
+"""
+from typing import Optional, Tuple
+
+Box = Tuple[int, int, int, int]  # x, y, w, h in frame pixels
+
+# The crop extends this many face widths beyond each side of the face
+ROI_PADDING = 0.6
+# Full-frame detection at least every N analyzed frames (~2.5 s at 6 fps),
+# so a second person entering the frame is still caught. Once one is seen,
+# FaceAnalyzer checks every frame in full until the detector confirms or
+# clears it (RobustFaceDetector.positive_pending)
+ROI_REFRESH_FRAMES = 15
+# Refresh when the face comes within this fraction of the crop size of its edge
+ROI_EDGE_MARGIN = 0.08
+# Refresh when the face centre moves this many face widths between two frames
+ROI_MAX_MOTION = 0.3
+
+
+class ROITracker:
+    """Decides, frame by frame, whether to analyze a tracked crop or the full frame."""
+
+    def __init__(self, padding: float = ROI_PADDING, refresh_frames: int = ROI_REFRESH_FRAMES,
+                 edge_margin: float = ROI_EDGE_MARGIN, max_motion: float = ROI_MAX_MOTION):
+        self.padding = padding
+        self.refresh_frames = refresh_frames
+        self.edge_margin = edge_margin
+        self.max_motion = max_motion
+        self.roi: Optional[Box] = None
+        self._face: Optional[Box] = None
+        self._since_refresh = 0
+        self.tracked_frames = 0
+        self.full_frames = 0
+
+    @property
+    def needs_full_frame(self) -> bool:
+        """True if the next frame must be analyzed without a crop."""
+        return self.roi is None or self._since_refresh >= self.refresh_frames
+
+    def next_roi(self) -> Optional[Box]:
+        """Crop to analyze for the next frame, or None for a full-frame pass."""
+        return None if self.needs_full_frame else self.roi
+
+    def update(self, face_box: Optional[Box], frame_size: Tuple[int, int], full_frame: bool):
+        """
+        Record the outcome of analyzing a frame.
+
+        Args:
+            face_box: The single tracked face (frame pixels), or None if there
+                      was no face or more than one
+            frame_size: (width, height) of the frame
+            full_frame: Whether the frame was analyzed without a crop
+        """
+        if full_frame:
+            self.full_frames += 1
+        else:
+            self.tracked_frames += 1
+        if face_box is None or face_box[2] <= 0 or face_box[3] <= 0:
+            self.lost()
+            return
+
+        if full_frame:
+            self.roi = self._padded(face_box, frame_size)
+            self._since_refresh = 0
+        else:
+            self._since_refresh += 1
+            if self._moved_too_far(face_box) or self._near_edge(face_box, frame_size):
+                self.roi = None
+        self._face = face_box
+
+    def lost(self):
+        """Forget the face; the next frame is analyzed in full."""
+        self.roi = None
+        self._face = None
+
+    def reset(self):
+        self.lost()
+        self._since_refresh = 0
+        self.tracked_frames = 0
+        self.full_frames = 0
+
+    def _padded(self, face_box: Box, frame_size: Tuple[int, int]) -> Box:
+        x, y, w, h = face_box
+        frame_w, frame_h = frame_size
+        pad_x, pad_y = int(w * self.padding), int(h * self.padding)
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1, y1 = min(frame_w, x + w + pad_x), min(frame_h, y + h + pad_y)
+        return x0, y0, x1 - x0, y1 - y0
+
+    def _moved_too_far(self, face_box: Box) -> bool:
+        if self._face is None:
+            return False
+        px, py, pw, ph = self._face
+        x, y, w, h = face_box
+        dx = (x + w / 2) - (px + pw / 2)
+        dy = (y + h / 2) - (py + ph / 2)
+        return (dx * dx + dy * dy) ** 0.5 > self.max_motion * max(pw, 1)
+
+    def _near_edge(self, face_box: Box, frame_size: Tuple[int, int]) -> bool:
+        """Whether the face is close to a crop edge that is not also a frame edge."""
+        rx, ry, rw, rh = self.roi
+        frame_w, frame_h = frame_size
+        x, y, w, h = face_box
+        margin_x, margin_y = rw * self.edge_margin, rh * self.edge_margin
+        return (
+            (rx > 0 and x - rx < margin_x)
+            or (ry > 0 and y - ry < margin_y)
+            or (rx + rw < frame_w and (rx + rw) - (x + w) < margin_x)
+            or (ry + rh < frame_h and (ry + rh) - (y + h) < margin_y)
+        )
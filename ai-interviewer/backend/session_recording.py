@@ -0,0 +1,387 @@
+"""
+Compact session recordings for deterministic replay.
+A recording captures what a client sent during an interview (JPEG frame
+bytes, int16 PCM audio chunks, chat turns) with their arrival times, so a
+slow production session can be reproduced offline through the same
+HumanObservationEngine and InterviewEngine code paths.
+
+File layout (network byte order):
+    magic       8 bytes  b"AIREC\\x00\\x01\\x00"
+    records     kind u8, timestamp f64 (seconds since start), length u32, payload
+    index       (offset u64, kind u8, timestamp f64) per record
+    footer      index_offset u64, record_count u32, b"AIRIDX\\x00\\x00"
+
+Records are only ever appended, by a writer thread so callers on the event
+loop never wait on the disk; the index and footer are written on close.
+A recording cut short by a crash has no footer and is read by scanning the
+records instead. Readers memory-map the file and hand out payloads as
+zero-copy memoryviews.
+"""
+import argparse
+import asyncio
+import json
+import mmap
+import os
+import pathlib
+import queue
+import struct
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+try:
+    from .frame_ingest import decode_jpeg, decode_pcm16
+except ImportError:
+    sys.path.append(str(pathlib.Path(__file__).resolve().parent))
+    from frame_ingest import decode_jpeg, decode_pcm16
+
+MAGIC = b"AIREC\x00\x01\x00"
+INDEX_MAGIC = b"AIRIDX\x00\x00"
+
+KIND_VIDEO = 1           # JPEG bytes
+KIND_AUDIO = 2           # little-endian int16 PCM, 16 kHz mono
+KIND_USER_TEXT = 3       # UTF-8 candidate message
+KIND_ASSISTANT = 4       # UTF-8 JSON interviewer response
+KIND_NAMES = {
+    KIND_VIDEO: "video",
+    KIND_AUDIO: "audio",
+    KIND_USER_TEXT: "user_text",
+    KIND_ASSISTANT: "assistant",
+}
+
+_RECORD = struct.Struct("!BdI")
+_INDEX_ENTRY = struct.Struct("!QBd")
+_FOOTER = struct.Struct("!QI8s")
+
+
+class RecordedEvent(NamedTuple):
+    """One recorded client message."""
+
+    kind: int
+    timestamp: float
+    payload: memoryview
+
+
+def _frozen(payload) -> bytes:
+    """The payload itself if its bytes can no longer change, else a copy."""
+    if isinstance(payload, bytes) or (isinstance(payload, memoryview) and payload.readonly):
+        return payload
+    return bytes(payload)
+
+
+class SessionRecorder:
+    """
+    Appends a session's traffic to a recording file.
+    Safe to call from the event loop and from other threads: records are
+    timestamped on arrival and written by a background thread. If the disk
+    falls `max_pending` records behind, new records are dropped (counted in
+    `dropped_records`) rather than blocking the caller.
+    """
+
+    def __init__(self, path: str, max_pending: int = 256):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._offset = len(MAGIC)
+        self._index: List[bytes] = []
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self._pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.closed = False
+        self.dropped_records = 0
+        self.error: Optional[BaseException] = None
+        self._writer = threading.Thread(target=self._write_loop, name="session-recorder", daemon=True)
+        self._writer.start()
+
+    def _append(self, kind: int, payload: bytes):
+        if self.closed:
+            return
+        try:
+            self._pending.put_nowait((kind, time.monotonic() - self._start, payload))
+        except queue.Full:
+            self.dropped_records += 1
+
+    def _write_loop(self):
+        while True:
+            record = self._pending.get()
+            try:
+                if record is None:
+                    return
+                if self.error is None:
+                    self._write_record(*record)
+            finally:
+                self._pending.task_done()
+
+    def _write_record(self, kind: int, timestamp: float, payload: bytes):
+        try:
+            self._file.write(_RECORD.pack(kind, timestamp, len(payload)))
+            self._file.write(payload)
+        except OSError as e:
+            # Keep draining so callers never block; the recording ends here
+            self.error = e
+            return
+        self._index.append(_INDEX_ENTRY.pack(self._offset, kind, timestamp))
+        self._offset += _RECORD.size + len(payload)
+
+    def flush(self):
+        """Wait until every queued record is written and flushed to the file."""
+        self._pending.join()
+        with self._lock:
+            if not self.closed:
+                self._file.flush()
+
+    def record_video(self, jpeg_bytes: bytes):
+        self._append(KIND_VIDEO, _frozen(jpeg_bytes))
+
+    def record_audio(self, pcm_bytes: bytes):
+        self._append(KIND_AUDIO, _frozen(pcm_bytes))
+
+    def record_user_text(self, text: str):
+        self._append(KIND_USER_TEXT, text.encode("utf-8"))
+
+    def record_assistant(self, response: Dict[str, Any]):
+        self._append(KIND_ASSISTANT, json.dumps(response, ensure_ascii=False).encode("utf-8"))
+
+    def close(self):
+        """Wait for queued records to be written, then write the index and footer and close the file."""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+        self._pending.put(None)
+        self._writer.join()
+        with self._lock:
+            index_offset = self._offset
+            self._file.write(b"".join(self._index))
+            self._file.write(_FOOTER.pack(index_offset, len(self._index), INDEX_MAGIC))
+            self._file.close()
+
+
+class SessionRecording:
+    """Memory-mapped, read-only view of a recording file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < len(MAGIC):
+            self._file.close()
+            raise ValueError(f"{path} is not a session recording")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a session recording")
+        # (offset, kind, timestamp) per record; None if the file was never closed
+        self._entries = self._read_index()
+        self.complete = self._entries is not None
+        if self._entries is None:
+            self._entries = self._scan()
+
+    def _read_index(self) -> Optional[List[tuple]]:
+        size = len(self._map)
+        if size < len(MAGIC) + _FOOTER.size:
+            return None
+        index_offset, count, magic = _FOOTER.unpack_from(self._map, size - _FOOTER.size)
+        if magic != INDEX_MAGIC or index_offset + count * _INDEX_ENTRY.size != size - _FOOTER.size:
+            return None
+        return [_INDEX_ENTRY.unpack_from(self._map, index_offset + i * _INDEX_ENTRY.size) for i in range(count)]
+
+    def _scan(self) -> List[tuple]:
+        """Rebuild the index of a recording that was never closed."""
+        size = len(self._map)
+        entries = []
+        offset = len(MAGIC)
+        while offset + _RECORD.size <= size:
+            kind, timestamp, length = _RECORD.unpack_from(self._map, offset)
+            if kind not in KIND_NAMES or offset + _RECORD.size + length > size:
+                break  # truncated tail
+            entries.append((offset, kind, timestamp))
+            offset += _RECORD.size + length
+        return entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, i: int) -> RecordedEvent:
+        offset, kind, timestamp = self._entries[i]
+        length = _RECORD.unpack_from(self._map, offset)[2]
+        start = offset + _RECORD.size
+        return RecordedEvent(kind, timestamp, self._view[start:start + length])
+
+    def __iter__(self) -> Iterator[RecordedEvent]:
+        for i in range(len(self._entries)):
+            yield self[i]
+
+    def events(self, kinds: Optional[Iterable[int]] = None) -> Iterator[RecordedEvent]:
+        """Iterate events, optionally only of the given kinds (uses the index, no payload reads)."""
+        wanted = set(kinds) if kinds is not None else None
+        for i, (_, kind, _) in enumerate(self._entries):
+            if wanted is None or kind in wanted:
+                yield self[i]
+
+    @property
+    def duration(self) -> float:
+        return self._entries[-1][2] if self._entries else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        counts = {name: 0 for name in KIND_NAMES.values()}
+        for _, kind, _ in self._entries:
+            counts[KIND_NAMES[kind]] += 1
+        return {
+            "path": self.path,
+            "complete": self.complete,
+            "duration_seconds": round(self.duration, 3),
+            "records": len(self._entries),
+            "counts": counts,
+        }
+
+    def close(self):
+        """Unmap the file. Payloads handed out earlier must not be used afterwards."""
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # payload views still alive; the map is released with them
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def _replay_turn(interview_engine, user_text: str, history: List[Dict[str, str]]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    response = await interview_engine.run_turn(user_text=user_text, history=list(history))
+    return {
+        "user_text": user_text,
+        "replayed": response,
+        "latency_seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+async def replay_recording(recording: SessionRecording, observation_engine=None, interview_engine=None,
+                           speed: float = 1.0) -> Dict[str, Any]:
+    """
+    Feed a recording through the engines the way the API would.
+
+    Video and audio go to `observation_engine.add_video_frame/add_audio_frame`.
+    The greeting and each candidate message go to `interview_engine.run_turn`
+    with the history as it was recorded, so every turn sees exactly the
+    production input.
+
+    Args:
+        recording: Recording to replay
+        observation_engine: HumanObservationEngine to feed (already started), or None
+        interview_engine: InterviewEngine to drive, or None
+        speed: 1.0 replays with the original timing, 2.0 twice as fast,
+               0 as fast as possible
+
+    Returns:
+        Counts of replayed events, wall time, and per-turn replayed
+        responses with their latency next to the recorded ones.
+    """
+    loop = asyncio.get_running_loop()
+    wall_start = loop.time()
+    history: List[Dict[str, str]] = []
+    turns: List[Dict[str, Any]] = []
+    pending_turn: Optional[Dict[str, Any]] = None
+    counts = {name: 0 for name in KIND_NAMES.values()}
+
+    for event in recording:
+        if speed > 0:
+            delay = event.timestamp / speed - (loop.time() - wall_start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        counts[KIND_NAMES[event.kind]] += 1
+        if event.kind == KIND_VIDEO:
+            if observation_engine is not None:
+                frame = decode_jpeg(event.payload)
+                if frame is not None:
+                    observation_engine.add_video_frame(frame)
+        elif event.kind == KIND_AUDIO:
+            if observation_engine is not None:
+                observation_engine.add_audio_frame(decode_pcm16(event.payload))
+        elif event.kind == KIND_USER_TEXT:
+            text = bytes(event.payload).decode("utf-8")
+            # /ws appends the message to the history it passes to run_turn
+            history.append({"role": "user", "content": text})
+            if interview_engine is not None:
+                pending_turn = await _replay_turn(interview_engine, text, history)
+                turns.append(pending_turn)
+        elif event.kind == KIND_ASSISTANT:
+            recorded = json.loads(bytes(event.payload).decode("utf-8"))
+            if not history and interview_engine is not None:
+                # The greeting, generated by /ws right after connect
+                pending_turn = await _replay_turn(interview_engine, "", history)
+                turns.append(pending_turn)
+            history.append({"role": "assistant", "content": recorded.get("interviewer_response", "")})
+            if pending_turn is not None:
+                pending_turn["recorded"] = recorded
+                pending_turn = None
+
+    return {
+        "events": counts,
+        "wall_seconds": round(loop.time() - wall_start, 3),
+        "recorded_seconds": round(recording.duration, 3),
+        "turns": turns,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Inspect or replay a session recording")
+    parser.add_argument("recording", help="recording file")
+    parser.add_argument("--replay", action="store_true", help="replay through a local observation engine")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = original timing, 0 = as fast as possible")
+    parser.add_argument("--workers", type=int, default=0, help="vision worker processes (0 = in-process)")
+    args = parser.parse_args(argv)
+
+    with SessionRecording(args.recording) as recording:
+        report = {"recording": recording.summary()}
+        if args.replay:
+            try:
+                from .human_observation_engine import HumanObservationEngine
+                from .interview_engine import MockInterviewEngine
+                from .vision_pool import VisionWorkerPool
+            except ImportError:
+                from human_observation_engine import HumanObservationEngine
+                from interview_engine import MockInterviewEngine
+                from vision_pool import VisionWorkerPool
+            import tempfile
+
+            pool = VisionWorkerPool(num_workers=args.workers)
+            with tempfile.TemporaryDirectory() as log_dir:
+                engine = HumanObservationEngine(
+                    session_id="replay",
+                    log_file=os.path.join(log_dir, "replay.txt"),
+                    vision_pool=pool,
+                )
+                engine.start()
+                try:
+                    report["replay"] = asyncio.run(replay_recording(
+                        recording, observation_engine=engine, interview_engine=MockInterviewEngine(),
+                        speed=args.speed,
+                    ))
+                    # Let frames still queued in the engine be analyzed
+                    deadline = time.monotonic() + 5.0
+                    while any(engine.queue_depths().values()) and time.monotonic() < deadline:
+                        time.sleep(0.05)
+                    report["observation_count"] = engine.observation_count
+                    report["dropped_frames"] = engine.dropped_frames
+                finally:
+                    engine.stop()
+                    pool.shutdown()
+
+    print(json.dumps(report, indent=2, default=str))
+    return report
+
+
+if __name__ == "__main__":
+    main()
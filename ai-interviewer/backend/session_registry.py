@@ -0,0 +1,322 @@
+"""
+Registry of interview sessions and their observation engines.
+Each /ws connection gets its own session id and an isolated engine, so
+concurrent interviews never share frames, analyzer state or logs.
+
+With a SessionStore, session state is shared between uvicorn workers. The
+worker currently receiving a session's frames is its "observer": only the
+observer's engine persists its state, and a worker that receives frames for
+a session it does not hold takes it over from the stored state.
+"""
+import logging
+import itertools
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process in the shared session store
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class ObservationSession:
+    """A single interview session and the engine observing it."""
+
+    def __init__(self, session_id: str, engine, admission=None, token: int = 0):
+        self.session_id = session_id
+        self.engine = engine
+        self.token = token  # Identifies the connection that owns the session; see SessionRegistry.release
+        self.admission = admission  # AdmissionDecision, if admission control is enabled
+        self.recorder = None  # SessionRecorder, if session recording is enabled
+        self.observing = True  # False once another worker took over this session's frames
+        self.created_at = time.time()
+        self.last_active = self.created_at
+        self.active = True
+        self.released_at: Optional[float] = None
+
+    def touch(self):
+        """Record activity on this session."""
+        self.last_active = time.time()
+
+
+class SessionRegistry:
+    """
+    Thread-safe map of session id -> ObservationSession.
+    Released sessions are kept for `retention_seconds` so the final report
+    can still be fetched after the interview socket closes.
+    """
+
+    def __init__(self, engine_factory: Callable[[str], object], retention_seconds: float = 600,
+                 admission=None, store=None, store_retention_seconds: float = 86400,
+                 worker_id: str = WORKER_ID):
+        """
+        Args:
+            engine_factory: Builds an observation engine for a session id.
+                            May raise; the session then runs without observation.
+            retention_seconds: How long released sessions stay queryable
+            admission: Optional AdmissionController deciding how (and whether)
+                       new sessions are observed
+            store: Optional SessionStore shared with other workers
+            store_retention_seconds: How long idle sessions stay in the store
+            worker_id: Name of this worker in the store
+        """
+        self.engine_factory = engine_factory
+        self.retention_seconds = retention_seconds
+        self.admission = admission
+        self.store = store
+        self.store_retention_seconds = store_retention_seconds
+        self.worker_id = worker_id
+        self._sessions: Dict[str, ObservationSession] = {}
+        self._lock = threading.Lock()
+        self._tokens = itertools.count(1)
+
+    def create(self, session_id: Optional[str] = None, state: Optional[Dict] = None) -> ObservationSession:
+        """
+        Create a session with its own engine and register it.
+
+        A session that is still live here (its client reconnected before the
+        old socket closed) is handed over as is, with a new token, so the old
+        connection's release() no longer applies to it.
+
+        Args:
+            session_id: Id to use (a new one is generated if None)
+            state: Stored state of an existing session to continue from
+
+        Raises:
+            SessionRejected: If admission control refuses the session.
+        """
+        self.evict_expired()
+        if session_id:
+            with self._lock:
+                live = self._sessions.get(session_id)
+                if live is not None and live.active:
+                    live.token = next(self._tokens)
+                    live.touch()
+                    logger.info(f"[SessionRegistry] Session {session_id} taken over by a new connection")
+                    return live
+        session_id = session_id or uuid.uuid4().hex
+
+        decision = self.admission.admit(session_id) if self.admission is not None else None
+
+        try:
+            engine = self.engine_factory(session_id)
+        except Exception as e:
+            logger.warning(f"[SessionRegistry] Observation unavailable for session {session_id}: {e}")
+            engine = None
+
+        if engine is not None and decision is not None:
+            engine.set_observation_mode(decision.max_fps > 0, decision.max_fps)
+        if engine is not None and state and state.get("observation"):
+            engine.restore_state(state["observation"])
+
+        session = ObservationSession(session_id, engine, admission=decision, token=next(self._tokens))
+        with self._lock:
+            self._sessions[session_id] = session
+        if self.store is not None:
+            fields = {"active": True, "observer": self.worker_id}
+            if state and state.get("reset_requested"):
+                # Nothing was restored, so the pending reset is already done
+                fields["reset_requested"] = False
+            self.store.update(session_id, **fields)
+        logger.info(f"[SessionRegistry] Session {session_id} {'resumed' if state else 'created'}")
+        return session
+
+    def get(self, session_id: Optional[str]) -> Optional[ObservationSession]:
+        """Look up a session (None if unknown or no id given)."""
+        if not session_id:
+            return None
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def get_engine(self, session_id: Optional[str], adopt: bool = False):
+        """
+        Return the session's engine, or None if the session or engine is missing.
+
+        Args:
+            session_id: Session to look up
+            adopt: Frames are about to be fed to the engine. If another worker
+                   holds the session, take it over from the store.
+        """
+        session = self.get(session_id)
+        if session is None or (adopt and not session.active):
+            if not adopt:
+                return None
+            session = self._adopt(session_id)
+            if session is None:
+                return None
+        elif adopt and not session.observing:
+            session.observing = True
+            self.store.update(session_id, observer=self.worker_id)
+        session.touch()
+        return session.engine
+
+    def observing_engine(self, session_id: Optional[str]):
+        """
+        The engine of a live session this worker observes, else None.
+        Never touches the store, so it is safe on the event loop; fall back to
+        get_engine(adopt=True) off the loop when it returns None.
+        """
+        session = self.get(session_id)
+        if session is None or not session.active or not session.observing:
+            return None
+        session.touch()
+        return session.engine
+
+    def _adopt(self, session_id: Optional[str]) -> Optional[ObservationSession]:
+        """Continue a session that is live on another worker."""
+        if self.store is None or not session_id:
+            return None
+        state = self.store.get(session_id)
+        if not state or not state.get("active"):
+            return None
+        session = self.create(session_id, state=state)
+        if session.engine is not None:
+            session.engine.start()
+        return session
+
+    def get_state(self, session_id: Optional[str]) -> Optional[Dict]:
+        """The session's shared state, or None without a store or for unknown sessions."""
+        if self.store is None or not session_id:
+            return None
+        return self.store.get(session_id)
+
+    def serving_engine(self, session_id: Optional[str]):
+        """The local engine if it is the one receiving the session's frames, else None."""
+        session = self.get(session_id)
+        if session is None or not session.observing:
+            return None
+        return session.engine
+
+    def held_engine(self, session_id: Optional[str]):
+        """
+        The local engine if the store still names this worker as the session's
+        observer (or there is no store), else None. Unlike serving_engine this
+        reads the store, so call it off the event loop.
+        """
+        session = self.get(session_id)
+        if session is None or not session.observing or session.engine is None:
+            return None
+        if self.store is not None:
+            observer = self.store.get_fields(session_id, "observer").get("observer", self.worker_id)
+            if observer != self.worker_id:
+                session.observing = False
+                return None
+        return session.engine
+
+    def stop_observation(self, session_id: Optional[str]):
+        """
+        Stop the session's observation. A session held by another worker is
+        ended through the store; its observer releases it on its next save.
+        """
+        engine = self.held_engine(session_id)
+        if engine is not None:
+            engine.stop()
+        elif self.store is not None and session_id:
+            if self.store.get_fields(session_id, "active").get("active"):
+                self.store.update(session_id, active=False)
+
+    def reset_observation(self, session_id: Optional[str]):
+        """
+        Reset the session's observation for a new interview. For a session
+        held by another worker, the stored observation is cleared at once and
+        the observer resets its engine on its next save.
+        """
+        engine = self.held_engine(session_id)
+        if engine is not None:
+            engine.reset()
+        elif self.store is not None and session_id:
+            if self.store.get_fields(session_id, "active"):
+                self.store.update(session_id, observation=None, reset_requested=True)
+
+    def save_engine_state(self, session_id: str, state: Dict):
+        """State sink for observation engines: persist if this worker is still the observer."""
+        if self.store is None:
+            return
+        session = self.get(session_id)
+        # Only the small ownership fields; the history and observation state are not decoded
+        stored = self.store.get_fields(session_id, "observer", "active", "reset_requested")
+        if stored.get("observer", self.worker_id) != self.worker_id:
+            if session is not None:
+                session.observing = False
+            return
+        if stored.get("reset_requested"):
+            # /observation/reset reached another worker: reset here (this runs
+            # on the engine's own thread) and drop the state from before it
+            self.store.update(session_id, reset_requested=False)
+            if session is not None and session.engine is not None:
+                session.engine.reset()
+            return
+        self.store.update(session_id, observation=state)
+        if session is not None and session.active and stored.get("active") is False:
+            # The interview ended on another worker; stop the engine off its own thread
+            threading.Thread(target=self.release, args=(session_id,), daemon=True).start()
+
+    def get_recorder(self, session_id: Optional[str]):
+        """Return the session's SessionRecorder, or None if it is not being recorded."""
+        session = self.get(session_id)
+        if session is None or not session.active:
+            return None
+        return session.recorder
+
+    def release(self, session_id: str, token: Optional[int] = None):
+        """
+        Stop the session's engine; the session stays queryable until it expires.
+
+        Args:
+            session_id: Session to release
+            token: The releasing connection's ObservationSession.token. If the
+                   session has since been taken over (or recreated), nothing happens.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or not session.active or (token is not None and token != session.token):
+                return
+            session.active = False
+        session.released_at = time.time()
+        if self.admission is not None:
+            self.admission.release(session_id)
+        if session.engine is not None:
+            session.engine.stop()
+        if session.recorder is not None:
+            session.recorder.close()
+        if self.store is not None:
+            self.store.update(session_id, active=False)
+        logger.info(f"[SessionRegistry] Session {session_id} released")
+
+    def remove(self, session_id: str):
+        """Stop and forget a session immediately."""
+        self.release(session_id)
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def evict_expired(self):
+        """Drop released sessions older than the retention window."""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [
+                sid for sid, session in self._sessions.items()
+                if not session.active and session.released_at is not None and session.released_at < cutoff
+            ]
+            for sid in expired:
+                del self._sessions[sid]
+        for sid in expired:
+            logger.info(f"[SessionRegistry] Session {sid} expired")
+        if self.store is not None:
+            self.store.purge(time.time() - self.store_retention_seconds)
+
+    def active_sessions(self) -> List[ObservationSession]:
+        """Sessions whose interview is still connected."""
+        with self._lock:
+            return [session for session in self._sessions.values() if session.active]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
@@ -0,0 +1,193 @@
+"""
+Shared session state.
+Conversation history, interview phase and the observation engine's state
+(analyzer baselines, logger aggregates, latest payload, report) are kept in
+a SessionStore instead of process memory, so any uvicorn worker can serve
+any request for a session. The in-memory store keeps single-process
+behaviour; the SQLite store is shared by all workers on one host.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+try:
+    from .observation_records import dumps
+except ImportError:
+    from observation_records import dumps
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """
+    Interface for session state backends.
+
+    State is a flat mapping of field name -> JSON-serializable value.
+    `update` merges fields, so writers of different fields (the /ws handler
+    and the observation engine) never overwrite each other.
+    """
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """All fields of a session (plus `updated_at`), or None if unknown."""
+        raise NotImplementedError
+
+    def get_fields(self, session_id: str, *fields: str) -> Dict[str, Any]:
+        """Only the named fields of a session (missing ones are left out), without decoding the rest."""
+        state = self.get(session_id) or {}
+        return {name: state[name] for name in fields if name in state}
+
+    def update(self, session_id: str, **fields):
+        """Set the given fields, creating the session if needed."""
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        raise NotImplementedError
+
+    def purge(self, older_than: float) -> int:
+        """Delete sessions not updated since `older_than` (epoch seconds); returns the count."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store (single worker)."""
+
+    def __init__(self):
+        # Values are kept encoded so callers never share mutable state with the store
+        self._sessions: Dict[str, Dict[str, str]] = {}
+        self._updated: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            fields = self._sessions.get(session_id)
+            if fields is None:
+                return None
+            fields = dict(fields)
+            updated_at = self._updated[session_id]
+        state = {name: json.loads(value) for name, value in fields.items()}
+        state["updated_at"] = updated_at
+        return state
+
+    def get_fields(self, session_id: str, *fields: str) -> Dict[str, Any]:
+        with self._lock:
+            stored = self._sessions.get(session_id) or {}
+            encoded = {name: stored[name] for name in fields if name in stored}
+        return {name: json.loads(value) for name, value in encoded.items()}
+
+    def update(self, session_id: str, **fields):
+        encoded = {name: dumps(value) for name, value in fields.items()}
+        with self._lock:
+            self._sessions.setdefault(session_id, {}).update(encoded)
+            self._updated[session_id] = time.time()
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._updated.pop(session_id, None)
+
+    def purge(self, older_than: float) -> int:
+        with self._lock:
+            expired = [sid for sid, updated in self._updated.items() if updated < older_than]
+            for sid in expired:
+                del self._sessions[sid]
+                del self._updated[sid]
+        return len(expired)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Store shared by every worker process on a host.
+    One row per (session, field), so updating the engine state does not
+    rewrite the conversation history. WAL mode lets readers run while a
+    worker writes.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_fields ("
+                " session_id TEXT NOT NULL,"
+                " field TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " PRIMARY KEY (session_id, field))"
+            )
+        logger.info(f"[SQLiteSessionStore] Using {path}")
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT field, value, updated_at FROM session_fields WHERE session_id = ?", (session_id,)
+            ).fetchall()
+        if not rows:
+            return None
+        state = {field: json.loads(value) for field, value, _ in rows}
+        state["updated_at"] = max(updated for _, _, updated in rows)
+        return state
+
+    def get_fields(self, session_id: str, *fields: str) -> Dict[str, Any]:
+        if not fields:
+            return {}
+        placeholders = ", ".join("?" * len(fields))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT field, value FROM session_fields WHERE session_id = ? AND field IN ({placeholders})",
+                (session_id, *fields),
+            ).fetchall()
+        return {field: json.loads(value) for field, value in rows}
+
+    def update(self, session_id: str, **fields):
+        now = time.time()
+        rows = [(session_id, name, dumps(value), now) for name, value in fields.items()]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO session_fields (session_id, field, value, updated_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (session_id, field) DO UPDATE SET"
+                    " value = excluded.value, updated_at = excluded.updated_at",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM session_fields WHERE session_id = ?", (session_id,))
+
+    def purge(self, older_than: float) -> int:
+        with self._lock:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT session_id FROM session_fields GROUP BY session_id HAVING MAX(updated_at) < ?",
+                (older_than,),
+            )]
+            self._conn.executemany("DELETE FROM session_fields WHERE session_id = ?", [(sid,) for sid in expired])
+        return len(expired)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_session_store(path: Optional[str] = None) -> SessionStore:
+    """SQLite store at `path`, or an in-memory store when no path is configured."""
+    if path:
+        return SQLiteSessionStore(path)
+    return InMemorySessionStore()
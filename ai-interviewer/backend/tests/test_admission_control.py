@@ -0,0 +1,77 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.admission_control import (
+    MODE_AUDIO_ONLY,
+    MODE_FULL,
+    MODE_REDUCED,
+    AdmissionController,
+    SessionRejected,
+)
+from backend.session_registry import SessionRegistry
+
+
+class _FakeEngine:
+    def __init__(self):
+        self.mode = None
+
+    def set_observation_mode(self, video_enabled, max_fps=None):
+        self.mode = (video_enabled, max_fps)
+
+    def stop(self):
+        pass
+
+
+def test_sessions_degrade_as_capacity_fills():
+    # 1 core at 80% with 0.1s frames -> 8 fps budget
+    controller = AdmissionController(capacity_cores=1, full_fps=6, reduced_fps=2, initial_frame_cost=0.1)
+
+    assert controller.admit("a").mode == MODE_FULL
+    assert controller.admit("b").mode == MODE_REDUCED
+    assert controller.admit("c") == (MODE_AUDIO_ONLY, 0.0)
+
+    controller.release("a")
+    assert controller.admit("d").mode == MODE_FULL
+
+
+def test_hard_cap_rejects_and_is_reported():
+    controller = AdmissionController(capacity_cores=4, max_sessions=1)
+    controller.admit("a")
+    with pytest.raises(SessionRejected):
+        controller.admit("b")
+
+    snapshot = controller.snapshot()
+    assert snapshot["sessions"] == 1
+    assert snapshot["remaining_sessions"] == 0
+    assert snapshot["rejected_sessions"] == 1
+
+
+def test_measured_cost_updates_budget():
+    controller = AdmissionController(capacity_cores=1, initial_frame_cost=0.1, cost_smoothing=0.5)
+    controller.record_frame_cost(0.02)
+    controller.record_frame_cost(0.04)
+    assert controller.frame_cost == pytest.approx(0.03)
+    assert controller.snapshot()["budget_fps"] == pytest.approx(1 * 0.8 / 0.03, abs=0.01)
+
+
+def test_registry_applies_and_returns_admission():
+    controller = AdmissionController(capacity_cores=1, full_fps=6, reduced_fps=2, initial_frame_cost=0.1)
+    registry = SessionRegistry(lambda sid: _FakeEngine(), admission=controller)
+
+    full = registry.create("a")
+    reduced = registry.create("b")
+    assert full.engine.mode == (True, 6)
+    assert reduced.admission.mode == MODE_REDUCED
+    assert reduced.engine.mode == (True, 2)
+
+    registry.release("a")
+    assert controller.snapshot()["sessions"] == 1
+
+
+def test_health_reports_capacity():
+    response = TestClient(main.app).get("/health")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert "remaining_full_sessions" in body["capacity"]
@@ -0,0 +1,132 @@
+import numpy as np
+
+from backend.analyzer_schedule import AnalyzerSchedule, run_analyzers
+from backend.emotion_analyzer import EmotionAnalyzer
+from backend.face_analyzer import FaceAnalyzer
+from backend.motion_gate import MotionGate
+from backend.person_detectors import DETECTOR_TIERS, PersonDetectorBackend
+from backend.robust_face_detector import RobustFaceDetector
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class _ShapeCascade:
+    def __init__(self, boxes_by_shape):
+        self.boxes_by_shape = boxes_by_shape
+        self.shapes = []
+
+    def detectMultiScale(self, image, scaleFactor, minNeighbors, minSize):
+        self.shapes.append(image.shape)
+        return np.array(self.boxes_by_shape.get(image.shape, []), dtype=np.int32).reshape(-1, 4)
+
+
+class _PersonSequence(PersonDetectorBackend):
+    """Returns the next call's person boxes from a fixed sequence."""
+
+    def __init__(self, boxes_per_call):
+        super().__init__("fake", DETECTOR_TIERS["yolov8n-onnx-320"])
+        self.boxes_per_call = boxes_per_call
+        self.calls = 0
+
+    def detect(self, frames, conf_threshold):
+        outputs = []
+        for _ in frames:
+            boxes = self.boxes_per_call[min(self.calls, len(self.boxes_per_call) - 1)]
+            outputs.append(np.array(boxes, dtype=np.float32).reshape(-1, 5))
+            self.calls += 1
+        return outputs
+
+
+ONE_PERSON = [(20, 20, 220, 420, 0.9)]
+TWO_PERSONS = ONE_PERSON + [(300, 40, 500, 440, 0.85)]
+
+
+def test_results_carry_forward_with_age():
+    clock = _Clock()
+    schedule = AnalyzerSchedule(rates={"emotion": 2.0}, requirements={"emotion": ()}, clock=clock)
+    calls = []
+
+    ages = []
+    for i in range(7):  # 6 fps for one second
+        clock.now = 100.0 + i / 6
+        result, age = schedule.run("emotion", lambda: calls.append(clock.now) or len(calls))
+        ages.append(round(age, 3))
+
+    assert len(calls) == 3
+    assert ages == [0.0, 0.167, 0.333, 0.0, 0.167, 0.333, 0.0]
+    assert schedule.carried["emotion"] == 4
+
+
+def test_unusable_dependency_skips_and_drops_carried_result():
+    clock = _Clock()
+    schedule = AnalyzerSchedule(rates={"face": 0.0, "emotion": 2.0}, clock=clock)
+
+    schedule.run("face", lambda: {"face_detected": True}, usable=lambda face: face["face_detected"])
+    assert schedule.run("emotion", lambda: "happy") == ("happy", 0.0)
+
+    clock.now += 0.1
+    schedule.run("face", lambda: {"face_detected": False}, usable=lambda face: face["face_detected"])
+    assert schedule.run("emotion", lambda: "sad") == (None, None)
+    assert schedule.skipped["emotion"] == 1
+
+    # The face is back: emotion runs at once instead of waiting out its period
+    clock.now += 0.1
+    schedule.run("face", lambda: {"face_detected": True}, usable=lambda face: face["face_detected"])
+    assert schedule.run("emotion", lambda: "neutral") == ("neutral", 0.0)
+
+
+def test_run_analyzers_follows_rates():
+    clock = _Clock()
+    frame = np.random.default_rng(2).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    face_analyzer, emotion_analyzer = FaceAnalyzer(), EmotionAnalyzer()
+    face_analyzer.yolo_detector = None
+    face_analyzer.face_mesh = None
+    face_analyzer.face_cascade = _ShapeCascade({
+        (240, 320): [(100, 60, 80, 80)],
+        (176, 176): [(48, 48, 80, 80)],
+    })
+    schedule = AnalyzerSchedule(clock=clock)
+
+    results = []
+    for i in range(12):  # 6 fps for two seconds
+        clock.now = 100.0 + i / 6
+        results.append(run_analyzers(face_analyzer, emotion_analyzer, schedule, frame))
+
+    # Person check at 1 Hz, face on every frame, emotion at 2 Hz
+    assert face_analyzer.face_cascade.shapes.count((240, 320)) == 2
+    assert schedule.runs == {"face": 12, "person": 2, "emotion": 4}
+    face, emotion = results[4]
+    assert face["face_detected"] and round(face["person_check_age"], 3) == 0.667
+    assert round(emotion["age_seconds"], 3) == 0.167
+    assert results[3][1]["age_seconds"] == 0.0
+
+
+def test_pending_second_person_bypasses_cadence_and_gate():
+    clock = _Clock()
+    frame = np.random.default_rng(3).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    face_analyzer, emotion_analyzer = FaceAnalyzer(), EmotionAnalyzer()
+    face_analyzer.face_mesh = None
+    face_analyzer.yolo_detector = RobustFaceDetector(backend=_PersonSequence([ONE_PERSON, TWO_PERSONS]))
+    face_analyzer.face_cascade = _ShapeCascade({
+        (240, 320): [(100, 60, 80, 80)],
+        (176, 176): [(48, 48, 80, 80)],
+    })
+    schedule = AnalyzerSchedule(clock=clock)
+    gate = MotionGate(clock=clock)
+
+    results = []
+    for i in range(9):  # a still frame at 6 fps
+        clock.now = 100.0 + i / 6
+        results.append(run_analyzers(face_analyzer, emotion_analyzer, schedule, frame.copy(), gate=gate)[0])
+
+    # Frames 1-5 reuse frame 0's results. Frame 6 is the next 1 Hz check and
+    # sees two persons; frames 7 and 8 are checked at once, not a second apart
+    assert face_analyzer.yolo_detector.backend.calls == 4
+    assert [r.get("multiple_faces", False) for r in results] == [False] * 8 + [True]
+    assert schedule.runs["person"] == 4
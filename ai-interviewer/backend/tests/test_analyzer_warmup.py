@@ -0,0 +1,28 @@
+from backend.analyzer_warmup import synthetic_frame, warm_up_analyzers
+from backend.emotion_analyzer import EmotionAnalyzer
+from backend.face_analyzer import FaceAnalyzer
+from backend.vision_pool import VisionWorkerPool
+
+
+def test_warm_up_runs_frames_and_resets_state():
+    face_analyzer = FaceAnalyzer()
+    emotion_analyzer = EmotionAnalyzer()
+
+    seconds = warm_up_analyzers(face_analyzer, emotion_analyzer, width=320, height=240, frames=2)
+
+    assert seconds > 0
+    assert face_analyzer.blink_count == 0
+    if face_analyzer.yolo_detector is not None:
+        assert face_analyzer.yolo_detector.multi_person_frames == []
+    assert warm_up_analyzers(face_analyzer, emotion_analyzer, frames=0) == 0.0
+    assert synthetic_frame(320, 240).shape == (240, 320, 3)
+
+
+def test_pool_prepares_session_before_first_frame():
+    pool = VisionWorkerPool(num_workers=0)
+    try:
+        assert pool.prepare_session("warm", 320, 240, frames=1).result(timeout=60) > 0
+        assert "warm" in pool._assignments
+    finally:
+        pool.release_session("warm")
+        pool.shutdown()
@@ -0,0 +1,20 @@
+from backend.benchmark_observation import compare_to_baseline, run_benchmark
+
+
+def test_replay_reports_throughput_latency_and_cpu():
+    report = run_benchmark(sessions=1, fps=5, duration=1.0, width=320, height=240, warmup_frames=1)
+
+    assert report["frames_submitted"] > 0
+    assert report["frames_analyzed"] > 0
+    assert 0.0 <= report["drop_rate"] <= 1.0
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+    assert report["cpu_seconds_per_session"] > 0
+
+
+def test_baseline_comparison_signs():
+    baseline = {"analyzed_fps_per_session": 4.0, "latency_ms": {"p95": 100.0}}
+    current = {"analyzed_fps_per_session": 5.0, "latency_ms": {"p95": 120.0}}
+
+    comparison = compare_to_baseline(current, baseline)
+    assert comparison["analyzed_fps_per_session"]["improvement"] == 0.25
+    assert comparison["latency_ms.p95"]["improvement"] == -0.2
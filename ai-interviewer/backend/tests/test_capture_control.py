@@ -0,0 +1,59 @@
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.capture_control import RESOLUTION_LADDER, CaptureRateController
+from backend.frame_ingest import KIND_VIDEO, PROTOCOL_VERSION, FrameHeader, pack_frame
+from backend.tests.test_frame_ingest import _jpeg_bytes
+
+
+def test_fast_session_keeps_full_rate():
+    controller = CaptureRateController(max_fps=6, loop_interval=0.1)
+    controller.record_latency(0.02)
+    config = controller.current()
+    assert config.fps == 6
+    assert (config.width, config.height) == RESOLUTION_LADDER[0]
+
+
+def test_slow_session_lowers_fps_and_resolution():
+    controller = CaptureRateController(max_fps=6, min_fps=1, loop_interval=0.1)
+    controller.record_latency(0.5)
+    config = controller.current()
+    assert config.fps < 2
+    assert (config.width, config.height) == RESOLUTION_LADDER[-1]
+
+    controller.record_queue(depth=9, capacity=10)
+    assert controller.current().fps == 1
+
+
+def test_admission_ceiling_caps_and_disables():
+    controller = CaptureRateController(max_fps=6)
+    controller.set_ceiling(2)
+    assert controller.current().fps == 2
+    controller.set_ceiling(0)
+    assert controller.current().fps == 0
+
+
+def test_poll_only_reports_changes():
+    controller = CaptureRateController(max_fps=6, update_interval=0.0)
+    assert controller.poll() is not None
+    assert controller.poll() is None
+    controller.set_ceiling(2)
+    assert controller.poll().fps == 2
+
+
+def test_ingest_channel_sends_capture_config():
+    session = main.session_registry.create()
+    if session.engine is None:
+        return
+    session.engine.start()
+    try:
+        client = TestClient(main.app)
+        with client.websocket_connect("/observation/ws") as websocket:
+            header = FrameHeader(PROTOCOL_VERSION, KIND_VIDEO, 1, 0.0, session.session_id)
+            websocket.send_bytes(pack_frame(header, _jpeg_bytes()))
+            message = websocket.receive_json()
+        assert message["type"] == "capture_config"
+        assert message["fps"] > 0
+        assert message["width"] > 0 and message["height"] > 0
+    finally:
+        main.session_registry.remove(session.session_id)
@@ -0,0 +1,139 @@
+import cv2
+import numpy as np
+import pytest
+
+from backend import vision_pool
+from backend.emotion_analyzer import EMOTION_MODEL_LABELS, EmotionAnalyzer, EmotionModel
+from backend.observation_records import FaceResult
+
+FACE_BOX = (200, 120, 160, 160)
+
+
+class _FakeNet:
+    """Scores "Happy" for bright crops and "Sad" for dark ones."""
+
+    def __init__(self, max_batch=None, truncate=False):
+        self.max_batch = max_batch
+        self.truncate = truncate  # Run on the first crops of a larger batch instead of failing
+        self.batches = []
+        self.inputs = []
+
+    def setInput(self, blob):
+        self.blob = blob
+        self.inputs.append(blob)
+
+    def forward(self):
+        if self.max_batch is not None and self.blob.shape[0] > self.max_batch:
+            if not self.truncate:
+                raise RuntimeError("fixed batch size")
+            self.blob = self.blob[:self.max_batch]
+        self.batches.append(self.blob.shape)
+        logits = np.zeros((self.blob.shape[0], len(EMOTION_MODEL_LABELS)), dtype=np.float32)
+        for i, crop in enumerate(self.blob):
+            label = "Happy" if crop.mean() > 128 else "Sad"
+            logits[i, EMOTION_MODEL_LABELS.index(label)] = 5.0
+        return logits
+
+
+class _Cascade:
+    def detectMultiScale(self, image, scaleFactor, minNeighbors, minSize):
+        # The face box in the 320-wide detection image
+        return np.array([(100, 60, 80, 80)], dtype=np.int32)
+
+
+def _crop(value):
+    return np.full((64, 64), value, dtype=np.uint8)
+
+
+def test_crops_are_classified_in_one_forward_pass():
+    net = _FakeNet()
+    probabilities = EmotionModel(net).classify([_crop(220), _crop(30), _crop(200)])
+
+    assert net.batches == [(3, 1, 64, 64)]
+    assert np.allclose(probabilities.sum(axis=1), 1.0)
+    assert [EMOTION_MODEL_LABELS[i] for i in probabilities.argmax(axis=1)] == ["Happy", "Sad", "Happy"]
+
+
+def test_fixed_batch_model_falls_back_to_single_crops():
+    net = _FakeNet(max_batch=1)
+    model = EmotionModel(net)
+
+    probabilities = model.classify([_crop(220), _crop(30)])
+
+    assert not model.batched
+    assert net.batches == [(1, 1, 64, 64), (1, 1, 64, 64)]
+    assert [EMOTION_MODEL_LABELS[i] for i in probabilities.argmax(axis=1)] == ["Happy", "Sad"]
+
+
+def test_model_ignoring_the_batch_falls_back_to_single_crops():
+    net = _FakeNet(max_batch=1, truncate=True)
+    model = EmotionModel(net)
+
+    probabilities = model.classify([_crop(30), _crop(220)])
+
+    assert not model.batched
+    assert probabilities.shape == (2, len(EMOTION_MODEL_LABELS))
+    assert [EMOTION_MODEL_LABELS[i] for i in probabilities.argmax(axis=1)] == ["Sad", "Happy"]
+
+
+def test_analyzer_reports_model_emotion():
+    analyzer = EmotionAnalyzer(model=EmotionModel(_FakeNet()))
+    frame = np.random.default_rng(0).integers(0, 60, (480, 640, 3), dtype=np.uint8)
+    face = FaceResult(face_detected=True, face_box=FACE_BOX)
+
+    crop = analyzer.face_crop(frame, face=face)
+    result = analyzer.analyze(frame, face=face, probabilities=analyzer.classify_crops([crop])[0])
+
+    assert crop.shape == (64, 64)
+    assert result["emotion"] in EMOTION_MODEL_LABELS
+    assert set(result["emotion_scores"]) == set(EMOTION_MODEL_LABELS)
+    assert 0.0 < result["confidence"] <= 10.0
+    sad = analyzer._model_result(np.eye(len(EMOTION_MODEL_LABELS))[EMOTION_MODEL_LABELS.index("Sad")])
+    assert sad["emotion"] == "Sad" and sad["stress_level"] == "high"
+    assert analyzer.face_crop(frame, face=FaceResult(face_detected=False)) is None
+
+
+def test_model_gets_the_unequalized_face():
+    net = _FakeNet()
+    analyzer = EmotionAnalyzer(model=EmotionModel(net))
+    # Low-contrast frame: equalization would stretch it to the full 0-255 range
+    frame = np.random.default_rng(4).integers(0, 60, (480, 640, 3), dtype=np.uint8)
+    face = FaceResult(face_detected=True, face_box=FACE_BOX)
+    x, y, w, h = FACE_BOX
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)[y:y + h, x:x + w]
+    expected = cv2.resize(gray, (64, 64), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+    assert np.array_equal(analyzer.face_crop(frame, face=face), expected.astype(np.uint8))
+    analyzer.analyze(frame, face=face)
+    assert np.array_equal(net.inputs[-1][0, 0], expected)
+
+
+@pytest.fixture
+def model_sessions():
+    net = _FakeNet()
+    model = EmotionModel(net)
+    ids = ["emotion-a", "emotion-b"]
+    for session_id in ids:
+        analyzers = vision_pool._SessionAnalyzers()
+        analyzers.face_analyzer.yolo_detector = None
+        analyzers.face_analyzer.face_mesh = None
+        analyzers.face_analyzer.face_cascade = _Cascade()
+        analyzers.emotion_analyzer = EmotionAnalyzer(model=model)
+        vision_pool._sessions[session_id] = analyzers
+    yield ids, net
+    for session_id in ids:
+        vision_pool.release_session(session_id)
+
+
+def test_batch_shares_one_emotion_forward_pass(model_sessions):
+    ids, net = model_sessions
+    frames = [np.random.default_rng(seed).integers(0, 255, (480, 640, 3), dtype=np.uint8) for seed in (1, 2)]
+
+    results = vision_pool.analyze_batch(list(zip(ids, frames)))
+
+    assert net.batches == [(2, 1, 64, 64)]
+    for result in results:
+        assert result["face"]["face_detected"]
+        assert result["emotion"]["emotion"] in EMOTION_MODEL_LABELS
+        assert result["emotion"]["age_seconds"] == 0.0
+        assert result["timings"]["emotion"] > 0
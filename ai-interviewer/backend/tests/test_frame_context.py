@@ -0,0 +1,95 @@
+import numpy as np
+
+from backend.emotion_analyzer import EmotionAnalyzer
+from backend.face_analyzer import FaceAnalyzer
+from backend.frame_context import FrameContext
+
+
+class _CountingCascade:
+    def __init__(self, boxes=()):
+        self.calls = []
+        self.boxes = boxes
+
+    def detectMultiScale(self, image, scaleFactor, minNeighbors, minSize):
+        self.calls.append((image.shape, minSize))
+        return np.array(self.boxes, dtype=np.int32).reshape(-1, 4)
+
+
+def test_derived_images_are_computed_once():
+    frame = np.random.default_rng(0).integers(0, 255, (48, 64, 3), dtype=np.uint8)
+    context = FrameContext(frame)
+
+    assert context.gray is context.gray
+    assert context.rgb is context.rgb
+    assert context.equalized is context.equalized
+    assert context.gray.shape == (48, 64)
+    assert np.array_equal(context.rgb[..., 0], frame[..., 2])
+
+
+def test_detections_are_cached_and_scaled_back():
+    context = FrameContext(np.zeros((480, 640, 3), dtype=np.uint8))
+    cascade = _CountingCascade(boxes=[(10, 20, 40, 40)])
+
+    boxes = context.detect("face", cascade, scale_factor=1.3, min_neighbors=6, min_size=(80, 80), max_width=320)
+    again = context.detect("face", cascade, scale_factor=1.3, min_neighbors=6, min_size=(80, 80), max_width=320)
+
+    assert again is boxes
+    assert cascade.calls == [((240, 320), (40, 40))]
+    assert boxes.tolist() == [[20, 40, 80, 80]]
+
+    # Different parameters are a different detection
+    context.detect("face", cascade, variant="equalized", scale_factor=1.1, min_neighbors=5, min_size=(50, 50))
+    assert len(cascade.calls) == 2
+
+
+def test_analyzers_share_one_context():
+    frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+    face_analyzer, emotion_analyzer = FaceAnalyzer(), EmotionAnalyzer()
+    face_analyzer.yolo_detector = None
+    face_analyzer.face_cascade = _CountingCascade()
+    emotion_analyzer.face_cascade = _CountingCascade()
+
+    context = FrameContext(frame)
+    face_analyzer.analyze(frame, context=context)
+    emotion_analyzer.analyze(frame, context=context)
+
+    # The multi-face check and the single-face fallback reuse one detection
+    assert len(face_analyzer.face_cascade.calls) == 1
+    assert len(emotion_analyzer.face_cascade.calls) == 1
+    assert context._gray is not None and context._equalized is not None
+
+
+def test_emotion_reuses_face_box():
+    frame = np.random.default_rng(1).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    face_analyzer, emotion_analyzer = FaceAnalyzer(), EmotionAnalyzer()
+    face_analyzer.yolo_detector = None
+    face_analyzer.face_mesh = None
+    # Boxes in the 320-wide detection image
+    face_analyzer.face_cascade = _CountingCascade(boxes=[(100, 60, 80, 80)])
+    emotion_analyzer.face_cascade = _CountingCascade()
+
+    context = FrameContext(frame)
+    face = face_analyzer.analyze(frame, context=context)
+    emotion = emotion_analyzer.analyze(frame, context=context, face=face)
+
+    assert face["face_box"] == (200, 120, 160, 160)
+    assert emotion_analyzer.face_cascade.calls == []
+    assert emotion["emotion"] != "unknown"
+
+
+def test_emotion_skipped_without_face():
+    frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+    face_analyzer, emotion_analyzer = FaceAnalyzer(), EmotionAnalyzer()
+    face_analyzer.yolo_detector = None
+    face_analyzer.face_mesh = None
+    face_analyzer.face_cascade = _CountingCascade()
+    emotion_analyzer.face_cascade = _CountingCascade(boxes=[(200, 120, 160, 160)])
+
+    context = FrameContext(frame)
+    face = face_analyzer.analyze(frame, context=context)
+    emotion = emotion_analyzer.analyze(frame, context=context, face=face)
+
+    assert not face["face_detected"]
+    assert emotion["emotion"] == "unknown"
+    assert emotion_analyzer.face_cascade.calls == []
+    assert context._equalized is None
@@ -0,0 +1,73 @@
+import asyncio
+
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.frame_ingest import (
+    KIND_AUDIO,
+    KIND_VIDEO,
+    PROTOCOL_VERSION,
+    FrameDecoder,
+    FrameHeader,
+    pack_frame,
+    parse_frame,
+)
+from backend.main import app
+
+
+def _jpeg_bytes() -> bytes:
+    frame = np.full((48, 64, 3), 127, dtype=np.uint8)
+    ok, encoded = cv2.imencode(".jpg", frame)
+    assert ok
+    return encoded.tobytes()
+
+
+def test_pack_parse_roundtrip():
+    payload = _jpeg_bytes()
+    header = FrameHeader(PROTOCOL_VERSION, KIND_VIDEO, 42, 1700000000123.5, "abc123")
+    parsed, body = parse_frame(pack_frame(header, payload))
+
+    assert parsed == header
+    assert bytes(body) == payload
+
+
+def test_parse_rejects_bad_frames():
+    with pytest.raises(ValueError):
+        parse_frame(b"\x01\x01")
+    header = FrameHeader(99, KIND_VIDEO, 0, 0.0, "")
+    with pytest.raises(ValueError):
+        parse_frame(pack_frame(header, b""))
+    header = FrameHeader(PROTOCOL_VERSION, KIND_AUDIO, 0, 0.0, "abc")
+    with pytest.raises(ValueError):
+        parse_frame(pack_frame(header, b"\x00\x01\x02"))
+
+
+def test_decoder_decodes_and_sheds_load():
+    decoder = FrameDecoder(max_workers=1, max_pending=0)
+    assert asyncio.run(decoder.decode(_jpeg_bytes())) is None
+    assert decoder.dropped_count == 1
+
+    decoder = FrameDecoder(max_workers=1, max_pending=2)
+    frame = asyncio.run(decoder.decode(_jpeg_bytes()))
+    assert frame is not None and frame.shape == (48, 64, 3)
+    decoder.shutdown()
+
+
+def test_ingest_websocket_accepts_binary_frames():
+    client = TestClient(app)
+    with client.websocket_connect("/observation/ws") as websocket:
+        websocket.send_bytes(b"\x00")
+        error = websocket.receive_json()
+        assert error["type"] == "error"
+
+        header = FrameHeader(PROTOCOL_VERSION, KIND_VIDEO, 1, 0.0, "")
+        websocket.send_bytes(pack_frame(header, _jpeg_bytes()))
+
+        # A torn audio frame is reported and the channel stays open
+        header = FrameHeader(PROTOCOL_VERSION, KIND_AUDIO, 2, 0.0, "")
+        websocket.send_bytes(pack_frame(header, b"\x00\x01\x02"))
+        assert websocket.receive_json()["type"] == "error"
+        websocket.send_bytes(b"\x00")
+        assert websocket.receive_json()["type"] == "error"
@@ -0,0 +1,58 @@
+import cv2
+import numpy as np
+import pytest
+
+from backend.face_analyzer import FaceAnalyzer
+from backend.landmark_geometry import POSE_LANDMARKS
+
+H, W = 480, 640
+
+
+def _analyzer(pose_solver=None):
+    analyzer = FaceAnalyzer(pose_solver=pose_solver)
+    analyzer.yolo_detector = None
+    return analyzer
+
+
+def _points(analyzer, yaw_degrees):
+    """Landmark array whose pose points are the model points seen at `yaw_degrees`."""
+    rotation = np.array([[0.0], [np.radians(yaw_degrees)], [np.pi]])
+    translation = np.array([[0.0], [0.0], [1500.0]])
+    camera_matrix = np.array([[W, 0, W / 2], [0, W, H / 2], [0, 0, 1]], dtype=np.float64)
+    projected, _ = cv2.projectPoints(analyzer.model_points, rotation, translation, camera_matrix, np.zeros(4))
+    points = np.zeros((478, 3))
+    points[list(POSE_LANDMARKS), :2] = projected.reshape(-1, 2) / (W, H)
+    return points
+
+
+def test_warm_start_matches_cold_solve():
+    warm, cold = _analyzer(), _analyzer()
+    poses = []
+    for yaw in (0, 4, 8, 12):
+        points = _points(warm, yaw)
+        poses.append(warm._calculate_3d_head_pose(points, H, W))
+        cold._pose_guess = None
+        assert np.allclose(poses[-1], cold._calculate_3d_head_pose(points, H, W), atol=0.05)
+
+    assert warm._pose_guess is not None
+    assert poses[0] != poses[-1]
+
+
+def test_intrinsics_cached_per_resolution():
+    analyzer = _analyzer()
+    first = analyzer._camera_intrinsics(H, W)
+    assert analyzer._camera_intrinsics(H, W)[0] is first[0]
+
+    analyzer._pose_guess = (np.zeros((3, 1)), np.ones((3, 1)))
+    camera_matrix, _ = analyzer._camera_intrinsics(720, 1280)
+    assert camera_matrix[0, 2] == 640 and analyzer._pose_guess is None
+
+
+def test_solvers_are_selectable():
+    iterative, sqpnp = _analyzer("iterative"), _analyzer("sqpnp")
+    points = _points(iterative, 10)
+
+    assert np.allclose(iterative._calculate_3d_head_pose(points, H, W),
+                       sqpnp._calculate_3d_head_pose(points, H, W), atol=0.5)
+    with pytest.raises(ValueError):
+        FaceAnalyzer(pose_solver="ransac")
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.landmark_geometry import (
+    LEFT_EYE, LEFT_IRIS, RIGHT_EYE, RIGHT_IRIS, eye_aspect_ratios, face_box, iris_gaze_offset,
+    landmarks_to_array, pose_image_points,
+)
+
+
+def _points(seed=0, n=478):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(0.3, 0.7, n), rng.uniform(0.2, 0.8, n), rng.uniform(-0.1, 0.1, n)])
+
+
+def _scalar_ear(points, indices):
+    p1, p2, p3, p4, p5, p6 = (points[i] for i in indices)
+    vertical_1 = np.hypot(*(p2[:2] - p5[:2]))
+    vertical_2 = np.hypot(*(p3[:2] - p4[:2]))
+    return (vertical_1 + vertical_2) / (2.0 * np.hypot(*(p1[:2] - p6[:2])))
+
+
+def _scalar_offset(points):
+    offsets = []
+    for eye, iris in ((LEFT_EYE, LEFT_IRIS), (RIGHT_EYE, RIGHT_IRIS)):
+        left, right = points[eye[0], 0], points[eye[3], 0]
+        iris_x = np.mean([points[i, 0] for i in iris])
+        offsets.append((iris_x - (left + right) / 2) / (abs(right - left) / 2))
+    return np.mean(offsets)
+
+
+def test_features_match_scalar_math():
+    points = _points()
+
+    assert np.allclose(eye_aspect_ratios(points), [_scalar_ear(points, LEFT_EYE), _scalar_ear(points, RIGHT_EYE)])
+    assert np.isclose(iris_gaze_offset(points), _scalar_offset(points))
+    assert np.allclose(pose_image_points(points, 480, 640)[1], points[152, :2] * (640, 480))
+
+    x, y, w, h = face_box(points, 480, 640)
+    assert w == h and 0 <= x and x + w <= 640 and y + h <= 480
+
+
+def test_features_accept_a_stack_of_frames():
+    stack = np.stack([_points(seed) for seed in range(3)])
+
+    assert eye_aspect_ratios(stack).shape == (3, 2)
+    assert iris_gaze_offset(stack).shape == (3,)
+    assert pose_image_points(stack, 480, 640).shape == (3, 6, 2)
+    assert np.allclose(iris_gaze_offset(stack)[2], iris_gaze_offset(stack[2]))
+
+
+def test_degenerate_eyes_give_zero():
+    points = _points()
+    points[list(LEFT_EYE) + list(RIGHT_EYE), :2] = 0.5
+
+    assert eye_aspect_ratios(points).tolist() == [0.0, 0.0]
+    assert iris_gaze_offset(points) == 0.0
+
+
+class _WireOnly:
+    """A landmark list that can only be read through its serialized bytes."""
+
+    def __init__(self, message):
+        self.SerializeToString = message.SerializeToString
+
+    @property
+    def landmark(self):
+        raise AssertionError("fell back to attribute access")
+
+
+def test_landmark_conversion_matches_attribute_access():
+    landmark_pb2 = pytest.importorskip("mediapipe.framework.formats.landmark_pb2")
+    points = _points().astype(np.float32)
+    points[0] = 0.0  # x, y and z all zero: still serialized (proto2)
+    message = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in points:
+        message.landmark.add(x=x, y=y, z=z)
+    plain = SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in points])
+
+    # Fixed-size records, decoded without touching the landmark objects
+    assert len(message.SerializeToString()) == 17 * len(points)
+    assert np.array_equal(landmarks_to_array(_WireOnly(message)), points.astype(np.float64))
+    assert np.array_equal(landmarks_to_array(message), points.astype(np.float64))
+    assert np.array_equal(landmarks_to_array(plain), points.astype(np.float64))
+
+    # Landmarks with extra fields fall back to attribute access
+    message.landmark[3].visibility = 0.9
+    assert len(message.SerializeToString()) != 17 * len(points)
+    with pytest.raises(AssertionError, match="attribute access"):
+        landmarks_to_array(_WireOnly(message))
+    assert np.array_equal(landmarks_to_array(message), points.astype(np.float64))
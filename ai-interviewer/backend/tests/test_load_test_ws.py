@@ -0,0 +1,35 @@
+import asyncio
+import json
+import pathlib
+import subprocess
+import sys
+import time
+
+from backend.interview_engine import MockInterviewEngine
+
+
+def test_mock_engine_latency():
+    engine = MockInterviewEngine(latency=0.05)
+    start = time.perf_counter()
+    response = asyncio.run(engine.generate([]))
+    assert time.perf_counter() - start >= 0.05
+    assert response["system_state"] == "TECHNICAL"
+
+
+def test_load_test_reports_turn_latency_and_loop_lag(tmp_path):
+    # Own process: the run starts and shuts down the app's shared pool and decoder
+    output = tmp_path / "report.json"
+    root = pathlib.Path(__file__).resolve().parents[2]
+    subprocess.run(
+        [sys.executable, "-m", "backend.load_test_ws", "--sessions", "3", "--turns", "2",
+         "--engine-latency", "0.05", "--think-time", "0", "--fps", "1", "--ramp", "0",
+         "--output", str(output)],
+        cwd=root, capture_output=True, text=True, check=True, timeout=300,
+    )
+    report = json.loads(output.read_text())
+
+    assert report["sessions_completed"] == 3
+    assert report["turns_completed"] == 6
+    assert report["turn_latency_ms"]["p50"] >= 50.0
+    assert report["event_loop_lag_ms"]["p50"] is not None
+    assert report["audio_chunks_sent"] > 0
@@ -0,0 +1,57 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.metrics import Counter, Histogram, MetricsRegistry, STAGE_SECONDS, collect_timings, stage
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry()
+    latency = registry.register(Histogram("demo_seconds", "Demo latency.", ["stage"], buckets=(0.1, 1.0)))
+    drops = registry.register(Counter("demo_drops_total", "Demo drops.", ["reason"]))
+    latency.observe(0.05, stage="decode")
+    latency.observe(0.5, stage="decode")
+    drops.inc(reason='queue "full"')
+
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{stage="decode",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="decode",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{stage="decode"} 2' in text
+    assert 'demo_drops_total{reason="queue \\"full\\""} 1' in text
+
+
+def test_collected_timings_are_not_recorded_directly():
+    before = STAGE_SECONDS.count(stage="unit_test_stage")
+    with collect_timings() as timings:
+        with stage("unit_test_stage"):
+            pass
+    assert "unit_test_stage" in timings
+    assert STAGE_SECONDS.count(stage="unit_test_stage") == before
+
+    with stage("unit_test_stage"):
+        pass
+    assert STAGE_SECONDS.count(stage="unit_test_stage") == before + 1
+
+
+def test_metrics_endpoint_reports_session_series():
+    session = main.session_registry.create()
+    if session.engine is None:
+        return
+    session.engine.start()
+    try:
+        deadline = time.time() + 30
+        while session.engine.observation_count < 3 and time.time() < deadline:
+            time.sleep(0.05)
+
+        response = TestClient(main.app).get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert f'observation_queue_depth{{session="{session.session_id}",queue="video_queue"}}' in text
+        assert f'observation_session_rate_per_second{{session="{session.session_id}"}}' in text
+        assert 'observation_stage_seconds_count{stage="audio"}' in text
+        assert 'observation_stage_seconds_count{stage="logger_write"}' in text
+    finally:
+        main.session_registry.remove(session.session_id)
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from backend.micro_batcher import MicroBatcher
+
+
+def test_concurrent_submissions_share_batches():
+    seen_batches = []
+
+    def run_batch(items):
+        seen_batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(run_batch, max_batch=16, window=0.05)
+    start = threading.Barrier(8)
+    results = {}
+
+    def worker(value):
+        start.wait()
+        results[value] = batcher.submit(value).result(timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.stop()
+
+    assert results == {i: i * 2 for i in range(8)}
+    assert len(seen_batches) < 8
+    assert batcher.items_run == 8
+
+
+def test_max_batch_and_per_item_errors():
+    def run_batch(items):
+        return [ValueError("bad") if item < 0 else item for item in items]
+
+    batcher = MicroBatcher(run_batch, max_batch=2, window=0.05)
+    futures = [batcher.submit(value) for value in (1, -1, 3)]
+
+    assert futures[0].result(timeout=5) == 1
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5) == 3
+    assert batcher.batches_run == 2
+    batcher.stop()
+
+
+def test_backlog_drops_oldest_and_skips_cancelled():
+    release = threading.Event()
+    seen = []
+
+    def run_batch(items):
+        release.wait(5)
+        seen.extend(items)
+        return items
+
+    batcher = MicroBatcher(run_batch, max_batch=1, window=0.0, max_pending=2)
+    first = batcher.submit(0)
+    deadline = time.time() + 5
+    while not first.running() and time.time() < deadline:
+        time.sleep(0.01)
+
+    # The dispatcher is busy with item 0; items 1-4 compete for two backlog slots
+    futures = [batcher.submit(value) for value in (1, 2, 3, 4)]
+    futures[3].cancel()  # the caller timed out
+    release.set()
+
+    assert futures[0].cancelled() and futures[1].cancelled()
+    assert futures[2].result(timeout=5) == 3
+    batcher.stop()
+    assert seen == [0, 3]
+    assert batcher.items_dropped == 2
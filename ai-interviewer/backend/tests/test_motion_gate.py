@@ -0,0 +1,85 @@
+import numpy as np
+
+from backend.analyzer_schedule import AnalyzerSchedule, run_analyzers
+from backend.emotion_analyzer import EmotionAnalyzer
+from backend.face_analyzer import FaceAnalyzer
+from backend.motion_gate import MotionGate
+from backend.observation_records import EmotionResult, FaceResult
+
+FACE_BOX = (200, 120, 160, 160)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 50.0
+
+    def __call__(self):
+        return self.now
+
+
+def _frame(seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 255, (24, 32, 3), dtype=np.uint8)
+    # Smooth scene (blocky upscale) so area thumbnails are stable
+    return np.ascontiguousarray(np.kron(base, np.ones((20, 20, 1), dtype=np.uint8)))
+
+
+def _noisy(frame, seed):
+    noise = np.random.default_rng(seed).integers(-4, 5, frame.shape)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def _results():
+    return FaceResult(face_detected=True, face_box=FACE_BOX), EmotionResult(emotion="Neutral")
+
+
+def test_unchanged_frames_reuse_until_stale():
+    clock = _Clock()
+    gate = MotionGate(max_staleness=1.0, clock=clock)
+    frame = _frame()
+
+    assert not gate.check(frame)
+    gate.analyzed(frame, _results(), face_box=FACE_BOX)
+
+    clock.now += 0.5
+    assert gate.check(_noisy(frame, 1))
+    results, age = gate.reused_results()
+    assert results[1]["emotion"] == "Neutral" and age == 0.5
+
+    clock.now += 0.5
+    assert not gate.check(_noisy(frame, 2))
+    assert (gate.hits, gate.misses) == (1, 2)
+
+
+def test_scene_and_face_changes_are_analyzed():
+    gate = MotionGate(clock=_Clock())
+    frame = _frame()
+    gate.analyzed(frame, _results(), face_box=FACE_BOX)
+
+    assert not gate.check(_frame(seed=3))
+
+    # A blink-sized change inside the face box: too small for the scene thumbnail
+    blink = frame.copy()
+    blink[170:190, 230:330] = 255 - blink[170:190, 230:330]
+    assert not gate.check(blink)
+    assert gate.check(frame.copy())
+
+
+def test_run_analyzers_reuses_results_with_refreshed_ages():
+    clock = _Clock()
+    face_analyzer, emotion_analyzer = FaceAnalyzer(), EmotionAnalyzer()
+    face_analyzer.yolo_detector = None
+    face_analyzer.face_mesh = None
+    schedule = AnalyzerSchedule(clock=clock)
+    gate = MotionGate(clock=clock)
+    frame = _frame()
+
+    face, emotion = run_analyzers(face_analyzer, emotion_analyzer, schedule, frame, gate=gate)
+    clock.now += 0.25
+    reused_face, reused_emotion = run_analyzers(face_analyzer, emotion_analyzer, schedule, frame.copy(), gate=gate)
+
+    assert gate.last_reused and schedule.runs["face"] == 1
+    assert reused_face["face_detected"] == face["face_detected"]
+    assert reused_face["age_seconds"] == 0.25 and reused_face["person_check_age"] == 0.25
+    assert reused_emotion["emotion"] == emotion["emotion"]
+    assert reused_emotion["age_seconds"] == 0.25
@@ -0,0 +1,50 @@
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from backend.audio_analyzer import AudioAnalyzer
+from backend.emotion_analyzer import EmotionAnalyzer
+from backend.face_analyzer import FaceAnalyzer
+from backend.observation_payload import build_observation_payload, encode_payload
+from backend.observation_records import AudioResult, EmotionResult, FaceResult, dumps
+
+
+def test_record_behaves_like_a_read_only_mapping():
+    face = FaceResult(face_detected=np.bool_(True), face_count=np.int64(1), head_yaw=np.float32(3.5))
+
+    assert face["face_detected"] is True
+    assert type(face["face_count"]) is int
+    assert type(face["head_yaw"]) is float
+    assert face.get("looking_away", "missing") == "missing"
+    assert "looking_away" not in face
+    assert list(face) == ["face_detected", "face_count", "head_yaw"]
+    assert not hasattr(face, "__dict__")
+    with pytest.raises(AttributeError):
+        face.head_yaw = 0.0
+    with pytest.raises(TypeError):
+        FaceResult(unknown_field=1)
+
+
+def test_records_pickle_and_encode_without_sanitizing():
+    emotion = EmotionResult(emotion="happy", confidence=np.float64(7.5), emotion_scores={"happy": np.float32(7.5)})
+    assert pickle.loads(pickle.dumps(emotion)) == emotion
+
+    observation = {
+        "timestamp": 1.0,
+        "face": FaceResult(face_detected=False),
+        "emotion": emotion,
+        "audio": AudioResult(stress_level="low", voice_confidence=6),
+    }
+    decoded = json.loads(encode_payload(build_observation_payload(observation, sequence=1)))
+    assert decoded["observation"]["emotion"]["emotion_scores"] == {"happy": 7.5}
+    assert decoded["observation"]["audio"]["voice_confidence"] == 6.0
+    assert json.loads(dumps({"value": np.int32(3)})) == {"value": 3}
+
+
+def test_analyzers_return_records():
+    frame = np.full((240, 320, 3), 127, dtype=np.uint8)
+    assert isinstance(FaceAnalyzer().analyze(frame), FaceResult)
+    assert isinstance(EmotionAnalyzer().analyze(frame), EmotionResult)
+    assert isinstance(AudioAnalyzer().analyze(), AudioResult)
@@ -0,0 +1,95 @@
+import json
+import time
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from backend import human_observation_engine, main
+from backend.human_observation_engine import HumanObservationEngine
+from backend.observation_payload import build_observation_payload, build_warnings
+
+
+def test_warnings_precomputed_with_payload():
+    observation = {"timestamp": 1.0, "face": {"face_detected": True, "face_count": 2}}
+    payload = build_observation_payload(observation, sequence=7)
+
+    assert payload["sequence"] == 7
+    assert payload["warnings"] == build_warnings(observation)
+    assert payload["warnings"][0]["type"] == "VIOLATION"
+
+
+def _wait_for(condition, timeout=30.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.02)
+    assert condition()
+
+
+def test_stream_pushes_observations_of_new_frames():
+    session = main.session_registry.create()
+    engine = session.engine
+    assert engine is not None, "observation engine could not be built"
+    # Only frames should drive pushes here: no heartbeat, no rate cap
+    engine.heartbeat_interval = 3600.0
+    engine.set_observation_mode(True)
+    frame = np.full((480, 640, 3), 127, dtype=np.uint8)
+
+    client = TestClient(main.app)
+    engine.start()
+    try:
+        with client.websocket_connect(f"/observation/stream?session_id={session.session_id}") as websocket:
+            _wait_for(lambda: engine._listeners)
+            engine.add_video_frame(frame)
+            first = json.loads(websocket.receive_text())
+            engine.add_video_frame(frame)
+            second = json.loads(websocket.receive_text())
+        assert first["success"] is True
+        assert second["sequence"] == first["sequence"] + 1
+        assert "warnings" in second
+
+        # Nothing is published between frames
+        time.sleep(0.5)
+        assert engine.observation_count == second["sequence"]
+        latest = client.get("/observation/latest", params={"session_id": session.session_id}).json()
+        assert latest["sequence"] == second["sequence"]
+    finally:
+        main.session_registry.remove(session.session_id)
+
+
+def test_heartbeat_republishes_without_input():
+    session = main.session_registry.create()
+    engine = session.engine
+    assert engine is not None, "observation engine could not be built"
+    engine.heartbeat_interval = 0.2
+    engine.warmup_frames = 0
+    engine.start()
+    try:
+        time.sleep(1.0)
+        # ~5 heartbeats a second, not one per 10 Hz loop tick
+        assert 2 <= engine.observation_count <= 6
+    finally:
+        main.session_registry.remove(session.session_id)
+
+
+def test_unread_observation_queue_keeps_newest(tmp_path):
+    engine = HumanObservationEngine(log_file=str(tmp_path / "log.txt"))
+    for i in range(150):
+        engine._enqueue_observation({"timestamp": i})
+
+    assert engine.observation_queue.qsize() == engine.observation_queue.maxsize == 100
+    assert engine.observation_queue.get_nowait()["timestamp"] == 50
+
+
+def test_frame_rate_cap_tolerates_jitter(tmp_path, monkeypatch):
+    engine = HumanObservationEngine(log_file=str(tmp_path / "log.txt"))
+    engine.running = True  # accept frames without starting the loop thread
+    engine.set_observation_mode(True, max_fps=5)
+    clock = iter([10.0, 10.19, 10.41, 10.6, 10.79, 11.0, 11.05, 11.1, 11.12])
+    monkeypatch.setattr(human_observation_engine.time, "monotonic", lambda: next(clock))
+
+    for _ in range(9):
+        engine.add_video_frame(np.zeros((4, 4, 3), dtype=np.uint8))
+
+    # Frames ~0.2 s apart all pass; the burst at the end is capped
+    assert engine.video_queue.qsize() == 7
+    assert engine.dropped_frames == 2
@@ -0,0 +1,125 @@
+import numpy as np
+
+from backend.benchmark_person_detectors import compare_detectors, recommend
+from backend.person_detectors import DETECTOR_TIERS, PersonDetectorBackend, decode_yolov8, letterbox
+from backend.robust_face_detector import RobustFaceDetector, box_iou_matrix
+
+
+class _FakeBackend(PersonDetectorBackend):
+    def __init__(self, boxes_per_frame):
+        super().__init__("fake", DETECTOR_TIERS["yolov8n-onnx-320"])
+        self.boxes_per_frame = boxes_per_frame
+        self.calls = 0
+
+    def detect(self, frames, conf_threshold):
+        outputs = []
+        for _ in frames:
+            boxes = self.boxes_per_frame[self.calls % len(self.boxes_per_frame)]
+            boxes = np.array(boxes, dtype=np.float32).reshape(-1, 5)
+            outputs.append(boxes[boxes[:, 4] >= conf_threshold])
+            self.calls += 1
+        return outputs
+
+
+PERSON_A = (20, 20, 220, 420, 0.9)
+PERSON_B = (300, 40, 500, 440, 0.85)
+
+
+def test_letterbox_keeps_aspect_and_pads():
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    image, scale, pad = letterbox(frame, 320)
+
+    assert image.shape == (320, 320, 3)
+    assert scale == 0.5 and pad == (0, 40)
+    assert image[0, 0].tolist() == [114, 114, 114] and image[40, 0].tolist() == [0, 0, 0]
+
+
+def test_decode_yolov8_maps_boxes_back_to_frame():
+    columns = [
+        # cx, cy, w, h in network pixels, then person score
+        (160, 160, 100, 200, 0.9),
+        (162, 161, 100, 200, 0.8),   # duplicate of the first
+        (60, 100, 40, 60, 0.3),      # below threshold
+        (260, 200, 60, 120, 0.95),
+    ]
+    output = np.zeros((1, 84, len(columns)), dtype=np.float32)
+    for i, (cx, cy, w, h, score) in enumerate(columns):
+        output[0, :5, i] = (cx, cy, w, h, score)
+    output[0, 5, 2] = 0.99  # another class's score never counts
+
+    boxes = decode_yolov8(output, 0.5, scale=0.5, pad=(0, 40), frame_shape=(480, 640))
+
+    assert boxes.shape == (2, 5)
+    by_score = {round(float(box[4]), 2): box for box in boxes}
+    assert np.allclose(by_score[0.9][:4], (220, 40, 420, 440))
+    assert np.allclose(by_score[0.95][:4], (460, 200, 580, 440))
+
+
+def test_detector_filters_backend_boxes():
+    tiny = (0, 0, 50, 50, 0.95)
+    unsure = (300, 40, 500, 440, 0.5)
+    detector = RobustFaceDetector(backend=_FakeBackend([[PERSON_A, tiny, unsure], [PERSON_A, PERSON_B]]))
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    count, persons = detector.detect_persons(frame)
+    assert count == 1 and persons[0]["bbox"] == (20, 20, 220, 420)
+    assert [count for count, _ in detector.detect_persons_batch([frame, None])] == [2, 0]
+
+
+def test_compare_detectors_scores_against_reference():
+    frames = [np.zeros((480, 640, 3), dtype=np.uint8)] * 4
+    single, double = [PERSON_A], [PERSON_A, PERSON_B]
+    detectors = {
+        "reference": RobustFaceDetector(backend=_FakeBackend([single, double])),
+        "misses_second": RobustFaceDetector(backend=_FakeBackend([single, single])),
+        "same": RobustFaceDetector(backend=_FakeBackend([single, double])),
+    }
+
+    results = compare_detectors(frames, detectors, "reference")
+
+    assert results["same"]["count_agreement"] == 1.0
+    assert results["misses_second"]["count_agreement"] == 0.5
+    assert results["misses_second"]["multi_person_frames"] == 2
+    assert results["misses_second"]["multi_person_recall"] == 0.0
+    assert results["same"]["false_multi_person_rate"] == 0.0
+    assert recommend(results) in ("reference", "same")
+
+
+def _reference_nms(boxes, iou_threshold):
+    """Greedy NMS one box at a time, as the detector used to do it."""
+    def iou(a, b):
+        w = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+        h = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+        union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - w * h
+        return w * h / union if union else 0.0
+
+    remaining = sorted(range(len(boxes)), key=lambda i: boxes[i][4], reverse=True)
+    keep = []
+    while remaining:
+        best = remaining.pop(0)
+        keep.append(best)
+        remaining = [i for i in remaining if iou(boxes[best], boxes[i]) < iou_threshold]
+    return keep
+
+
+def test_crowded_frame_nms_matches_greedy_reference():
+    rng = np.random.default_rng(4)
+    corners = rng.integers(0, 500, (150, 2))
+    sizes = rng.integers(100, 250, (150, 2))
+    boxes = np.column_stack([corners, corners + sizes, rng.uniform(0.75, 1.0, 150)]).astype(np.float32)
+    detector = RobustFaceDetector(backend=_FakeBackend([boxes]))
+
+    count, persons = detector.detect_persons(np.zeros((720, 960, 3), dtype=np.uint8))
+
+    bboxes = np.trunc(boxes.astype(np.float64))
+    expected = _reference_nms([tuple(b[:4]) + (float(s),) for b, s in zip(bboxes, boxes[:, 4])], detector.iou_threshold)
+    assert count == len(expected) > 1
+    assert [p["bbox"] for p in persons] == [tuple(int(v) for v in bboxes[i, :4]) for i in expected]
+    assert persons[0]["confidence"] >= persons[-1]["confidence"]
+
+
+def test_iou_matrix():
+    iou = box_iou_matrix(np.array([(0, 0, 10, 10), (5, 0, 15, 10), (20, 20, 20, 30)]))
+
+    assert np.allclose(iou[0], [1.0, 1 / 3, 0.0])
+    assert iou[2, 2] == 0.0
@@ -0,0 +1,124 @@
+import numpy as np
+
+from backend.face_analyzer import FaceAnalyzer
+from backend.person_detectors import DETECTOR_TIERS, PersonDetectorBackend
+from backend.robust_face_detector import RobustFaceDetector
+from backend.roi_tracker import ROITracker
+
+
+class _ShapeCascade:
+    """Returns a fixed box per detection image shape."""
+
+    def __init__(self, boxes_by_shape):
+        self.boxes_by_shape = boxes_by_shape
+        self.shapes = []
+
+    def detectMultiScale(self, image, scaleFactor, minNeighbors, minSize):
+        self.shapes.append(image.shape)
+        boxes = self.boxes_by_shape.get(image.shape, [])
+        return np.array(boxes, dtype=np.int32).reshape(-1, 4)
+
+
+class _PersonSequence(PersonDetectorBackend):
+    """Returns the next frame's person boxes from a fixed sequence."""
+
+    def __init__(self, boxes_per_call):
+        super().__init__("fake", DETECTOR_TIERS["yolov8n-onnx-320"])
+        self.boxes_per_call = boxes_per_call
+        self.calls = 0
+
+    def detect(self, frames, conf_threshold):
+        outputs = []
+        for _ in frames:
+            boxes = self.boxes_per_call[min(self.calls, len(self.boxes_per_call) - 1)]
+            outputs.append(np.array(boxes, dtype=np.float32).reshape(-1, 5))
+            self.calls += 1
+        return outputs
+
+
+def test_tracker_pads_and_refreshes():
+    tracker = ROITracker(padding=0.5, refresh_frames=3)
+    assert tracker.next_roi() is None
+
+    tracker.update((200, 100, 100, 100), (640, 480), full_frame=True)
+    assert tracker.next_roi() == (150, 50, 200, 200)
+
+    for _ in range(3):
+        assert tracker.next_roi() is not None
+        tracker.update((202, 101, 100, 100), (640, 480), full_frame=False)
+    # Periodic refresh
+    assert tracker.next_roi() is None
+    assert (tracker.tracked_frames, tracker.full_frames) == (3, 1)
+
+
+def test_tracker_drops_roi_on_motion_edge_and_loss():
+    tracker = ROITracker(padding=0.5, max_motion=0.3, edge_margin=0.1)
+    tracker.update((200, 100, 100, 100), (640, 480), full_frame=True)
+    tracker.update((240, 100, 100, 100), (640, 480), full_frame=False)
+    assert tracker.next_roi() is None
+
+    tracker.update((200, 100, 100, 100), (640, 480), full_frame=True)
+    tracker.update(None, (640, 480), full_frame=False)
+    assert tracker.next_roi() is None
+
+    # A crop clipped by the frame border does not count as an edge
+    tracker.update((0, 0, 100, 100), (640, 480), full_frame=True)
+    assert tracker.roi == (0, 0, 150, 150)
+    tracker.update((0, 0, 100, 100), (640, 480), full_frame=False)
+    assert tracker.next_roi() == (0, 0, 150, 150)
+
+
+def test_face_analyzer_detects_on_crop_between_refreshes():
+    frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+    analyzer = FaceAnalyzer()
+    analyzer.yolo_detector = None
+    analyzer.face_mesh = None
+    analyzer.roi_tracker = ROITracker(padding=0.6, refresh_frames=4)
+    # Full frame is detected at 320x240 (scale 2); the padded 352 px crop at 176x176
+    analyzer.face_cascade = _ShapeCascade({
+        (240, 320): [(100, 60, 80, 80)],
+        (176, 176): [(48, 48, 80, 80)],
+    })
+
+    results = [analyzer.analyze(frame) for _ in range(6)]
+
+    assert all(r["face_box"] == (200, 120, 160, 160) for r in results)
+    assert analyzer.face_cascade.shapes == [(240, 320)] + [(176, 176)] * 4 + [(240, 320)]
+    assert (analyzer.roi_tracker.full_frames, analyzer.roi_tracker.tracked_frames) == (2, 4)
+
+
+def test_face_analyzer_falls_back_to_full_frame_when_crop_loses_face():
+    frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+    analyzer = FaceAnalyzer()
+    analyzer.yolo_detector = None
+    analyzer.face_mesh = None
+    analyzer.face_cascade = _ShapeCascade({(240, 320): [(100, 60, 80, 80)]})
+
+    analyzer.analyze(frame)
+    result = analyzer.analyze(frame)
+
+    # The crop found nothing, so the same frame was re-analyzed in full
+    assert result["face_detected"]
+    assert analyzer.face_cascade.shapes[1:] == [(176, 176), (240, 320)]
+
+
+def test_second_person_is_confirmed_on_consecutive_frames():
+    frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+    one = [(20, 20, 220, 420, 0.9)]
+    two = one + [(300, 40, 500, 440, 0.85)]
+    analyzer = FaceAnalyzer()
+    analyzer.face_mesh = None
+    analyzer.yolo_detector = RobustFaceDetector(backend=_PersonSequence([one, two]))
+    analyzer.roi_tracker = ROITracker(padding=0.6, refresh_frames=2)
+    analyzer.face_cascade = _ShapeCascade({
+        (240, 320): [(100, 60, 80, 80)],
+        (176, 176): [(48, 48, 80, 80)],
+    })
+
+    results = [analyzer.analyze(frame) for _ in range(6)]
+
+    # Frame 4 is the periodic refresh that first sees the second person; the
+    # pending positive then forces full-frame checks until it is confirmed
+    assert [r.get("multiple_faces", False) for r in results] == [False] * 5 + [True]
+    assert analyzer.yolo_detector.backend.calls == 4
+    assert (analyzer.roi_tracker.full_frames, analyzer.roi_tracker.tracked_frames) == (4, 2)
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import threading
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from backend import main, observation_config
+from backend.interview_engine import MockInterviewEngine
+from backend.session_recording import (
+    KIND_ASSISTANT,
+    KIND_AUDIO,
+    KIND_USER_TEXT,
+    KIND_VIDEO,
+    SessionRecorder,
+    SessionRecording,
+    replay_recording,
+)
+from backend.tests.test_frame_ingest import _jpeg_bytes
+
+
+class _FakeObservationEngine:
+    def __init__(self):
+        self.frames = []
+        self.audio = []
+
+    def add_video_frame(self, frame):
+        self.frames.append(frame)
+
+    def add_audio_frame(self, samples):
+        self.audio.append(samples)
+
+
+def _write_session(path):
+    recorder = SessionRecorder(str(path))
+    recorder.record_assistant({"interviewer_response": "Welcome"})
+    recorder.record_video(_jpeg_bytes())
+    recorder.record_audio(np.arange(160, dtype="<i2").tobytes())
+    recorder.record_user_text("Hello")
+    recorder.record_assistant({"interviewer_response": "Tell me about yourself"})
+    return recorder
+
+
+def test_roundtrip_uses_index(tmp_path):
+    path = tmp_path / "session.rec"
+    _write_session(path).close()
+
+    with SessionRecording(str(path)) as recording:
+        assert recording.complete
+        assert [event.kind for event in recording] == [
+            KIND_ASSISTANT, KIND_VIDEO, KIND_AUDIO, KIND_USER_TEXT, KIND_ASSISTANT,
+        ]
+        assert bytes(recording[1].payload) == _jpeg_bytes()
+        assert bytes(recording[3].payload) == b"Hello"
+        assert [e.kind for e in recording.events([KIND_USER_TEXT])] == [KIND_USER_TEXT]
+        timestamps = [event.timestamp for event in recording]
+        assert timestamps == sorted(timestamps)
+        assert recording.summary()["counts"]["video"] == 1
+
+
+def test_unclosed_recording_is_recovered_by_scanning(tmp_path):
+    path = tmp_path / "crashed.rec"
+    recorder = _write_session(path)
+    recorder.flush()
+    # Simulate a crash mid-write: a partial record at the tail and no footer
+    with open(path, "ab") as f:
+        f.write(b"\x01\x00\x00")
+
+    with SessionRecording(str(path)) as recording:
+        assert not recording.complete
+        assert len(recording) == 5
+
+
+def test_replay_feeds_engines_with_recorded_history(tmp_path):
+    path = tmp_path / "session.rec"
+    _write_session(path).close()
+    observation = _FakeObservationEngine()
+    calls = []
+
+    class _Engine(MockInterviewEngine):
+        async def run_turn(self, user_text, history):
+            calls.append((user_text, list(history)))
+            return await super().run_turn(user_text, history)
+
+    with SessionRecording(str(path)) as recording:
+        result = asyncio.run(replay_recording(
+            recording, observation_engine=observation, interview_engine=_Engine(), speed=0,
+        ))
+
+    assert len(observation.frames) == 1 and observation.frames[0].shape == (48, 64, 3)
+    assert len(observation.audio) == 1 and observation.audio[0].dtype == np.float32
+    # Greeting, then the candidate turn with the history /ws would have passed
+    assert calls[0] == ("", [])
+    assert calls[1] == ("Hello", [
+        {"role": "assistant", "content": "Welcome"},
+        {"role": "user", "content": "Hello"},
+    ])
+    assert result["turns"][1]["recorded"]["interviewer_response"] == "Tell me about yourself"
+
+
+def test_ws_session_is_recorded(tmp_path, monkeypatch):
+    monkeypatch.setattr(observation_config, "SESSION_RECORDING_DIR", str(tmp_path))
+    main.app.dependency_overrides[main.get_engine] = main.get_mock_engine
+    client = TestClient(main.app)
+    with client.websocket_connect("/ws") as websocket:
+        session_id = json.loads(websocket.receive_text())["session_id"]
+        websocket.send_json({"text": "Hello"})
+        websocket.receive_text()
+
+    path = tmp_path / f"session_{session_id}.rec"
+    with SessionRecording(str(path)) as recording:
+        assert recording.complete
+        assert [event.kind for event in recording] == [KIND_ASSISTANT, KIND_USER_TEXT, KIND_ASSISTANT]
+
+
+def test_slow_disk_never_blocks_the_caller(tmp_path):
+    recorder = SessionRecorder(str(tmp_path / "slow.rec"), max_pending=2)
+    writing, disk = threading.Event(), threading.Event()
+    write_record = recorder._write_record
+    recorder._write_record = lambda *record: (writing.set(), disk.wait(5), write_record(*record))
+
+    recorder.record_audio(b"\x00\x01")
+    assert writing.wait(5)
+    for _ in range(9):
+        recorder.record_audio(b"\x00\x01")
+    disk.set()
+    recorder.close()
+
+    # One record was being written, two waited; the rest were dropped
+    assert recorder.dropped_records == 7
+    with SessionRecording(recorder.path) as recording:
+        assert recording.complete and len(recording) == 3
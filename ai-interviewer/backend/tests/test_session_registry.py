@@ -0,0 +1,94 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from backend.main import app, get_engine, get_mock_engine, session_registry
+from backend.session_registry import SessionRegistry
+
+
+class _FakeEngine:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+def test_sessions_get_isolated_engines():
+    registry = SessionRegistry(engine_factory=_FakeEngine)
+    first = registry.create()
+    second = registry.create()
+
+    assert first.session_id != second.session_id
+    assert registry.get_engine(first.session_id) is not registry.get_engine(second.session_id)
+
+    registry.release(first.session_id)
+    assert first.engine.stopped
+    assert not second.engine.stopped
+    assert registry.active_sessions() == [second]
+
+
+def test_released_sessions_expire():
+    registry = SessionRegistry(engine_factory=_FakeEngine, retention_seconds=0)
+    session = registry.create()
+    registry.release(session.session_id)
+    registry.evict_expired()
+
+    assert session.session_id not in registry
+    assert registry.get_engine(session.session_id) is None
+
+
+def test_failed_engine_factory_still_creates_session():
+    def broken_factory(session_id):
+        raise RuntimeError("no camera stack")
+
+    registry = SessionRegistry(engine_factory=broken_factory)
+    session = registry.create()
+    assert session.engine is None
+
+
+def test_ws_issues_session_id():
+    app.dependency_overrides[get_engine] = get_mock_engine
+    client = TestClient(app)
+    with client.websocket_connect("/ws") as websocket:
+        greeting = json.loads(websocket.receive_text())
+        session_id = greeting["session_id"]
+        assert session_id in session_registry
+
+        report = client.get("/observation/report", params={"session_id": session_id}).json()
+        assert report["success"] is True
+    assert not session_registry.get(session_id).active
+
+
+def test_reconnect_takes_over_a_live_session():
+    registry = SessionRegistry(engine_factory=_FakeEngine)
+    first = registry.create()
+    old_token = first.token
+
+    resumed = registry.create(first.session_id, state={"history": []})
+    assert resumed is first and resumed.token != old_token
+    assert len(registry) == 1
+
+    # The old connection closing afterwards leaves the session to the new one
+    registry.release(first.session_id, old_token)
+    assert resumed.active and not resumed.engine.stopped
+    registry.release(first.session_id, resumed.token)
+    assert not resumed.active and resumed.engine.stopped
+
+    # A session recreated after release is not torn down by a stale token either
+    recreated = registry.create(first.session_id)
+    registry.release(first.session_id, resumed.token)
+    assert recreated.active
+
+
+def test_observing_engine_never_adopts():
+    registry = SessionRegistry(engine_factory=_FakeEngine)
+    session = registry.create()
+
+    assert registry.observing_engine(session.session_id) is session.engine
+    session.observing = False
+    assert registry.observing_engine(session.session_id) is None
+    registry.release(session.session_id)
+    assert registry.observing_engine(session.session_id) is None
+    assert registry.observing_engine("unknown") is None
@@ -0,0 +1,251 @@
+import json
+import time
+
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.observation_logger import RECENT_OBSERVATIONS, ObservationLogger
+from backend.observation_records import AudioResult, EmotionResult, FaceResult
+from backend.session_registry import SessionRegistry
+from backend.session_store import InMemorySessionStore, SQLiteSessionStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield InMemorySessionStore()
+    else:
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+        yield store
+        store.close()
+
+
+def test_update_merges_fields(store):
+    assert store.get("s1") is None
+    store.update("s1", history=[{"role": "user", "content": "hi"}], phase="WARM_UP")
+    store.update("s1", phase="TECHNICAL", observation={"observation_count": 3})
+
+    state = store.get("s1")
+    assert state["history"] == [{"role": "user", "content": "hi"}]
+    assert state["phase"] == "TECHNICAL"
+    assert state["observation"] == {"observation_count": 3}
+    assert state["updated_at"] <= time.time()
+
+
+def test_get_fields_reads_only_named_fields(store):
+    store.update("s1", history=[{"role": "user", "content": "hi"}], observer="a", active=True)
+
+    assert store.get_fields("s1", "observer", "active", "missing") == {"observer": "a", "active": True}
+    assert store.get_fields("unknown", "observer") == {}
+
+
+def test_saving_engine_state_does_not_load_the_session():
+    class _Store(InMemorySessionStore):
+        def get(self, session_id):
+            raise AssertionError("save path decoded the whole session")
+
+    registry = SessionRegistry(_StatefulEngine, store=_Store(), worker_id="a")
+    session = registry.create()
+    registry.save_engine_state(session.session_id, {"observation_count": 3})
+
+    assert registry.store.get_fields(session.session_id, "observation") == {"observation": {"observation_count": 3}}
+
+
+def test_purge_drops_idle_sessions(store):
+    store.update("old", active=False)
+    cutoff = time.time() + 1
+    assert store.purge(cutoff) == 1
+    assert store.get("old") is None
+
+
+def test_sqlite_store_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first, second = SQLiteSessionStore(path), SQLiteSessionStore(path)
+    first.update("s1", phase="TECHNICAL")
+    assert second.get("s1")["phase"] == "TECHNICAL"
+    first.close()
+    second.close()
+
+
+def test_logger_state_reproduces_report(tmp_path):
+    source = ObservationLogger(log_file=str(tmp_path / "a.txt"))
+    for i in range(20):
+        source.log_observation({
+            "face": FaceResult(face_detected=i % 4 != 0, looking_away=i % 5 == 0, looking_at_camera=True),
+            "emotion": EmotionResult(emotion="neutral", confidence=6.0),
+            "audio": AudioResult(stress_level="low", voice_confidence=7.5),
+        })
+
+    restored = ObservationLogger(log_file=str(tmp_path / "b.txt"))
+    restored.restore_state(json.loads(json.dumps(source.export_state())))
+
+    expected, actual = source.generate_report(), restored.generate_report()
+    for key in ("eye_contact_score", "focus_score", "stress_level", "voice_confidence", "violations",
+                "detailed_metrics"):
+        assert actual[key] == expected[key]
+
+
+def test_logger_memory_is_bounded(tmp_path):
+    logger = ObservationLogger(log_file=str(tmp_path / "a.txt"))
+    for i in range(RECENT_OBSERVATIONS * 3):
+        logger.log_observation({
+            "face": FaceResult(face_detected=True, looking_away=i % 2 == 0),
+            "audio": AudioResult(stress_level="low", voice_confidence=float(i % 10)),
+        })
+
+    assert len(logger.observations) == RECENT_OBSERVATIONS
+    report = logger.generate_report()
+    assert report["detailed_metrics"]["total_observations"] == RECENT_OBSERVATIONS * 3
+    assert report["eye_contact_score"] == 5.0
+    assert report["voice_confidence"] == 4.5
+    assert len(json.dumps(logger.export_state())) < 1000
+
+
+class _StatefulEngine:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.restored = None
+        self.running = False
+        self.resets = 0
+
+    def restore_state(self, state):
+        self.restored = state
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+    def reset(self):
+        self.resets += 1
+
+    def add_listener(self, listener):
+        pass
+
+    def remove_listener(self, listener):
+        pass
+
+    def get_latest_payload_json(self):
+        return None
+
+
+def test_frames_on_another_worker_take_over_the_session(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    worker_a = SessionRegistry(_StatefulEngine, store=SQLiteSessionStore(path), worker_id="a")
+    worker_b = SessionRegistry(_StatefulEngine, store=SQLiteSessionStore(path), worker_id="b")
+
+    session = worker_a.create()
+    worker_a.save_engine_state(session.session_id, {"observation_count": 7})
+
+    # The ingest connection lands on worker b, which continues from the stored state
+    engine_b = worker_b.get_engine(session.session_id, adopt=True)
+    assert engine_b.running
+    assert engine_b.restored == {"observation_count": 7}
+
+    # Worker a's idle engine no longer overwrites the shared state and stops serving reads
+    worker_a.save_engine_state(session.session_id, {"observation_count": 0})
+    assert worker_a.serving_engine(session.session_id) is None
+    worker_b.save_engine_state(session.session_id, {"observation_count": 9})
+    assert worker_a.get_state(session.session_id)["observation"] == {"observation_count": 9}
+
+    # The interview ends on worker a; worker b notices on its next save
+    worker_a.release(session.session_id)
+    worker_b.save_engine_state(session.session_id, {"observation_count": 10})
+    deadline = time.time() + 2
+    while engine_b.running and time.time() < deadline:
+        time.sleep(0.01)
+    assert not engine_b.running
+
+
+def _two_workers(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    worker_a = SessionRegistry(_StatefulEngine, store=SQLiteSessionStore(path), worker_id="a")
+    worker_b = SessionRegistry(_StatefulEngine, store=SQLiteSessionStore(path), worker_id="b")
+    session = worker_a.create()
+    session.engine.start()
+    worker_a.save_engine_state(session.session_id, {"observation_count": 7})
+    engine_b = worker_b.get_engine(session.session_id, adopt=True)
+    return worker_a, worker_b, session, engine_b
+
+
+def test_reset_and_stop_reach_the_worker_holding_the_session(tmp_path):
+    worker_a, worker_b, session, engine_b = _two_workers(tmp_path)
+    session_id = session.session_id
+
+    # Worker a no longer holds the session: the reset goes through the store
+    worker_a.reset_observation(session_id)
+    assert session.engine.resets == 0
+    assert worker_a.get_state(session_id)["observation"] is None
+
+    # Worker b resets on its next save and drops the state from before the reset
+    worker_b.save_engine_state(session_id, {"observation_count": 8})
+    assert engine_b.resets == 1
+    assert worker_b.get_state(session_id)["observation"] is None
+    worker_b.save_engine_state(session_id, {"observation_count": 1})
+    assert engine_b.resets == 1
+    assert worker_b.get_state(session_id)["observation"] == {"observation_count": 1}
+
+    worker_a.stop_observation(session_id)
+    assert session.engine.running
+    worker_b.save_engine_state(session_id, {"observation_count": 2})
+    deadline = time.time() + 2
+    while engine_b.running and time.time() < deadline:
+        time.sleep(0.01)
+    assert not engine_b.running
+
+
+def test_stream_on_a_worker_without_the_session_closes(tmp_path, monkeypatch):
+    worker_a, worker_b, session, engine_b = _two_workers(tmp_path)
+    # Worker a's engine still runs, but the session's frames go to worker b
+    assert session.engine.running and session.observing
+    monkeypatch.setattr(main, "session_registry", worker_a)
+    client = TestClient(main.app)
+
+    with client.websocket_connect(f"/observation/stream?session_id={session.session_id}") as websocket:
+        with pytest.raises(WebSocketDisconnect):
+            websocket.receive_text()
+    assert not session.observing
+
+    # The client falls back to polling, which serves the shared state
+    worker_b.save_engine_state(session.session_id, {"observation_count": 9, "latest": {"sequence": 9}})
+    assert client.get("/observation/latest", params={"session_id": session.session_id}).json() == {"sequence": 9}
+
+    response = client.post("/observation/reset", params={"session_id": session.session_id})
+    assert response.json()["success"] is True
+    assert worker_a.get_state(session.session_id)["reset_requested"] is True
+
+
+def test_stream_closes_once_another_worker_takes_over(tmp_path, monkeypatch):
+    path = str(tmp_path / "sessions.db")
+    worker_a = SessionRegistry(_StatefulEngine, store=SQLiteSessionStore(path), worker_id="a")
+    worker_b = SessionRegistry(_StatefulEngine, store=SQLiteSessionStore(path), worker_id="b")
+    session = worker_a.create()
+    session.engine.start()
+    monkeypatch.setattr(main, "session_registry", worker_a)
+    monkeypatch.setattr(main.observation_config, "OBSERVATION_STREAM_OWNER_CHECK", 0.05)
+    client = TestClient(main.app)
+
+    with client.websocket_connect(f"/observation/stream?session_id={session.session_id}") as websocket:
+        worker_b.get_engine(session.session_id, adopt=True)
+        with pytest.raises(WebSocketDisconnect):
+            websocket.receive_text()
+
+
+def test_ws_reconnect_resumes_conversation():
+    main.app.dependency_overrides[main.get_engine] = main.get_mock_engine
+    client = TestClient(main.app)
+    with client.websocket_connect("/ws") as websocket:
+        session_id = json.loads(websocket.receive_text())["session_id"]
+        websocket.send_json({"text": "Hello"})
+        websocket.receive_text()
+
+    with client.websocket_connect(f"/ws?session_id={session_id}") as websocket:
+        greeting = json.loads(websocket.receive_text())
+        assert greeting["resumed"] is True
+        assert greeting["session_id"] == session_id
+
+    history = main.session_store.get(session_id)["history"]
+    assert [turn["role"] for turn in history] == ["assistant", "user", "assistant"]
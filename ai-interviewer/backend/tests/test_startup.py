@@ -0,0 +1,46 @@
+import json
+import pathlib
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.vision_pool import VisionWorkerPool
+
+# Cold import of the app must stay well under the old multi-second import
+IMPORT_TIME_BUDGET_SECONDS = 2.0
+HEAVY_MODULES = ("cv2", "mediapipe", "ultralytics", "torch", "google.generativeai")
+
+
+def test_import_is_fast_and_defers_heavy_modules():
+    script = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import backend.main\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    root = pathlib.Path(__file__).resolve().parents[2]
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+
+    assert result["loaded"] == []
+    assert result["elapsed"] < IMPORT_TIME_BUDGET_SECONDS
+
+
+def test_ready_reports_warm_up(monkeypatch):
+    pool = VisionWorkerPool(num_workers=0)
+    monkeypatch.setattr(main, "vision_pool", pool)
+    client = TestClient(main.app)
+
+    assert client.get("/ready").status_code == 503
+
+    pool.warm_up().join(timeout=120)
+    response = client.get("/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ready"] is True
+    assert body["warmup_seconds"] is not None
@@ -0,0 +1,67 @@
+import numpy as np
+
+from backend import vision_pool
+from backend.person_detectors import DETECTOR_TIERS, PersonDetectorBackend
+from backend.robust_face_detector import RobustFaceDetector
+from backend.vision_pool import VisionWorkerPool
+
+
+class _TwoPersons(PersonDetectorBackend):
+    """Sees two persons in every frame and counts its batched calls."""
+
+    def __init__(self):
+        super().__init__("fake", DETECTOR_TIERS["yolov8n-onnx-320"])
+        self.batches = []
+
+    def detect(self, frames, conf_threshold):
+        self.batches.append(len(frames))
+        boxes = [(20, 20, 220, 420, 0.9), (300, 40, 500, 440, 0.85)]
+        return [np.array(boxes, dtype=np.float32)] * len(frames)
+
+
+def _frame():
+    return np.zeros((120, 160, 3), dtype=np.uint8)
+
+
+def test_inline_pool_analyzes_in_caller():
+    pool = VisionWorkerPool(num_workers=0)
+    result = pool.submit("inline-session", _frame()).result(timeout=30)
+
+    assert "face_detected" in result["face"]
+    assert "emotion" in result["emotion"]
+    pool.release_session("inline-session")
+
+
+def test_sessions_are_pinned_and_spread_across_workers():
+    pool = VisionWorkerPool(num_workers=2)
+    try:
+        first = pool.submit("a", _frame()).result(timeout=120)
+        pool.submit("b", _frame()).result(timeout=120)
+
+        assert "face_detected" in first["face"]
+        assert sorted(pool._assignments.values()) == [0, 1]
+        lane = pool._assignments["a"]
+        pool.submit("a", _frame()).result(timeout=120)
+        assert pool._assignments["a"] == lane
+
+        pool.release_session("a")
+        assert "a" not in pool._assignments
+        assert pool._lane_sessions[lane] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_batch_checks_every_frame_while_confirming_a_second_person():
+    backend = _TwoPersons()
+    analyzers = vision_pool._get_session("confirming")
+    analyzers.face_analyzer.face_mesh = None
+    analyzers.face_analyzer.yolo_detector = RobustFaceDetector(backend=backend)
+    frame = _frame()
+    try:
+        results = [vision_pool.analyze_batch([("confirming", frame.copy())])[0] for _ in range(3)]
+    finally:
+        vision_pool.release_session("confirming")
+
+    # The still frame would otherwise be reused and the person check wait a second
+    assert backend.batches == [1, 1, 1]
+    assert [r["face"].get("multiple_faces", False) for r in results] == [False, False, True]
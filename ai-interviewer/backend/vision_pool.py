@@ -0,0 +1,451 @@
+"""
+Process pool for CPU-heavy vision analysis.
+FaceAnalyzer and EmotionAnalyzer (MediaPipe, YOLO, OpenCV) run in worker
+processes so they no longer compete with the FastAPI event loop for the GIL.
+"""
+import logging
+import multiprocessing
+import os
+import pathlib
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .face_analyzer import FaceAnalyzer
+    from .emotion_analyzer import EmotionAnalyzer
+    from .micro_batcher import MicroBatcher
+    from .analyzer_warmup import warm_up_analyzers
+    from .analyzer_schedule import AnalyzerSchedule, finish_analysis, run_analyzers, start_analysis
+    from .metrics import collect_timings, stage
+    from .motion_gate import MotionGate
+except ImportError:
+    sys.path.append(str(pathlib.Path(__file__).resolve().parent))
+    from face_analyzer import FaceAnalyzer
+    from emotion_analyzer import EmotionAnalyzer
+    from micro_batcher import MicroBatcher
+    from analyzer_warmup import warm_up_analyzers
+    from analyzer_schedule import AnalyzerSchedule, finish_analysis, run_analyzers, start_analysis
+    from metrics import collect_timings, stage
+    from motion_gate import MotionGate
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Worker side (runs inside each pool process, or in-process when inline)
+# ============================================================================
+
+class _SessionAnalyzers:
+    """Per-session analyzer state held by the worker that owns the session."""
+
+    def __init__(self):
+        self.face_analyzer = FaceAnalyzer()
+        self.emotion_analyzer = EmotionAnalyzer()
+        self.schedule = AnalyzerSchedule()
+        self.gate = MotionGate()
+
+
+_sessions: Dict[str, _SessionAnalyzers] = {}
+_sessions_lock = threading.Lock()
+
+
+def _get_session(session_id: str) -> _SessionAnalyzers:
+    with _sessions_lock:
+        analyzers = _sessions.get(session_id)
+        if analyzers is None:
+            analyzers = _SessionAnalyzers()
+            _sessions[session_id] = analyzers
+        return analyzers
+
+
+def analyze_frame(session_id: str, frame: np.ndarray, person_count: Optional[int] = None) -> Dict:
+    """Run face and emotion analysis for one session's frame."""
+    analyzers = _get_session(session_id)
+    face_data, emotion_data = run_analyzers(
+        analyzers.face_analyzer, analyzers.emotion_analyzer, analyzers.schedule, frame,
+        person_count=person_count, gate=analyzers.gate,
+    )
+    return {"face": face_data, "emotion": emotion_data, "reused": analyzers.gate.last_reused}
+
+
+def analyze_batch(items: List[Tuple[str, np.ndarray]]) -> List:
+    """
+    Analyze frames from several sessions at once.
+
+    YOLO person detection runs as one batched forward pass over the frames
+    that need a full-frame pass (see ROITracker); the counts are then fed to
+    each session's own temporal smoother. Face crops of sessions whose
+    emotion analysis is due go through the emotion model together. Returns
+    one result (or Exception) per item, in order. Each result carries its
+    stage timings so the API process can record them in /metrics.
+    """
+    sessions = [_get_session(session_id) for session_id, _ in items]
+    frames = [frame for _, frame in items]
+
+    # Every session detector shares the process-wide model, so any one can run the batch
+    detector = next(
+        (a.face_analyzer.yolo_detector for a in sessions if a.face_analyzer.yolo_detector is not None),
+        None,
+    )
+    batch_start = time.perf_counter()
+    with collect_timings() as batch_timings:
+        person_counts = [None] * len(frames)
+        # Unchanged frames reuse earlier results, and sessions analyzing a
+        # tracked face crop skip the person check unless it is due. Sessions
+        # confirming a second person are checked on every frame
+        full = [
+            i for i, a in enumerate(sessions)
+            if a.face_analyzer.person_check_pending
+            or (not a.gate.check(frames[i])
+                and (a.face_analyzer.roi_tracker.needs_full_frame or a.schedule.due("person")))
+        ]
+        if detector is not None and full:
+            counts = detector.detect_persons_batch([frames[i] for i in full])
+            for i, (count, _) in zip(full, counts):
+                person_counts[i] = count
+    # Each frame is charged an equal share of the batched forward pass
+    shared_cost = (time.perf_counter() - batch_start) / len(items)
+    shared_timings = {name: seconds / len(items) for name, seconds in batch_timings.items()}
+
+    # Face stage per session; emotion crops due on this batch are collected
+    # so the emotion model classifies them in one forward pass
+    pending: List = []
+    for (session_id, frame), analyzers, person_count in zip(items, sessions, person_counts):
+        try:
+            start = time.perf_counter()
+            with collect_timings() as timings:
+                state = start_analysis(
+                    analyzers.face_analyzer, analyzers.emotion_analyzer, analyzers.schedule, frame,
+                    person_count=person_count, gate=analyzers.gate,
+                )
+            pending.append((state, timings, time.perf_counter() - start))
+        except Exception as e:
+            pending.append(e)
+
+    batched = [
+        i for i, item in enumerate(pending)
+        if not isinstance(item, Exception) and item[0].emotion_crop is not None
+    ]
+    probabilities: Dict[int, np.ndarray] = {}
+    emotion_share: Dict[str, float] = {}
+    if len(batched) > 1:
+        batch_start = time.perf_counter()
+        with collect_timings() as emotion_timings:
+            crops = [pending[i][0].emotion_crop for i in batched]
+            try:
+                with stage("emotion"):
+                    outputs = sessions[batched[0]].emotion_analyzer.classify_crops(crops)
+                probabilities = dict(zip(batched, outputs))
+            except Exception as e:
+                # Each session classifies its own crop instead
+                logger.error(f"[VisionWorkerPool] Batched emotion inference failed: {e!r}")
+        # Frames in the emotion batch share its cost equally
+        emotion_cost = (time.perf_counter() - batch_start) / len(batched)
+        emotion_share = {name: seconds / len(batched) for name, seconds in emotion_timings.items()}
+
+    results = []
+    for i, ((session_id, frame), analyzers, item) in enumerate(zip(items, sessions, pending)):
+        if isinstance(item, Exception):
+            results.append(item)
+            continue
+        state, timings, elapsed = item
+        try:
+            start = time.perf_counter()
+            with collect_timings() as finish_timings:
+                face_data, emotion_data = finish_analysis(
+                    analyzers.emotion_analyzer, analyzers.schedule, state,
+                    emotion_probabilities=probabilities.get(i), gate=analyzers.gate,
+                )
+            elapsed += time.perf_counter() - start
+            shares = [shared_timings, finish_timings]
+            if i in probabilities:
+                elapsed += emotion_cost
+                shares.append(emotion_share)
+            for share in shares:
+                for name, seconds in share.items():
+                    timings[name] = timings.get(name, 0.0) + seconds
+            results.append({
+                "face": face_data,
+                "emotion": emotion_data,
+                "reused": analyzers.gate.last_reused,
+                "analysis_seconds": shared_cost + elapsed,
+                "timings": timings,
+            })
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def warm_up_worker(width: int = 640, height: int = 480, frames: int = 2) -> float:
+    """
+    Import the vision stack, load its models and run synthetic frames through
+    them in this process. The YOLO weights stay in the process-wide cache for
+    later sessions. Returns the seconds it took.
+    """
+    start = time.perf_counter()
+    analyzers = _SessionAnalyzers()
+    warm_up_analyzers(analyzers.face_analyzer, analyzers.emotion_analyzer, width, height, frames)
+    return time.perf_counter() - start
+
+
+def prepare_session(session_id: str, width: int = 640, height: int = 480, frames: int = 2) -> float:
+    """Create a session's analyzers ahead of its first frame and warm them up."""
+    start = time.perf_counter()
+    analyzers = _get_session(session_id)
+    warm_up_analyzers(analyzers.face_analyzer, analyzers.emotion_analyzer, width, height, frames)
+    return time.perf_counter() - start
+
+
+def worker_cpu_seconds() -> float:
+    """CPU time used by this process so far."""
+    return time.process_time()
+
+
+def reset_session(session_id: str):
+    """Reset a session's analyzer counters (blinks, temporal windows)."""
+    with _sessions_lock:
+        analyzers = _sessions.get(session_id)
+    if analyzers is not None:
+        analyzers.face_analyzer.reset()
+        analyzers.emotion_analyzer.reset()
+        analyzers.schedule.reset()
+        analyzers.gate.reset()
+
+
+def release_session(session_id: str):
+    """Drop a finished session's analyzer state."""
+    with _sessions_lock:
+        _sessions.pop(session_id, None)
+
+
+# ============================================================================
+# Parent side
+# ============================================================================
+
+def default_worker_count() -> int:
+    """One worker per core, leaving a core for the API process."""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+class VisionWorkerPool:
+    """
+    Shared pool of vision worker processes.
+
+    Each session is pinned to one worker (its analyzers keep blink counts and
+    temporal windows between frames); sessions are spread over the least
+    loaded workers. Models are loaded once per worker and shared by the
+    sessions it serves. Frames headed to the same worker are micro-batched so
+    concurrent sessions share one YOLO forward pass.
+    """
+
+    def __init__(self, num_workers: Optional[int] = None, batch_window: float = 0.015,
+                 max_batch: int = 8, warmup_frames: int = 2,
+                 warmup_size: Tuple[int, int] = (640, 480), max_pending: int = 32):
+        """
+        Args:
+            num_workers: Worker processes to use. None sizes the pool to the
+                         machine's cores; 0 analyzes in this process.
+            batch_window: Seconds to collect frames from other sessions before
+                          running a batch
+            max_batch: Maximum frames per batch
+            warmup_frames: Synthetic frames run through each worker's analyzers
+                           during warm_up (0 only loads the models)
+            warmup_size: (width, height) of the synthetic warm-up frames
+            max_pending: Frames that may wait for a lane's next batch; past
+                         that the oldest waiting frame is dropped
+        """
+        self.warmup_frames = warmup_frames
+        self.warmup_size = warmup_size
+        self.num_workers = default_worker_count() if num_workers is None else max(0, num_workers)
+        lane_count = max(1, self.num_workers)
+        self._lanes: List[Optional[ProcessPoolExecutor]] = [None] * lane_count
+        self._batchers = [
+            MicroBatcher(
+                run_batch=(lambda items, lane=lane: self._run_batch(lane, items)),
+                max_batch=max_batch,
+                window=batch_window,
+                name=f"vision-batch-{lane}",
+                max_pending=max_pending,
+            )
+            for lane in range(lane_count)
+        ]
+        self._lane_sessions = [0] * lane_count
+        self._assignments: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        # Readiness (see warm_up)
+        self.ready = threading.Event()
+        self.warmup_seconds: Optional[float] = None
+        self.warmup_error: Optional[str] = None
+        self._warmup_thread: Optional[threading.Thread] = None
+        logger.info(f"[VisionWorkerPool] Configured with {self.num_workers} worker process(es)")
+
+    @property
+    def inline(self) -> bool:
+        return self.num_workers == 0
+
+    def _lane_index(self, session_id: str) -> int:
+        """Return the session's lane, assigning it to the least loaded one first."""
+        with self._lock:
+            lane = self._assignments.get(session_id)
+            if lane is None:
+                lane = min(range(len(self._lanes)), key=lambda i: self._lane_sessions[i])
+                self._assignments[session_id] = lane
+                self._lane_sessions[lane] += 1
+            return lane
+
+    def _executor(self, lane: int) -> ProcessPoolExecutor:
+        with self._lock:
+            executor = self._lanes[lane]
+            if executor is None:
+                # Started lazily; spawn avoids forking the API process's threads
+                executor = ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._lanes[lane] = executor
+            return executor
+
+    def _run_batch(self, lane: int, items: List[Tuple[str, np.ndarray]]) -> List:
+        """Run one batch on the lane's worker (called from the lane's batcher thread)."""
+        if self.inline:
+            return analyze_batch(items)
+
+        executor = self._executor(lane)
+        try:
+            return executor.submit(analyze_batch, items).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. native crash); replace it for the next batch
+            logger.error("[VisionWorkerPool] Worker process died, restarting it")
+            self._discard_lane(lane, executor)
+            raise
+
+    def _discard_lane(self, lane: int, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._lanes[lane] is executor:
+                self._lanes[lane] = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self) -> threading.Thread:
+        """
+        Start every worker and load its models in the background.
+        `ready` is set once all workers are warm (or warm-up failed; see
+        `warmup_error`). Safe to call more than once.
+        """
+        with self._lock:
+            if self._warmup_thread is None:
+                self._warmup_thread = threading.Thread(
+                    target=self._warm_up_lanes, name="vision-warmup", daemon=True
+                )
+                self._warmup_thread.start()
+            return self._warmup_thread
+
+    def _warm_up_lanes(self):
+        start = time.perf_counter()
+        try:
+            width, height = self.warmup_size
+            if self.inline:
+                warm_up_worker(width, height, self.warmup_frames)
+            else:
+                futures = [
+                    self._executor(lane).submit(warm_up_worker, width, height, self.warmup_frames)
+                    for lane in range(len(self._lanes))
+                ]
+                for future in futures:
+                    future.result()
+            self.warmup_seconds = time.perf_counter() - start
+            logger.info(f"[VisionWorkerPool] Warm-up finished in {self.warmup_seconds:.2f}s")
+        except Exception as e:
+            self.warmup_error = repr(e)
+            logger.error(f"[VisionWorkerPool] Warm-up failed: {e!r}")
+        finally:
+            self.ready.set()
+
+    def readiness(self) -> Dict:
+        """Readiness report for /ready."""
+        return {
+            "ready": self.ready.is_set() and self.warmup_error is None,
+            "warming_up": self._warmup_thread is not None and not self.ready.is_set(),
+            "workers": self.num_workers,
+            "warmup_seconds": round(self.warmup_seconds, 3) if self.warmup_seconds is not None else None,
+            "error": self.warmup_error,
+        }
+
+    def prepare_session(self, session_id: str, width: int, height: int, frames: int) -> Future:
+        """
+        Pin the session and warm its analyzers on its worker before frames arrive.
+        The future resolves to the warm-up seconds. Inline pools run it in the
+        calling thread.
+        """
+        lane = self._lane_index(session_id)
+        if self.inline:
+            future: Future = Future()
+            try:
+                future.set_result(prepare_session(session_id, width, height, frames))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self._executor(lane).submit(prepare_session, session_id, width, height, frames)
+
+    def submit(self, session_id: str, frame: np.ndarray) -> Future:
+        """Queue a frame for analysis; the future resolves to {"face": ..., "emotion": ...}."""
+        return self._batchers[self._lane_index(session_id)].submit((session_id, frame))
+
+    def worker_cpu_seconds(self) -> float:
+        """
+        Total CPU seconds used by the started worker processes (0 when inline,
+        where analysis is charged to this process).
+        """
+        if self.inline:
+            return 0.0
+        with self._lock:
+            lanes = [executor for executor in self._lanes if executor is not None]
+        # Each lane has one worker, so a task submitted to it reports that worker's CPU time
+        return sum(executor.submit(worker_cpu_seconds).result() for executor in lanes)
+
+    def reset_session(self, session_id: str):
+        """Reset the session's analyzer counters on its worker."""
+        if self.inline:
+            reset_session(session_id)
+            return
+        with self._lock:
+            lane = self._assignments.get(session_id)
+            executor = self._lanes[lane] if lane is not None else None
+        if executor is not None:
+            self._submit_control(executor, reset_session, session_id)
+
+    def release_session(self, session_id: str):
+        """Free the session's state on its worker and unpin it."""
+        with self._lock:
+            lane = self._assignments.pop(session_id, None)
+            if lane is not None:
+                self._lane_sessions[lane] -= 1
+            executor = self._lanes[lane] if lane is not None else None
+        if self.inline:
+            release_session(session_id)
+        elif executor is not None:
+            self._submit_control(executor, release_session, session_id)
+
+    @staticmethod
+    def _submit_control(executor: ProcessPoolExecutor, fn, session_id: str):
+        try:
+            executor.submit(fn, session_id)
+        except (BrokenProcessPool, RuntimeError):
+            # Dead or shut down worker: its session state is already gone
+            pass
+
+    def shutdown(self):
+        """Stop batching and all worker processes."""
+        for batcher in self._batchers:
+            batcher.stop()
+        with self._lock:
+            lanes = [executor for executor in self._lanes if executor is not None]
+            self._lanes = [None] * len(self._lanes)
+        for executor in lanes:
+            executor.shutdown(wait=False, cancel_futures=True)
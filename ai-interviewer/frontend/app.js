@@ -115,9 +115,9 @@ consentAccept.addEventListener("click", async () => {
     if (success) {
       console.log("[DEBUG] Camera started successfully");
       
-      // Start polling immediately to begin analysis
-      observation.startPolling();
-      console.log("[DEBUG] Started observation polling immediately");
+      // Subscribe to pushed observations immediately to begin analysis
+      observation.startStreaming();
+      console.log("[DEBUG] Started observation stream immediately");
       
       // Wait a bit for stream to be ready then start audio visualization
       setTimeout(() => {
@@ -547,8 +547,9 @@ function connect() {
     setStartButtonState("connected");
     endBtn.disabled = false;
     
-    // Start observation polling (camera already started on page load)
-    observation.startPolling(250); // Poll every 250ms for faster response (4 FPS)
+    // Start observation stream (camera already started on page load);
+    // polls every 250ms only if the push stream is unavailable
+    observation.startStreaming(250);
     observation.onObservation = (result) => {
       // result contains {observation, warnings}
       if (result.observation) {
@@ -560,7 +561,7 @@ function connect() {
         clearWarnings();
       }
     };
-    console.log("[DEBUG] Observation polling started");
+    console.log("[DEBUG] Observation stream started");
     
     console.log("[DEBUG] WebSocket connected, waiting for greeting...");
   };
@@ -587,7 +588,7 @@ function connect() {
       
       // Stop observation
       observation.stopObservation().then(() => {
-        observation.stopPolling();
+        observation.stopStreaming();
         // Show final report
         showObservationReport();
       });
@@ -628,7 +629,7 @@ function disconnect() {
     
     // Stop observation and show report
     observation.stopObservation().then(() => {
-      observation.stopPolling();
+      observation.stopStreaming();
       console.log("[DEBUG] Showing final report...");
       showObservationReport();
     });
@@ -645,6 +646,11 @@ function sendUserMessage(text) {
 }
 
 function handleAiMessage(payload) {
+  if (payload.session_id) {
+    // Greeting carries the session id that scopes observation traffic
+    observation.attachSession(payload.session_id);
+  }
+
   const response = payload.interviewer_response || "";
   const state = payload.system_state || "WARM_UP";
   
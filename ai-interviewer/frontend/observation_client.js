@@ -11,6 +11,111 @@ export class ObservationClient {
     this.videoElement = null;
     this.mediaStream = null;
     this.onObservation = null;
+    this.sessionId = "";
+    this.ingestSocket = null;
+    this.frameSequence = 0;
+    this.streamSocket = null;
+    this.streamRequested = null;
+    // Capture target negotiated by the backend (capture_config messages)
+    this.captureConfig = { fps: 6, width: 640, height: 480 };
+  }
+
+  socketUrl(path) {
+    const url = new URL(path, this.backendUrl);
+    url.protocol = url.protocol === "https:" ? "wss:" : "ws:";
+    return url.toString();
+  }
+
+  ingestUrl() {
+    return this.socketUrl("/observation/ws");
+  }
+
+  sessionQuery() {
+    return this.sessionId ? `?session_id=${encodeURIComponent(this.sessionId)}` : "";
+  }
+
+  attachSession(sessionId) {
+    /**Scope all observation traffic to the session issued by /ws*/
+    if (!sessionId || sessionId === this.sessionId) return;
+    this.sessionId = sessionId;
+    this.frameSequence = 0;
+    if (this.streamRequested !== null) {
+      const interval = this.streamRequested;
+      this.stopStreaming();
+      this.startStreaming(interval);
+    }
+  }
+
+  openIngestChannel() {
+    /**Open the persistent binary channel used to stream frames to the backend*/
+    if (this.ingestSocket && this.ingestSocket.readyState <= WebSocket.OPEN) return;
+
+    const socket = new WebSocket(this.ingestUrl());
+    socket.binaryType = "arraybuffer";
+    socket.onmessage = (event) => {
+      if (typeof event.data !== "string") return;
+      let message;
+      try {
+        message = JSON.parse(event.data);
+      } catch (err) {
+        console.warn("[ObservationClient] Ingest channel message:", event.data);
+        return;
+      }
+      if (message.type === "capture_config") {
+        this.applyCaptureConfig(message);
+      } else {
+        console.warn("[ObservationClient] Ingest channel message:", message);
+      }
+    };
+    socket.onclose = () => {
+      if (this.ingestSocket === socket) {
+        this.ingestSocket = null;
+      }
+    };
+    this.ingestSocket = socket;
+  }
+
+  closeIngestChannel() {
+    if (this.ingestSocket) {
+      this.ingestSocket.close();
+      this.ingestSocket = null;
+    }
+  }
+
+  applyCaptureConfig(config) {
+    /**Adopt the fps/resolution the backend can actually consume for this session*/
+    this.captureConfig = {
+      fps: Math.max(0, Number(config.fps) || 0),
+      width: config.width || this.captureConfig.width,
+      height: config.height || this.captureConfig.height,
+    };
+    console.log("[ObservationClient] Capture config:", this.captureConfig);
+  }
+
+  buildFrameMessage(kind, payload) {
+    /**Prefix payload with the binary header expected by backend/frame_ingest.py*/
+    const sessionBytes = new TextEncoder().encode(this.sessionId || "");
+    const headerSize = 15;
+    const buffer = new Uint8Array(headerSize + sessionBytes.length + payload.byteLength);
+    const view = new DataView(buffer.buffer);
+    view.setUint8(0, 1);                        // protocol version
+    view.setUint8(1, kind);                     // 1 = JPEG video, 2 = int16 PCM audio
+    view.setUint32(2, this.frameSequence++ >>> 0);
+    view.setFloat64(6, Date.now());
+    view.setUint8(14, sessionBytes.length);
+    buffer.set(sessionBytes, headerSize);
+    buffer.set(new Uint8Array(payload), headerSize + sessionBytes.length);
+    return buffer.buffer;
+  }
+
+  sendBinaryFrame(kind, payload) {
+    /**Send a frame over the ingest channel; returns false if it is not usable*/
+    const socket = this.ingestSocket;
+    if (!socket || socket.readyState !== WebSocket.OPEN) return false;
+    // Skip frames while the socket is still flushing earlier ones (backpressure)
+    if (socket.bufferedAmount > 256 * 1024) return true;
+    socket.send(this.buildFrameMessage(kind, payload));
+    return true;
   }
 
   async startObservation() {
@@ -52,22 +157,11 @@ export class ObservationClient {
         throw err;
       }
 
-      // Start backend observation engine
-      try {
-        const startRes = await fetch(`${this.backendUrl}/observation/start`, {
-          method: "POST",
-          headers: { "Content-Type": "application/json" }
-        });
-        const startData = await startRes.json();
-        
-        if (!startData.success) {
-          console.error("[ObservationClient] Backend observation failed to start");
-        }
-      } catch (err) {
-        console.error("[ObservationClient] Backend observation error:", err);
-      }
+      // The backend engine for this interview is started by /ws; frames are
+      // routed to it once attachSession() receives the session id.
 
       this.running = true;
+      this.openIngestChannel();
       
       // Start sending video frames to backend for analysis
       this.startVideoFrameCapture();
@@ -86,29 +180,48 @@ export class ObservationClient {
     
     const canvas = document.createElement('canvas');
     const ctx = canvas.getContext('2d');
-    canvas.width = 640;
-    canvas.height = 480;
     
     const captureFrame = async () => {
       if (!this.running || !this.videoElement) return;
       
+      const { fps, width, height } = this.captureConfig;
+      if (fps <= 0) {
+        // Video analysis disabled for this session (audio-only); check again later
+        setTimeout(captureFrame, 1000);
+        return;
+      }
+      
       try {
+        if (canvas.width !== width || canvas.height !== height) {
+          canvas.width = width;
+          canvas.height = height;
+        }
+        
         // Draw current video frame to canvas
         ctx.drawImage(this.videoElement, 0, 0, canvas.width, canvas.height);
         
-        // Convert to base64 JPEG (0.7 quality for faster encoding)
-        const frameData = canvas.toDataURL('image/jpeg', 0.7).split(',')[1];
-        
-        // Send to backend asynchronously (don't wait for response)
-        fetch(`${this.backendUrl}/observation/add_video_frame`, {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ frame_data: frameData })
-        }).catch(err => {
-          if (Math.random() < 0.1) { // Log 10% of errors to avoid spam
-            console.error('[ObservationClient] Frame capture error:', err);
+        if (this.ingestSocket && this.ingestSocket.readyState === WebSocket.OPEN) {
+          // Send raw JPEG bytes over the binary ingest channel
+          const blob = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.7));
+          if (blob) {
+            this.sendBinaryFrame(1, await blob.arrayBuffer());
           }
-        });
+        } else {
+          // Fallback: base64 JPEG over HTTP while the channel is unavailable
+          const frameData = canvas.toDataURL('image/jpeg', 0.7).split(',')[1];
+          
+          // Send to backend asynchronously (don't wait for response)
+          fetch(`${this.backendUrl}/observation/add_video_frame${this.sessionQuery()}`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ frame_data: frameData })
+          }).catch(err => {
+            if (Math.random() < 0.1) { // Log 10% of errors to avoid spam
+              console.error('[ObservationClient] Frame capture error:', err);
+            }
+          });
+          this.openIngestChannel();
+        }
         
       } catch (err) {
         if (Math.random() < 0.1) {
@@ -116,9 +229,9 @@ export class ObservationClient {
         }
       }
       
-      // Capture at 6 FPS = every ~167ms for faster response
+      // Capture at the rate negotiated by the backend (6 FPS until told otherwise)
       if (this.running) {
-        setTimeout(captureFrame, 167);
+        setTimeout(captureFrame, 1000 / fps);
       }
     };
     
@@ -127,6 +240,8 @@ export class ObservationClient {
   }
 
   async stopObservation() {
+    this.closeIngestChannel();
+
     if (this.mediaStream) {
       this.mediaStream.getTracks().forEach(track => track.stop());
       this.mediaStream = null;
@@ -137,7 +252,7 @@ export class ObservationClient {
     }
 
     try {
-      await fetch(`${this.backendUrl}/observation/stop`, { method: "POST" });
+      await fetch(`${this.backendUrl}/observation/stop${this.sessionQuery()}`, { method: "POST" });
     } catch (err) {
       console.error("[ObservationClient] Error stopping observation:", err);
     }
@@ -148,7 +263,7 @@ export class ObservationClient {
 
   async getLatestObservation() {
     try {
-      const res = await fetch(`${this.backendUrl}/observation/latest`);
+      const res = await fetch(`${this.backendUrl}/observation/latest${this.sessionQuery()}`);
       const data = await res.json();
       
       // Log warnings if present (5% sampling to avoid spam)
@@ -168,7 +283,7 @@ export class ObservationClient {
 
   async getReport() {
     try {
-      const res = await fetch(`${this.backendUrl}/observation/report`);
+      const res = await fetch(`${this.backendUrl}/observation/report${this.sessionQuery()}`);
       const data = await res.json();
       return data.report;
     } catch (err) {
@@ -179,7 +294,7 @@ export class ObservationClient {
 
   async reset() {
     try {
-      await fetch(`${this.backendUrl}/observation/reset`, { method: "POST" });
+      await fetch(`${this.backendUrl}/observation/reset${this.sessionQuery()}`, { method: "POST" });
       console.log("[ObservationClient] Reset complete");
     } catch (err) {
       console.error("[ObservationClient] Error resetting:", err);
@@ -209,6 +324,55 @@ export class ObservationClient {
     }
   }
 
+  startStreaming(fallbackInterval = 500) {
+    /**Receive observations pushed by the backend; fall back to polling if the stream fails*/
+    this.streamRequested = fallbackInterval;
+    // Wait for attachSession(): the stream is scoped to the interview session
+    if (this.streamSocket || !this.sessionId) return;
+
+    const socket = new WebSocket(this.socketUrl(`/observation/stream${this.sessionQuery()}`));
+    let opened = false;
+    socket.onopen = () => {
+      opened = true;
+      this.stopPolling();
+    };
+    socket.onmessage = (event) => {
+      if (!this.onObservation) return;
+      try {
+        const data = JSON.parse(event.data);
+        if (data.observation) {
+          this.onObservation({
+            observation: data.observation,
+            warnings: data.warnings || []
+          });
+        }
+      } catch (err) {
+        console.error("[ObservationClient] Invalid stream message:", err);
+      }
+    };
+    socket.onclose = () => {
+      if (this.streamSocket !== socket) return;
+      this.streamSocket = null;
+      if (!opened) {
+        console.warn("[ObservationClient] Observation stream unavailable, polling instead");
+      }
+      if (this.running && !this.pollingInterval) {
+        this.startPolling(fallbackInterval);
+      }
+    };
+    this.streamSocket = socket;
+  }
+
+  stopStreaming() {
+    this.streamRequested = null;
+    if (this.streamSocket) {
+      const socket = this.streamSocket;
+      this.streamSocket = null;
+      socket.close();
+    }
+    this.stopPolling();
+  }
+
   setVideoElement(element) {
     this.videoElement = element;
   }